@@ -0,0 +1,780 @@
+import hashlib
+import re
+import time
+from collections import namedtuple
+from src.analysis.lru import LRUCache
+from src.analysis.rule_packs import load_pack
+from src.analysis.rulesets import get_ruleset
+from src.analysis.rewrite import get_rewrite_service, RewriteError
+from src.analysis.fixes import error_id
+from src.analysis.repetition import find_repetitions
+from src.analysis.tokenizer import (WORD_PATTERN, SENTENCE_END_PATTERN, iter_words, words as tokenize_words,
+                                    split_sentences, count_words_and_sentences, paragraph_spans,
+                                    chunk_spans)
+
+class AnalysisCancelled(Exception):
+    """Raised when a check is abandoned because a newer revision superseded it"""
+
+# How many items an analyzer processes between looks at the clock
+BUDGET_CHECK_INTERVAL = 256
+
+# Characters of the document read between looks at the clock when
+# tokenizing it or scoring its readability
+TEXT_CHUNK = 64 * 1024
+
+# Matches of one pattern rule listed individually in "errors"; the rest are
+# only counted and can be paged through with rule_hits()
+MAX_HITS_PER_RULE = 20
+
+class Budget:
+    """Cooperative deadline shared by the analyzers of one check"""
+
+    def __init__(self, seconds=None, should_stop=None):
+        self.started = time.monotonic()
+        self.deadline = None if seconds is None else self.started + seconds
+        self.should_stop = should_stop
+        self._ticks = 0
+
+    def expired(self):
+        if self.should_stop is not None and self.should_stop():
+            raise AnalysisCancelled()
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def tick(self):
+        """Per-item check for analyzer loops; only reads the clock every few hundred calls"""
+        self._ticks += 1
+        if self._ticks % BUDGET_CHECK_INTERVAL:
+            return False
+        return self.expired()
+
+    def remaining(self):
+        """Seconds left before the deadline, or None when unbounded"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def elapsed_ms(self):
+        return int((time.monotonic() - self.started) * 1000)
+
+def detect_tone(text, pack=None):
+    """Detect the overall tone of the text"""
+    pack = pack or load_pack()
+    text_lower = text.lower()
+    tone_scores = {}
+    
+    for tone, indicators in pack.tone_indicators.items():
+        score = sum(1 for indicator in indicators if indicator in text_lower)
+        if score > 0:
+            tone_scores[tone] = score
+    
+    if not tone_scores:
+        return 'neutral'
+    
+    # Return the tone with the highest score
+    return max(tone_scores, key=tone_scores.get)
+
+def analyze_sentence_variety(text, budget=None):
+    """Analyze sentence variety and structure; None if budget runs out first"""
+    sentences = split_sentences(text)
+    
+    if not sentences:
+        return []
+    
+    suggestions = []
+    sentence_lengths = []
+    for sentence in sentences:
+        if budget is not None and budget.tick():
+            return None
+        sentence_lengths.append(len(tokenize_words(sentence)))
+    avg_length = sum(sentence_lengths) / len(sentence_lengths)
+    
+    # Check for monotonous sentence length
+    if len(set(sentence_lengths)) < len(sentence_lengths) * 0.3:
+        suggestions.append({
+            "type": "delivery",
+            "message": "Consider varying your sentence length for better flow",
+            "suggestion": "Mix short and long sentences to create rhythm"
+        })
+    
+    # Check for very long sentences
+    long_sentences = [i for i, length in enumerate(sentence_lengths) if length > 25]
+    if long_sentences:
+        suggestions.append({
+            "type": "clarity",
+            "message": f"Sentence {long_sentences[0] + 1} is quite long. Consider breaking it up.",
+            "suggestion": "Break long sentences into shorter, clearer ones"
+        })
+    
+    return suggestions
+
+# A regex rule from the language pack. Its id ("clarity:3",
+# "passive_voice:0") is the family plus the pattern's position in the pack.
+PatternRule = namedtuple("PatternRule", "id pattern type color suggestions message")
+
+def pattern_rules(pack, family=None):
+    """The pack's regex rules, optionally only one family (clarity, conciseness, passive_voice)"""
+    rules = []
+    if family in (None, "clarity"):
+        rules += [PatternRule(f"clarity:{i}", pattern, "clarity", "green", ["Simplify this phrase"], message)
+                  for i, (pattern, message) in enumerate(pack.clarity_patterns)]
+    if family in (None, "conciseness"):
+        rules += [PatternRule(f"conciseness:{i}", pattern, "clarity", "green", [replacement],
+                              "This phrase can be simplified")
+                  for i, (pattern, replacement) in enumerate(pack.conciseness_patterns)]
+    if family in (None, "passive_voice"):
+        rules += [PatternRule(f"passive_voice:{i}", pattern, "delivery", "orange", ["Use active voice"],
+                              "Consider using active voice for more direct communication")
+                  for i, pattern in enumerate(pack.passive_voice_patterns)]
+    return rules
+
+def rule_hits(text, rule_id, pack=None, cursor=0, limit=MAX_HITS_PER_RULE):
+    """Page through one pattern rule's matches, starting at character offset cursor.
+
+    Returns the errors and the cursor for the next page (None when done).
+    Raises KeyError for an unknown rule id.
+    """
+    pack = pack or load_pack()
+    rule = {rule.id: rule for rule in pattern_rules(pack)}[rule_id]
+    errors = []
+    for match in rule.pattern.finditer(text, cursor):
+        if len(errors) == limit:
+            return {"rule": rule.id, "errors": errors, "next_cursor": errors[-1]["end"]}
+        errors.append(make_error(match.group(), match.start(), match.end(), rule.id, rule.type, rule.color,
+                                 rule.suggestions, rule.message))
+    return {"rule": rule.id, "errors": errors, "next_cursor": None}
+
+def make_error(word, start, end, rule, error_type, color, suggestions, message):
+    """One entry of the /check "errors" list"""
+    return {
+        "id": error_id(rule, start, word),
+        "rule": rule,
+        "word": word,
+        "start": start,
+        "end": end,
+        "type": error_type,
+        "color": color,
+        "suggestions": suggestions,
+        "message": message
+    }
+
+def empty_check_result():
+    return {
+        "score": 100,
+        "suggestions": {},
+        "errors": [],
+        "aggregated_hits": [],
+        "document_insights": {
+            "word_count": 0,
+            "character_count": 0,
+            "sentence_count": 0,
+            "reading_time": 0,
+            "speaking_time": 0,
+            "tone": "neutral",
+            "readability": None
+        },
+        "advanced_features": {
+            "tone_detection": "neutral",
+            "ai_rewrites": [],
+            "conciseness_suggestions": [],
+            "passive_voice_instances": [],
+            "repetitions": []
+        },
+        "analysis": {
+            "complete": True,
+            "completed": [],
+            "truncated": [],
+            "skipped": [],
+            "elapsed_ms": 0
+        }
+    }
+
+class _CheckState:
+    """Findings accumulated by the analyzers of a single check"""
+
+    def __init__(self, text, pack, ruleset, word_matches, word_count, max_hits_per_rule=MAX_HITS_PER_RULE,
+                 words_complete=True):
+        self.text = text
+        self.pack = pack
+        self.ruleset = ruleset
+        self.word_matches = word_matches
+        self.word_count = word_count
+        # False when the deadline passed before the whole text was tokenized
+        self.words_complete = words_complete
+        self.suggestions = {}
+        self.errors = []  # List of error objects with positions
+        self.counts = {"correctness": 0, "clarity": 0, "engagement": 0, "delivery": 0}
+        self.max_hits_per_rule = max_hits_per_rule
+        self.hits = {}  # Pattern rule id -> match count and paging cursor
+        self.passive_voice_instances = 0
+        self.sentence_variety_suggestions = []
+        self.tone = 'neutral'
+        self.ai_rewrites = []
+        self.repetitions = []
+        self.readability = None
+
+    def add_error(self, word, start, end, rule, error_type, color, suggestions, message):
+        self.errors.append(make_error(word, start, end, rule, error_type, color, suggestions, message))
+        self.counts[error_type] += 1
+
+    def add_hit(self, rule, match):
+        """Record a pattern rule match; past max_hits_per_rule it is only counted"""
+        hits = self.hits.get(rule.id)
+        if hits is None:
+            hits = self.hits[rule.id] = {"rule": rule.id, "type": rule.type, "message": rule.message,
+                                         "count": 0, "returned": 0, "next_cursor": None}
+        hits["count"] += 1
+        if hits["returned"] < self.max_hits_per_rule:
+            self.add_error(match.group(), match.start(), match.end(), rule.id, rule.type, rule.color,
+                           rule.suggestions, rule.message)
+            hits["returned"] += 1
+            hits["next_cursor"] = match.end()
+        else:
+            self.counts[rule.type] += 1
+
+    def pattern_matches(self, rule):
+        return rule.pattern.finditer(self.text)
+
+    def house_style_matches(self):
+        return self.ruleset.house_style_matches(self.text)
+
+    def run_pattern_rules(self, rules, budget):
+        for rule in rules:
+            for match in self.pattern_matches(rule):
+                if budget.tick():
+                    return False
+                self.add_hit(rule, match)
+        return True
+
+    def aggregated_hits(self):
+        """Rules with more matches than were listed in errors"""
+        return [hits for hits in self.hits.values() if hits["count"] > hits["returned"]]
+
+    def family_count(self, family):
+        return sum(hits["count"] for rule_id, hits in self.hits.items() if rule_id.startswith(family + ":"))
+
+def _analyze_correctness(state, budget):
+    """Spelling/grammar errors and house style replacements"""
+    rules = state.ruleset.grammar_rules
+    for match in state.word_matches:
+        if budget.tick():
+            return False
+        word = match.group()
+        word_lower = word.lower()
+        if word_lower in rules and word not in state.suggestions:
+            state.suggestions[word] = rules[word_lower]
+            state.add_error(word, match.start(), match.end(), f"correctness:{word_lower}", "correctness", "red",
+                            rules[word_lower], "Spelling or grammar error")
+    
+    # Check for house style replacements from the user's or team's dictionary
+    for match, replacement in state.house_style_matches():
+        if budget.tick():
+            return False
+        phrase = match.group()
+        if phrase not in state.suggestions:
+            state.suggestions[phrase] = [replacement]
+            state.add_error(phrase, match.start(), match.end(), f"house_style:{phrase.lower()}", "correctness", "red",
+                            [replacement], "House style: use the preferred spelling")
+    return state.words_complete
+
+def _analyze_clarity(state, budget):
+    """Wordy and redundant phrases, then conciseness issues"""
+    return state.run_pattern_rules(pattern_rules(state.pack, "clarity") +
+                                   pattern_rules(state.pack, "conciseness"), budget)
+
+def _analyze_delivery(state, budget):
+    """Passive voice and sentence variety"""
+    finished = state.run_pattern_rules(pattern_rules(state.pack, "passive_voice"), budget)
+    state.passive_voice_instances = state.family_count("passive_voice")
+    if not finished or budget.expired():
+        return False
+    suggestions = analyze_sentence_variety(state.text, budget)
+    if suggestions is None:
+        return False
+    state.sentence_variety_suggestions = suggestions
+    return True
+
+def _analyze_engagement(state, budget):
+    """Vocabulary enhancement opportunities"""
+    vocabulary = state.ruleset.vocabulary
+    seen = set()
+    
+    for match in state.word_matches:
+        if budget.tick():
+            return False
+        word = match.group()
+        word_lower = word.lower()
+        # Only the first instance of each word (longer than 2 characters) is suggested
+        if len(word_lower) > 2 and word_lower in vocabulary and word_lower not in seen:
+            seen.add(word_lower)
+            if word not in state.suggestions:
+                state.suggestions[word] = vocabulary[word_lower]
+                state.add_error(word, match.start(), match.end(), f"engagement:{word_lower}", "engagement",
+                                "blue", vocabulary[word_lower], "Consider a more precise or engaging word")
+    return state.words_complete
+
+def _analyze_readability(state, budget):
+    """Document level Flesch-Kincaid, Gunning Fog and SMOG"""
+    # Imported here so numpy is only loaded once a check needs it
+    from src.analysis.readability import readability, combined_document
+    parts = []
+    for start, end in chunk_spans(state.text, TEXT_CHUNK):
+        if budget.expired():
+            return False
+        parts.append(readability(state.text[start:end], state.pack.language, detail=False)["document"])
+    state.readability = combined_document(parts)
+    return True
+
+def _analyze_repetition(state, budget):
+    """Overused words and phrases repeated across the document"""
+    if not state.words_complete:
+        # Counts over part of the document would be misleading
+        return False
+    findings = find_repetitions(state.text, state.word_matches, state.pack.common_words,
+                                state.max_hits_per_rule, budget.tick)
+    if findings is None:
+        return False
+    
+    vocabulary = state.ruleset.vocabulary
+    for finding in findings:
+        start, end = finding["spans"][0]
+        key = finding["text"].lower()
+        if finding["kind"] == "word":
+            state.add_error(finding["text"], start, end, f"overused:{key}", "engagement", "blue",
+                            vocabulary.get(key, ["Use a synonym or rephrase"]),
+                            f'"{finding["text"]}" is used {finding["count"]} times')
+        else:
+            state.add_error(finding["text"], start, end, f"repeated_phrase:{key}", "engagement", "blue",
+                            ["Vary the wording"], f'This phrase is repeated {finding["count"]} times')
+    state.repetitions = findings
+    return True
+
+def _analyze_tone(state, budget):
+    state.tone = detect_tone(state.text, state.pack)
+    return True
+
+def _analyze_ai_rewrites(state, budget):
+    if state.word_count <= 10:  # Only for substantial text
+        return True
+    
+    styles = [
+        ("improve", "Overall Improvement"),
+        ("formal", "More Formal"),
+        ("concise", "More Concise")
+    ]
+    try:
+        rewrites = get_rewrite_service().rewrite_many(
+            [("suggestion", state.text, style) for style, _ in styles], timeout=budget.remaining()
+        )
+    except RewriteError:
+        return False
+    state.ai_rewrites = [
+        {"type": style, "title": title, "suggestion": rewrite}
+        for (style, title), rewrite in zip(styles, rewrites)
+    ]
+    return True
+
+# Analyzers in priority order. When the time budget runs out the remaining
+# ones are skipped, so correctness is always the last result to be dropped.
+ANALYZERS = (
+    ("correctness", _analyze_correctness),
+    ("clarity", _analyze_clarity),
+    ("delivery", _analyze_delivery),
+    ("engagement", _analyze_engagement),
+    ("tone", _analyze_tone),
+    ("readability", _analyze_readability),
+    ("repetition", _analyze_repetition),
+    ("ai_rewrites", _analyze_ai_rewrites),
+)
+ANALYZER_NAMES = tuple(name for name, _ in ANALYZERS)
+
+# What runs when the caller doesn't choose. Repetition has to be asked for:
+# it is the slowest analyzer, and its findings count against the score.
+DEFAULT_ANALYZERS = tuple(name for name in ANALYZER_NAMES if name != "repetition")
+
+# Analyzers that walk the word positions; when none of them is selected
+# the words are only counted, never materialized
+WORD_ANALYZERS = {"correctness", "engagement", "repetition"}
+
+def select_analyzers(names):
+    """Validate an analyzer selection (list or comma separated string); None means DEFAULT_ANALYZERS"""
+    if names is None or names == "":
+        return None
+    if isinstance(names, str):
+        names = names.split(",")
+    selected = {str(name).strip() for name in names if str(name).strip()}
+    unknown = selected - set(ANALYZER_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown analyzers: {', '.join(sorted(unknown))}. "
+                         f"Available: {', '.join(ANALYZER_NAMES)}")
+    return [name for name in ANALYZER_NAMES if name in selected]
+
+def _timing_insights(word_count):
+    return {
+        "reading_time": max(1, word_count // 200),  # Average reading speed: 200 words per minute
+        "speaking_time": max(1, word_count // 150)  # Average speaking speed: 150 words per minute
+    }
+
+def document_insights(text, pack=None):
+    """Counts, reading time and tone only: the fast path behind mode=insights"""
+    pack = pack or load_pack()
+    started = time.monotonic()
+    
+    if not text.strip():
+        empty = empty_check_result()
+        return {"document_insights": empty["document_insights"], "analysis": empty["analysis"]}
+    
+    word_count, sentence_count = count_words_and_sentences(text)
+    tone = detect_tone(text, pack)
+    
+    return {
+        "document_insights": {
+            "word_count": word_count,
+            "character_count": len(text),
+            "sentence_count": sentence_count,
+            **_timing_insights(word_count),
+            "tone": tone
+        },
+        "analysis": {
+            "complete": True,
+            "completed": ["tone"],
+            "truncated": [],
+            "skipped": [],
+            "elapsed_ms": int((time.monotonic() - started) * 1000)
+        }
+    }
+
+def check_text(text, pack=None, ruleset=None, should_stop=None, time_budget=None, analyzers=None,
+               max_hits_per_rule=MAX_HITS_PER_RULE):
+    """Run the grammar analysis and return the /check payload.
+
+    ``analyzers`` picks a subset of ANALYZER_NAMES; the default is
+    DEFAULT_ANALYZERS.
+    Each pattern rule lists at most ``max_hits_per_rule`` matches in
+    ``errors``; ``aggregated_hits`` gives the full count of the rest and the
+    cursor for rule_hits().
+    ``time_budget`` (seconds) bounds the analysis: analyzers run in
+    priority order and whatever finished before the deadline is returned,
+    with the ``analysis`` section listing truncated and skipped analyzers.
+    ``should_stop`` is polled along the way; when it returns True the check
+    is abandoned with AnalysisCancelled.
+    The budget covers tokenizing too. If it runs out before the whole text
+    is read, the word and sentence counts cover only the part that was, and
+    the word analyzers report as truncated.
+    """
+    budget = Budget(time_budget, should_stop)
+    pack = pack or load_pack()
+    ruleset = ruleset or get_ruleset(pack)
+    
+    if not text.strip():
+        return empty_check_result()
+    
+    selected = set(analyzers) if analyzers is not None else set(DEFAULT_ANALYZERS)
+    
+    # Calculate basic metrics from the words and their positions; when no
+    # analyzer walks the words they are only counted, never materialized
+    word_matches, word_count, sentence_count, complete = _read_words(text, budget, bool(selected & WORD_ANALYZERS))
+    
+    state = _CheckState(text, pack, ruleset, word_matches, word_count, max_hits_per_rule, complete)
+    return _run_analyzers(state, selected, budget, sentence_count)
+
+def _read_words(text, budget, keep):
+    """Tokenize text a chunk at a time, stopping once the budget runs out.
+
+    Returns (word matches or None unless keep, word count, sentence count,
+    whether the whole text was read).
+    """
+    word_matches = [] if keep else None
+    word_count = 0
+    terminators = 0
+    for start, end in chunk_spans(text, TEXT_CHUNK):
+        if budget.expired():
+            return word_matches, word_count, max(1, terminators), False
+        if keep:
+            word_matches.extend(WORD_PATTERN.finditer(text, start, end))
+            word_count = len(word_matches)
+        else:
+            word_count += sum(1 for _ in WORD_PATTERN.finditer(text, start, end))
+        terminators += sum(1 for _ in SENTENCE_END_PATTERN.finditer(text, start, end))
+    return word_matches, word_count, max(1, terminators), True
+
+def _run_analyzers(state, selected, budget, sentence_count):
+    """Run the selected analyzers over a prepared state and build the /check payload"""
+    completed, truncated, skipped = [], [], []
+    for name, analyzer in ANALYZERS:
+        if name not in selected:
+            continue
+        # The top priority analyzer always gets a chance to report something
+        if (completed or truncated) and budget.expired():
+            skipped.append(name)
+        elif analyzer(state, budget):
+            completed.append(name)
+        else:
+            truncated.append(name)
+    
+    errors = state.errors
+    correctness_errors = state.counts["correctness"]
+    clarity_suggestions = state.counts["clarity"]
+    engagement_suggestions = state.counts["engagement"]
+    delivery_suggestions = state.counts["delivery"]
+    
+    # Calculate grammar score based on number and type of errors
+    total_errors = correctness_errors + clarity_suggestions + engagement_suggestions + delivery_suggestions
+    
+    if total_errors == 0:
+        score = 100
+    else:
+        # Weight different types of errors differently
+        weighted_score = (
+            correctness_errors * 20 +  # Most important
+            clarity_suggestions * 15 +
+            delivery_suggestions * 10 +
+            engagement_suggestions * 5   # Least critical
+        )
+        score = max(30, 100 - weighted_score)
+    
+    # Categorize suggestions by type for better organization
+    categorized_suggestions = {
+        "correctness": [],
+        "clarity": [],
+        "engagement": [],
+        "delivery": []
+    }
+    
+    for error in errors:
+        category = error["type"]
+        categorized_suggestions[category].append({
+            "word": error["word"],
+            "suggestions": error["suggestions"],
+            "message": error["message"]
+        })
+    
+    # Add sentence variety suggestions to delivery
+    for suggestion in state.sentence_variety_suggestions:
+        categorized_suggestions[suggestion["type"]].append({
+            "word": "Sentence structure",
+            "suggestions": [suggestion["suggestion"]],
+            "message": suggestion["message"]
+        })
+    
+    return {
+        "score": score,
+        "suggestions": state.suggestions,
+        "errors": errors,  # Enhanced with color information
+        "aggregated_hits": state.aggregated_hits(),
+        "categorized_suggestions": categorized_suggestions,
+        "document_insights": {
+            "word_count": state.word_count,
+            "character_count": len(state.text),
+            "sentence_count": sentence_count,
+            **_timing_insights(state.word_count),
+            "tone": state.tone,
+            "readability": state.readability,
+            "correctness_errors": correctness_errors,
+            "clarity_suggestions": clarity_suggestions,
+            "engagement_suggestions": engagement_suggestions,
+            "delivery_suggestions": delivery_suggestions
+        },
+        "advanced_features": {
+            "tone_detection": state.tone,
+            "ai_rewrites": state.ai_rewrites,
+            "conciseness_suggestions": state.family_count("conciseness"),
+            "passive_voice_instances": state.passive_voice_instances,
+            "repetitions": state.repetitions,
+            "sentence_variety_score": 85 if len(state.sentence_variety_suggestions) == 0 else 70
+        },
+        "analysis": {
+            "complete": not truncated and not skipped,
+            "completed": completed,
+            "truncated": truncated,
+            "skipped": skipped,
+            "elapsed_ms": budget.elapsed_ms()
+        }
+    }
+
+# Paragraph findings by (ruleset version, paragraph digest), so a paragraph
+# that is unchanged between revisions is never matched against the rules twice
+_paragraph_cache = LRUCache(maxsize=4096)
+
+class _Span:
+    """A cached match moved back into the document; quacks like the re.Match analyzers expect"""
+    __slots__ = ("_word", "_start", "_end")
+
+    def __init__(self, word, start, end):
+        self._word = word
+        self._start = start
+        self._end = end
+
+    def group(self):
+        return self._word
+
+    def start(self):
+        return self._start
+
+    def end(self):
+        return self._end
+
+def paragraph_findings(paragraph, pack, ruleset):
+    """What the word and pattern analyzers match in one paragraph, offsets relative to it.
+
+    Only words the ruleset has suggestions for are kept, since the
+    correctness and engagement analyzers skip every other word.
+    """
+    rules, vocabulary = ruleset.grammar_rules, ruleset.vocabulary
+    word_count = 0
+    candidates = []
+    for match in iter_words(paragraph):
+        word_count += 1
+        word_lower = match.group().lower()
+        if word_lower in rules or word_lower in vocabulary:
+            candidates.append((match.group(), match.start(), match.end()))
+    patterns = {}
+    for rule in pattern_rules(pack):
+        found = [(match.group(), match.start(), match.end()) for match in rule.pattern.finditer(paragraph)]
+        if found:
+            patterns[rule.id] = found
+    return {
+        "word_count": word_count,
+        "terminators": sum(1 for _ in SENTENCE_END_PATTERN.finditer(paragraph)),
+        "words": candidates,
+        "house_style": [(match.group(), match.start(), match.end(), replacement)
+                        for match, replacement in ruleset.house_style_matches(paragraph)],
+        "patterns": patterns
+    }
+
+class _ParagraphCheckState(_CheckState):
+    """Check state that reads matches from cached paragraph findings instead of rescanning"""
+
+    def __init__(self, text, pack, ruleset, paragraphs, word_matches, max_hits_per_rule, paragraphs_complete=True,
+                 words_complete=True):
+        word_count = sum(findings["word_count"] for _, findings in paragraphs)
+        super().__init__(text, pack, ruleset, word_matches, word_count, max_hits_per_rule,
+                         paragraphs_complete and words_complete)
+        self.paragraphs = paragraphs
+        self.paragraphs_complete = paragraphs_complete
+
+    def pattern_matches(self, rule):
+        for offset, findings in self.paragraphs:
+            for word, start, end in findings["patterns"].get(rule.id, ()):
+                yield _Span(word, offset + start, offset + end)
+
+    def house_style_matches(self):
+        for offset, findings in self.paragraphs:
+            for phrase, start, end, replacement in findings["house_style"]:
+                yield _Span(phrase, offset + start, offset + end), replacement
+
+    def run_pattern_rules(self, rules, budget):
+        # Paragraphs left unscanned when the budget ran out have no matches to give
+        return super().run_pattern_rules(rules, budget) and self.paragraphs_complete
+
+def check_paragraphs(text, pack=None, ruleset=None, analyzers=None, max_hits_per_rule=MAX_HITS_PER_RULE,
+                     budget=None):
+    """check_text() that reuses the rule matches of paragraphs it has seen before.
+
+    Word and pattern matches are cached per paragraph, so checking a new
+    revision of a document only scans the paragraphs that changed. The
+    document level analyzers (delivery's sentence variety, tone,
+    readability, repetition) still read the whole text, and duplicates are
+    still suppressed across the whole document, so the result is the same
+    as check_text() for the same analyzers, except that a pattern match
+    spanning a blank line is not reported.
+    ``budget`` bounds the check the way time_budget does for check_text().
+    Paragraphs not yet scanned when it runs out are left out, and the
+    analyzers that needed them report as truncated.
+    Returns the payload and {"paragraphs", "scanned"} counts.
+    """
+    budget = budget or Budget()
+    pack = pack or load_pack()
+    ruleset = ruleset or get_ruleset(pack)
+    if not text.strip():
+        return empty_check_result(), {"paragraphs": 0, "scanned": 0}
+    
+    selected = set(analyzers) if analyzers is not None else set(DEFAULT_ANALYZERS)
+    paragraphs = []
+    scanned = 0
+    complete = True
+    for start, end in paragraph_spans(text):
+        if budget.expired():
+            complete = False
+            break
+        # Without the trailing break, so the last paragraph matches itself once text follows it
+        paragraph = text[start:end].rstrip()
+        key = (ruleset.version, hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).digest())
+        findings = _paragraph_cache.get(key)
+        if findings is None:
+            findings = paragraph_findings(paragraph, pack, ruleset)
+            _paragraph_cache.put(key, findings)
+            scanned += 1
+        paragraphs.append((start, findings))
+    
+    words_complete = True
+    if "repetition" in selected and complete:
+        # Repetition compares every word with every other, so it needs them all
+        word_matches, _, sentence_count, words_complete = _read_words(text, budget, True)
+    else:
+        word_matches = [_Span(word, offset + start, offset + end)
+                        for offset, findings in paragraphs for word, start, end in findings["words"]]
+        # No terminator run crosses a paragraph break, so the paragraphs' counts add up
+        sentence_count = max(1, sum(findings["terminators"] for _, findings in paragraphs))
+    state = _ParagraphCheckState(text, pack, ruleset, paragraphs, word_matches, max_hits_per_rule, complete,
+                                 words_complete)
+    result = _run_analyzers(state, selected, budget, sentence_count)
+    return result, {"paragraphs": len(paragraphs), "scanned": scanned}
+
+def auto_fix(text, pack=None, ruleset=None):
+    """Apply the first suggestion for every fixable issue and return the /auto_fix payload"""
+    pack = pack or load_pack()
+    ruleset = ruleset or get_ruleset(pack)
+    
+    if not text.strip():
+        return {
+            "original": text,
+            "fixed": text,
+            "changes": []
+        }
+    
+    fixed_text = text
+    changes = []
+    
+    # Fix spelling/grammar errors
+    for word in tokenize_words(text):
+        word_lower = word.lower()
+        if word_lower in ruleset.grammar_rules:
+            replacement = ruleset.grammar_rules[word_lower][0]  # Use first suggestion
+            fixed_text = re.sub(r'\b' + re.escape(word) + r'\b', replacement, fixed_text, count=1)
+            changes.append({
+                "original": word,
+                "fixed": replacement,
+                "type": "spelling",
+                "position": text.find(word)
+            })
+    
+    # Apply house style replacements
+    for match, replacement in list(ruleset.house_style_matches(fixed_text)):
+        original_phrase = match.group()
+        fixed_text = fixed_text.replace(original_phrase, replacement, 1)
+        changes.append({
+            "original": original_phrase,
+            "fixed": replacement,
+            "type": "house_style",
+            "position": match.start()
+        })
+    
+    # Fix conciseness issues
+    for pattern, replacement in pack.conciseness_patterns:
+        matches = list(pattern.finditer(fixed_text))
+        for match in matches:
+            original_phrase = match.group()
+            fixed_text = fixed_text.replace(original_phrase, replacement, 1)
+            changes.append({
+                "original": original_phrase,
+                "fixed": replacement,
+                "type": "conciseness",
+                "position": match.start()
+            })
+    
+    return {
+        "original": text,
+        "fixed": fixed_text,
+        "changes": changes,
+        "total_fixes": len(changes)
+    }
@@ -0,0 +1,115 @@
+import json
+import time
+from src.analysis.checker import check_paragraphs, Budget, DEFAULT_ANALYZERS, MAX_HITS_PER_RULE
+from src.analysis.diff import WordDiff, DIFF_TIMEOUT
+from src.analysis.rewrite import get_rewrite_service
+from src.analysis.shared_cache import get_shared_cache, cache_key
+
+# The AI rewrites say nothing about what changed, so a comparison leaves
+# them out unless asked, along with the opt-in repetition analyzer
+COMPARE_ANALYZERS = [name for name in DEFAULT_ANALYZERS if name != "ai_rewrites"]
+
+def _delta(old, new):
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)) \
+            and not isinstance(old, bool) and not isinstance(new, bool):
+        return {"old": old, "new": new, "delta": round(new - old, 2)}
+    return {"old": old, "new": new, "changed": old != new}
+
+def _deltas(old, new):
+    """Old, new and delta for each scalar in two insight sections; lists are left out"""
+    deltas = {}
+    for key in old.keys() | new.keys():
+        old_value, new_value = old.get(key), new.get(key)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            deltas[key] = _deltas(old_value, new_value)
+        elif not isinstance(old_value, list) and not isinstance(new_value, list):
+            deltas[key] = _delta(old_value, new_value)
+    return dict(sorted(deltas.items()))
+
+def _check_revision(text, pack, ruleset, analyzers, max_hits_per_rule, budget):
+    """check_paragraphs() through the shared cache.
+
+    Reviewers step through drafts, so the old side of a comparison is
+    usually the new side of the previous one, checked on any worker.
+    Results cut short by the budget are not stored.
+    """
+    cache = get_shared_cache()
+    key = cache_key("compare_revision", ruleset.version, get_rewrite_service().provider.identity,
+                    ",".join(analyzers), max_hits_per_rule, text)
+    cached = cache.get(key)
+    if cached is not None:
+        entry = json.loads(cached)
+        return entry["result"], {"paragraphs": entry["paragraphs"], "scanned": 0, "cached": True}
+    result, stats = check_paragraphs(text, pack, ruleset, analyzers, max_hits_per_rule, budget)
+    if result["analysis"]["complete"]:
+        cache.put(key, json.dumps({"result": result, "paragraphs": stats["paragraphs"]}).encode("utf-8"))
+    return result, {**stats, "cached": False}
+
+def _error_changes(diff, old_errors, new_errors):
+    """Split errors into resolved (old only), introduced (new only) and an unchanged count.
+
+    An old error carries over when its whole span is unchanged text and the
+    same rule reports the span at its new position.
+    """
+    new_by_span = {(error["rule"], error["start"], error["end"]): error for error in new_errors}
+    carried = set()
+    resolved = []
+    for error in old_errors:
+        moved = diff.map_span(error["start"], error["end"])
+        match = new_by_span.get((error["rule"], *moved)) if moved else None
+        if match is None:
+            resolved.append(error)
+        else:
+            carried.add(match["id"])
+    return {
+        "resolved": resolved,
+        "introduced": [error for error in new_errors if error["id"] not in carried],
+        "unchanged": len(carried)
+    }
+
+def _merged(first, second):
+    return first + [name for name in second if name not in first]
+
+def compare_texts(old, new, pack, ruleset, analyzers=None, max_hits_per_rule=MAX_HITS_PER_RULE, time_budget=None):
+    """Diff two revisions of a document and report how the check results moved.
+
+    Both versions go through check_paragraphs(), so paragraphs the two
+    share, or that an earlier comparison already saw, are not rescanned,
+    and a version compared before is not checked again at all.
+    Errors in "introduced" carry ids for the new text, ready for
+    /apply_fixes.
+    ``time_budget`` (seconds) bounds the diff and both checks together. As
+    with check_text(), whatever finished in time is returned and the
+    ``analysis`` section lists the analyzers truncated or skipped on
+    either side; the score and error deltas are then partial too, and the
+    diff comes without its word counts.
+    """
+    started = time.monotonic()
+    budget = Budget(time_budget)
+    analyzers = COMPARE_ANALYZERS if analyzers is None else analyzers
+    remaining = budget.remaining()
+    diff = WordDiff(old, new, DIFF_TIMEOUT if remaining is None else min(DIFF_TIMEOUT, remaining))
+    old_result, old_stats = _check_revision(old, pack, ruleset, analyzers, max_hits_per_rule, budget)
+    new_result, new_stats = _check_revision(new, pack, ruleset, analyzers, max_hits_per_rule, budget)
+    old_analysis, new_analysis = old_result["analysis"], new_result["analysis"]
+    complete = old_analysis["complete"] and new_analysis["complete"]
+    # A complete check has counted the old text's words already
+    diff_stats = diff.stats(old_result["document_insights"]["word_count"]) if complete else {}
+
+    return {
+        "diff": {**diff_stats, "changes": diff.changes()},
+        "score": _delta(old_result["score"], new_result["score"]),
+        "insights": _deltas(old_result["document_insights"], new_result["document_insights"]),
+        "features": _deltas(old_result["advanced_features"], new_result["advanced_features"]),
+        "errors": _error_changes(diff, old_result["errors"], new_result["errors"]),
+        "analysis": {
+            "analyzers": list(analyzers),
+            "complete": complete,
+            "truncated": _merged(old_analysis["truncated"], new_analysis["truncated"]),
+            "skipped": _merged(old_analysis["skipped"], new_analysis["skipped"]),
+            "paragraphs": old_stats["paragraphs"] + new_stats["paragraphs"],
+            "reanalyzed_paragraphs": old_stats["scanned"] + new_stats["scanned"],
+            "cached_revisions": old_stats["cached"] + new_stats["cached"],
+            "elapsed_ms": int((time.monotonic() - started) * 1000)
+        }
+    }
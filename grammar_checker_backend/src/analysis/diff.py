@@ -0,0 +1,360 @@
+"""Word level diff between two revisions of a document.
+
+Both texts are split into words and punctuation marks, and each distinct
+token is mapped to an integer id. Tokens that occur exactly once on each
+side are aligned first, along their longest increasing run (patience
+diff). This anchors moved or rewritten passages the way a reader expects.
+The gaps between anchors are diffed with Myers' algorithm in its
+linear-space form. The middle snake of the shortest edit path is found
+from both ends at once and each half is then solved on its own. Memory
+stays O(N + M) and time O((N + M) D) for D edited tokens, so two long
+drafts with a few edits cost about one pass over them. Heavily rewritten
+texts make D large. For those a deadline bounds the search, and whatever
+is left unsolved when it passes is reported as replaced.
+"""
+import re
+import time
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+
+from src.analysis.tokenizer import WORD_PATTERN
+
+# Words as the checker sees them, plus any other non-space character on its own
+DIFF_TOKEN = re.compile(rf"({WORD_PATTERN.pattern})|\S")
+
+def _common_prefix(a, b):
+    """Length of the common prefix, by binary search over slice comparisons done in C"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.startswith(b[:mid]):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.endswith(b[len(b) - mid:]):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+class Tokens:
+    """The diff tokens of text[lo:hi]: ids, character spans and which ones are words"""
+
+    def __init__(self, text, vocabulary, lo=0, hi=None):
+        self.text = text
+        self.hi = len(text) if hi is None else hi
+        self.ids = []
+        self.starts = []
+        self.ends = []
+        self.is_word = []
+        for match in DIFF_TOKEN.finditer(text, lo, self.hi):
+            token = match.group()
+            token_id = vocabulary.get(token)
+            if token_id is None:
+                token_id = vocabulary[token] = len(vocabulary)
+            self.ids.append(token_id)
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+            self.is_word.append(match.group(1) is not None)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def span(self, lo, hi):
+        """Character span of tokens [lo, hi); an empty range gives the point where they would go"""
+        if lo < hi:
+            return self.starts[lo], self.ends[hi - 1]
+        point = self.starts[lo] if lo < len(self.ids) else self.hi
+        return point, point
+
+    def words(self, lo, hi):
+        return sum(self.is_word[lo:hi])
+
+    def index_containing(self, offset):
+        """Index of the token that covers character offset, or None for whitespace"""
+        i = bisect_right(self.starts, offset) - 1
+        return i if i >= 0 and offset < self.ends[i] else None
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, deadline=None):
+    """Where the shortest edit path between a[alo:ahi] and b[blo:bhi] crosses its middle.
+
+    Walks the forward and reverse furthest-reaching D-paths in step until
+    they overlap, keeping only one diagonal array per direction. Returns
+    None when there is no common token or the deadline passes first.
+    """
+    n, m = ahi - alo, bhi - blo
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    size = 2 * max_d + 3
+    forward = [-1] * size
+    reverse = [-1] * size
+    forward[offset + 1] = 0
+    reverse[offset + 1] = 0
+    delta = n - m
+    # With an odd delta the paths meet while extending forward, else in reverse
+    odd = delta % 2 != 0
+    k1_start = k1_end = k2_start = k2_end = 0
+    for d in range(max_d):
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif odd:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < size and reverse[k2_offset] != -1 and x1 >= n - reverse[k2_offset]:
+                    return alo + x1, blo + y1
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and reverse[k2_offset - 1] < reverse[k2_offset + 1]):
+                x2 = reverse[k2_offset + 1]
+            else:
+                x2 = reverse[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - x2 - 1] == b[bhi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            reverse[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not odd:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    y1 = x1 - (k1_offset - offset)
+                    if x1 >= n - x2:
+                        return alo + x1, blo + y1
+    return None
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Pairs (i, j) of tokens unique on both sides, along their longest increasing run"""
+    counts = {}
+    for i in range(alo, ahi):
+        seen = counts.get(a[i])
+        counts[a[i]] = [i, -1] if seen is None else [-1, -1]
+    for j in range(blo, bhi):
+        seen = counts.get(b[j])
+        if seen is not None and seen[0] != -1:
+            # -1: not yet seen in b; -2: seen more than once
+            seen[1] = j if seen[1] == -1 else -2
+    pairs = sorted((i, j) for i, j in counts.values() if i >= 0 and j >= 0)
+    if not pairs:
+        return []
+
+    # Patience sorting: tails[k] is the pair ending the best run of length k + 1
+    tails = []
+    tail_js = []
+    previous = [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tail_js, j)
+        previous[index] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(index)
+            tail_js.append(j)
+        else:
+            tails[k] = index
+            tail_js[k] = j
+    run = []
+    index = tails[-1]
+    while index is not None:
+        run.append(pairs[index])
+        index = previous[index]
+    run.reverse()
+    return run
+
+def matching_blocks(a, b, timeout=None):
+    """Sorted (i, j, size) runs where a[i:i + size] == b[j:j + size], ending with (len(a), len(b), 0).
+
+    After timeout seconds the ranges still being searched are left unmatched.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    found = []
+    # (use_patience, alo, ahi, blo, bhi); a stack rather than recursion so
+    # deeply nested edits cannot hit the recursion limit
+    pending = [(True, 0, len(a), 0, len(b))]
+    while pending:
+        patience, alo, ahi, blo, bhi = pending.pop()
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            found.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if ahi < end:
+            found.append((ahi, bhi, end - ahi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        if patience:
+            anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+            if anchors:
+                i_prev, j_prev = alo, blo
+                for i, j in anchors:
+                    found.append((i, j, 1))
+                    pending.append((True, i_prev, i, j_prev, j))
+                    i_prev, j_prev = i + 1, j + 1
+                pending.append((True, i_prev, ahi, j_prev, bhi))
+                continue
+
+        split = _middle_snake(a, alo, ahi, b, blo, bhi, deadline)
+        if split is not None:
+            x, y = split
+            pending.append((False, alo, x, blo, y))
+            pending.append((False, x, ahi, y, bhi))
+
+    # Join runs that touch
+    blocks = []
+    for i, j, size in sorted(found):
+        if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+            blocks[-1] = (blocks[-1][0], blocks[-1][1], blocks[-1][2] + size)
+        else:
+            blocks.append((i, j, size))
+    blocks.append((len(a), len(b), 0))
+    return blocks
+
+def opcodes(blocks):
+    """(tag, i1, i2, j1, j2) steps turning a into b, as in difflib: equal, replace, delete, insert"""
+    steps = []
+    i = j = 0
+    for block_i, block_j, size in blocks:
+        if i < block_i and j < block_j:
+            steps.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            steps.append(("delete", i, block_i, j, j))
+        elif j < block_j:
+            steps.append(("insert", i, i, j, block_j))
+        if size:
+            steps.append(("equal", block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+    return steps
+
+# Seconds the edit path search may take before the rest is called replaced
+DIFF_TIMEOUT = 1.0
+
+class WordDiff:
+    """Word level diff of two texts.
+
+    Revisions usually share most of their start and end, so the common
+    prefix and suffix are found with plain string comparison first and only
+    the stretch between them is tokenized and diffed. Both cuts fall on
+    whitespace, so no token is split.
+    """
+
+    def __init__(self, old, new, timeout=DIFF_TIMEOUT):
+        prefix = _common_prefix(old, new)
+        while prefix and not old[prefix - 1].isspace():
+            prefix -= 1
+        suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+        while suffix and not old[len(old) - suffix].isspace():
+            suffix -= 1
+        self.prefix = prefix
+        self.old_suffix = len(old) - suffix
+        self.shift = len(new) - len(old)
+
+        vocabulary = {}
+        self.old = Tokens(old, vocabulary, prefix, self.old_suffix)
+        self.new = Tokens(new, vocabulary, prefix, len(new) - suffix)
+        self.opcodes = opcodes(matching_blocks(self.old.ids, self.new.ids, timeout))
+
+    def changes(self):
+        """Every inserted, deleted or replaced stretch, with its spans in both texts"""
+        changes = []
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            if tag == "equal":
+                continue
+            old_start, old_end = self.old.span(i1, i2)
+            new_start, new_end = self.new.span(j1, j2)
+            changes.append({
+                "type": tag,
+                "old_start": old_start,
+                "old_end": old_end,
+                "new_start": new_start,
+                "new_end": new_end,
+                "old_text": self.old.text[old_start:old_end],
+                "new_text": self.new.text[new_start:new_end]
+            })
+        return changes
+
+    @cached_property
+    def shared_words(self):
+        """Words in the untouched prefix and suffix, the same on both sides"""
+        return len(WORD_PATTERN.findall(self.old.text, 0, self.prefix)) + \
+            len(WORD_PATTERN.findall(self.old.text, self.old_suffix))
+
+    def stats(self, old_words=None):
+        """Word counts and similarity; pass the old text's word count if known to skip counting the shared part"""
+        shared_words = self.shared_words if old_words is None else old_words - self.old.words(0, len(self.old))
+        unchanged = shared_words + sum(self.old.words(i1, i2)
+                                       for tag, i1, i2, _, _ in self.opcodes if tag == "equal")
+        old_words = shared_words + self.old.words(0, len(self.old))
+        new_words = shared_words + self.new.words(0, len(self.new))
+        return {
+            "old_words": old_words,
+            "new_words": new_words,
+            "words_unchanged": unchanged,
+            "words_removed": old_words - unchanged,
+            "words_added": new_words - unchanged,
+            "similarity": round(2 * unchanged / (old_words + new_words), 4) if old_words + new_words else 1.0
+        }
+
+    @cached_property
+    def token_map(self):
+        """For each old token, the index of the same token in the new text, or None if it changed"""
+        mapping = [None] * len(self.old)
+        for tag, i1, i2, j1, _ in self.opcodes:
+            if tag == "equal":
+                mapping[i1:i2] = range(j1, j1 + i2 - i1)
+        return mapping
+
+    def map_span(self, start, end):
+        """Where old[start:end] ended up in the new text, or None if any token in it changed"""
+        if end <= self.prefix:
+            return start, end
+        if start >= self.old_suffix:
+            return start + self.shift, end + self.shift
+        # The part inside the diffed stretch must carry over token for token,
+        # and stay attached to the shared prefix or suffix it reaches into
+        first = 0 if start < self.prefix else self.old.index_containing(start)
+        last = len(self.old) - 1 if end > self.old_suffix else self.old.index_containing(end - 1)
+        if first is None or last is None:
+            return None
+        moved = self.token_map[first:last + 1]
+        if not moved or None in moved or moved[-1] - moved[0] != len(moved) - 1:
+            return None
+        if start < self.prefix:
+            if moved[0] != 0:
+                return None
+            new_start = start
+        else:
+            new_start = self.new.starts[moved[0]] + start - self.old.starts[first]
+        if end > self.old_suffix:
+            if moved[-1] != len(self.new) - 1:
+                return None
+            new_end = end + self.shift
+        else:
+            new_end = self.new.starts[moved[-1]] + end - self.old.starts[last]
+        return new_start, new_end
@@ -0,0 +1,124 @@
+import hashlib
+from src.analysis.paraphrase import match_case
+
+# Rule families whose first suggestion is a drop-in replacement; the others
+# ("clarity", "passive_voice") only describe the problem, so applying them
+# needs an explicit replacement from the caller
+FIXABLE_FAMILIES = {"correctness", "house_style", "engagement", "conciseness"}
+
+_ERROR_KEYS = ("id", "rule", "word", "start", "end", "suggestions")
+
+class FixConflict(ValueError):
+    """Raised when fixes refer to spans that no longer match the text"""
+
+    def __init__(self, message, ids):
+        super().__init__(message)
+        self.ids = ids
+
+def error_id(rule, start, word):
+    """Stable id of an error: the same rule matching the same text at the same offset"""
+    digest = hashlib.blake2b(f"{rule}\0{start}\0{word}".encode("utf-8"), digest_size=8)
+    return digest.hexdigest()
+
+def _family(rule):
+    return rule.split(":", 1)[0]
+
+def _replacement_for(error, fix):
+    if fix.get("replacement") is not None:
+        return str(fix["replacement"])
+    family = _family(error["rule"])
+    if family in FIXABLE_FAMILIES and error["suggestions"]:
+        # House style entries are exact spellings; the rest follow the text's case
+        if family == "house_style":
+            return error["suggestions"][0]
+        return match_case(error["suggestions"][0], error["word"])
+    raise ValueError(f"Error {error['id']} ({error['rule']}) needs an explicit replacement")
+
+def apply_fixes(text, errors, fixes):
+    """Apply a chosen subset of /check errors to text in a single splice.
+
+    errors is the list returned by /check (or the client's current copy of
+    it) and fixes a list of error ids or {"id", "replacement"} objects.
+    Spans outside the text are a ValueError. Every fixed span must still
+    read as reported and carry its original id, otherwise FixConflict is
+    raised and nothing is applied. The errors that were not applied come
+    back with offsets (and so ids) moved to the new text; those
+    overlapping an applied fix are dropped as invalidated.
+    """
+    for error in errors:
+        if not isinstance(error, dict) or not all(key in error for key in _ERROR_KEYS) \
+                or not isinstance(error["start"], int) or not isinstance(error["end"], int):
+            raise ValueError("Each error needs id, rule, word, start and end as returned by /check")
+        if not 0 <= error["start"] <= error["end"] <= len(text):
+            raise ValueError(f"Error {error['id']} has span {error['start']}-{error['end']} outside the text "
+                             f"(0-{len(text)})")
+    by_id = {error["id"]: error for error in errors}
+    chosen = {}
+    for fix in fixes:
+        fix = fix if isinstance(fix, dict) else {"id": fix}
+        if not isinstance(fix.get("id"), str) or fix["id"] not in by_id:
+            raise ValueError(f"Unknown error id: {fix.get('id')}")
+        chosen[fix["id"]] = fix
+
+    conflicts = []
+    for fix_id in chosen:
+        error = by_id[fix_id]
+        start, end, word = error["start"], error["end"], error["word"]
+        if text[start:end] != word or error_id(error["rule"], start, word) != fix_id:
+            conflicts.append(fix_id)
+    if conflicts:
+        raise FixConflict("Some fixes refer to text that has changed", conflicts)
+
+    edits = sorted(((by_id[fix_id], _replacement_for(by_id[fix_id], fix)) for fix_id, fix in chosen.items()),
+                   key=lambda edit: edit[0]["start"])
+    for (previous, _), (current, _) in zip(edits, edits[1:]):
+        if current["start"] < previous["end"]:
+            raise FixConflict("Fixes overlap", [previous["id"], current["id"]])
+
+    # One pass over the text: copy the untouched stretches, splice in replacements
+    parts = []
+    applied = []
+    position = 0
+    shift = 0
+    for error, replacement in edits:
+        parts.append(text[position:error["start"]])
+        parts.append(replacement)
+        position = error["end"]
+        new_start = error["start"] + shift
+        applied.append({
+            "id": error["id"],
+            "original": error["word"],
+            "replacement": replacement,
+            "start": new_start,
+            "end": new_start + len(replacement)
+        })
+        shift += len(replacement) - (error["end"] - error["start"])
+    parts.append(text[position:])
+
+    # Walk the remaining errors and the edits together, carrying the offset shift
+    remaining = []
+    invalidated = []
+    shift = 0
+    next_edit = 0
+    for error in sorted((e for e in errors if e["id"] not in chosen), key=lambda e: e["start"]):
+        while next_edit < len(edits) and edits[next_edit][0]["end"] <= error["start"]:
+            edit, replacement = edits[next_edit]
+            shift += len(replacement) - (edit["end"] - edit["start"])
+            next_edit += 1
+        if next_edit < len(edits) and edits[next_edit][0]["start"] < error["end"]:
+            invalidated.append(error["id"])
+            continue
+        start = error["start"] + shift
+        remaining.append({
+            **error,
+            "id": error_id(error["rule"], start, error["word"]),
+            "start": start,
+            "end": error["end"] + shift
+        })
+
+    return {
+        "text": "".join(parts),
+        "applied": applied,
+        "errors": remaining,
+        "invalidated": invalidated
+    }
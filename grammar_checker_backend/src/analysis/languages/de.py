@@ -0,0 +1,73 @@
+# German rule pack
+
+GRAMMAR_RULES = {
+    # Spelling errors
+    'standart': ['Standard'],
+    'seperat': ['separat'],
+    'vorraus': ['voraus'],
+    'wiederspiegeln': ['widerspiegeln'],
+    'addresse': ['Adresse'],
+    'entgültig': ['endgültig'],
+    'poblem': ['Problem'],
+    'garnicht': ['gar nicht'],
+    'nähmlich': ['nämlich'],
+    'rythmus': ['Rhythmus']
+}
+
+# Vocabulary enhancement suggestions
+VOCABULARY_ENHANCEMENT = {
+    'sehr': ['äußerst', 'außerordentlich', 'besonders', 'überaus'],
+    'gut': ['hervorragend', 'ausgezeichnet', 'vorzüglich', 'erstklassig'],
+    'schlecht': ['mangelhaft', 'dürftig', 'miserabel', 'ungenügend'],
+    'groß': ['enorm', 'gewaltig', 'riesig', 'beträchtlich'],
+    'klein': ['winzig', 'gering', 'kompakt', 'bescheiden'],
+    'sagen': ['erklären', 'äußern', 'betonen', 'mitteilen'],
+    'machen': ['erstellen', 'erzeugen', 'anfertigen', 'durchführen'],
+    'sache': ['Gegenstand', 'Angelegenheit', 'Aspekt', 'Element'],
+    'schnell': ['rasch', 'zügig', 'flink', 'umgehend'],
+    'schön': ['reizvoll', 'prächtig', 'wunderbar', 'ansprechend']
+}
+
+# Clarity improvement patterns
+CLARITY_PATTERNS = {
+    r'\bsehr\s+sehr\b': 'Redundante Verstärkung',
+    r'\bum\s+zu\s+können\b': 'Kann zu "um zu" vereinfacht werden',
+    r'\baufgrund\s+der\s+Tatsache\s+,?\s*dass\b': 'Kann zu "weil" vereinfacht werden',
+    r'\bzum\s+jetzigen\s+Zeitpunkt\b': 'Kann zu "jetzt" vereinfacht werden',
+    r'\bim\s+Falle\s+,?\s*dass\b': 'Kann zu "falls" vereinfacht werden'
+}
+
+# Passive voice patterns
+PASSIVE_VOICE_PATTERNS = [
+    r'\b(wird|werden|wurde|wurden|worden)\s+(\w+\s+){0,3}ge\w+(t|en)\b'
+]
+
+# Tone indicators
+TONE_INDICATORS = {
+    'formal': ['darüber hinaus', 'folglich', 'demzufolge', 'infolgedessen', 'dennoch'],
+    'informal': ['okay', 'cool', 'krass', 'geil', 'na ja'],
+    'confident': ['sicherlich', 'zweifellos', 'eindeutig', 'definitiv', 'selbstverständlich'],
+    'tentative': ['vielleicht', 'eventuell', 'möglicherweise', 'vermutlich', 'könnte'],
+    'friendly': ['bitte', 'danke', 'schätze', 'wunderbar', 'gerne'],
+    'professional': ['bezüglich', 'hinsichtlich', 'gemäß', 'entsprechend', 'beziehungsweise']
+}
+
+# Conciseness suggestions
+CONCISENESS_PATTERNS = {
+    r'\beine\s+große\s+Anzahl\s+von\b': 'viele',
+    r'\bin\s+Bezug\s+auf\b': 'zu',
+    r'\btrotz\s+der\s+Tatsache\s+,?\s*dass\b': 'obwohl',
+    r'\bzu\s+diesem\s+Zeitpunkt\b': 'jetzt',
+    r'\baus\s+dem\s+Grund\s+,?\s*dass\b': 'weil'
+}
+
+# Function words left out of overused-word and repeated-phrase detection
+COMMON_WORDS = {
+    'der', 'die', 'das', 'den', 'dem', 'des', 'ein', 'eine', 'einen', 'einem', 'einer', 'eines', 'und',
+    'oder', 'aber', 'denn', 'dass', 'wenn', 'als', 'wie', 'ob', 'zu', 'zum', 'zur', 'in', 'im', 'an', 'am',
+    'auf', 'aus', 'bei', 'mit', 'nach', 'von', 'vom', 'vor', 'für', 'über', 'unter', 'durch', 'ohne',
+    'ich', 'mich', 'mir', 'mein', 'du', 'dich', 'dir', 'dein', 'er', 'ihn', 'ihm', 'sein', 'sie', 'ihr',
+    'es', 'wir', 'uns', 'unser', 'euch', 'ist', 'sind', 'war', 'waren', 'bin', 'hat', 'haben', 'hatte',
+    'wird', 'werden', 'wurde', 'kann', 'können', 'muss', 'soll', 'nicht', 'kein', 'keine', 'auch', 'noch',
+    'sehr', 'so', 'nur', 'sich', 'man', 'dies', 'diese', 'dieser', 'was', 'wer'
+}
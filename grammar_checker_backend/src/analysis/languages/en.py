@@ -0,0 +1,124 @@
+# English rule pack
+
+# Enhanced grammar rules for demonstration
+GRAMMAR_RULES = {
+    # Spelling errors
+    'grammer': ['grammar'],
+    'gramar': ['grammar'],
+    'erors': ['errors'],
+    'mispellings': ['misspellings'],
+    'sentance': ['sentence'],
+    'recieve': ['receive'],
+    'seperate': ['separate'],
+    'occured': ['occurred'],
+    'definately': ['definitely'],
+    'neccessary': ['necessary'],
+    'accomodate': ['accommodate'],
+    'embarass': ['embarrass'],
+    'maintainance': ['maintenance'],
+    'independant': ['independent'],
+    'existance': ['existence'],
+    'teh': ['the'],
+    'adn': ['and'],
+    'hte': ['the'],
+    'taht': ['that'],
+    'thier': ['their'],
+    'ther': ['their', 'there'],
+    'youre': ['you\'re'],
+    'its': ['it\'s'],
+    'alot': ['a lot'],
+    'loose': ['lose'],
+    'affect': ['effect'],
+    'then': ['than'],
+    'your': ['you\'re'],
+    'there': ['their'],
+    'to': ['too'],
+    'weather': ['whether'],
+    'accept': ['except'],
+    'advise': ['advice'],
+    'breath': ['breathe'],
+    'choose': ['chose'],
+    'desert': ['dessert'],
+    'emigrate': ['immigrate'],
+    'farther': ['further'],
+    'historic': ['historical'],
+    'imply': ['infer'],
+    'lay': ['lie'],
+    'principal': ['principle'],
+    'stationary': ['stationery'],
+    'who': ['whom']
+}
+
+# Vocabulary enhancement suggestions
+VOCABULARY_ENHANCEMENT = {
+    'very': ['extremely', 'incredibly', 'remarkably', 'exceptionally'],
+    'good': ['excellent', 'outstanding', 'superb', 'exceptional'],
+    'bad': ['terrible', 'awful', 'dreadful', 'poor'],
+    'big': ['enormous', 'massive', 'huge', 'substantial'],
+    'small': ['tiny', 'minuscule', 'compact', 'petite'],
+    'nice': ['pleasant', 'delightful', 'wonderful', 'charming'],
+    'said': ['stated', 'declared', 'mentioned', 'expressed'],
+    'got': ['obtained', 'acquired', 'received', 'secured'],
+    'make': ['create', 'produce', 'generate', 'construct'],
+    'thing': ['item', 'object', 'element', 'aspect'],
+    'stuff': ['items', 'materials', 'things', 'elements'],
+    'really': ['truly', 'genuinely', 'actually', 'certainly'],
+    'pretty': ['quite', 'rather', 'fairly', 'considerably'],
+    'walk': ['stroll', 'stride', 'march', 'wander'],
+    'look': ['observe', 'examine', 'inspect', 'gaze'],
+    'think': ['consider', 'contemplate', 'ponder', 'reflect'],
+    'happy': ['joyful', 'elated', 'delighted', 'cheerful'],
+    'sad': ['melancholy', 'dejected', 'sorrowful', 'despondent'],
+    'fast': ['rapid', 'swift', 'quick', 'speedy'],
+    'slow': ['gradual', 'leisurely', 'unhurried', 'deliberate']
+}
+
+# Clarity improvement patterns
+CLARITY_PATTERNS = {
+    r'\bthat\s+that\b': 'Redundant "that" usage',
+    r'\bvery\s+very\b': 'Redundant intensifier',
+    r'\bin\s+order\s+to\b': 'Can be simplified to "to"',
+    r'\bdue\s+to\s+the\s+fact\s+that\b': 'Can be simplified to "because"',
+    r'\bat\s+this\s+point\s+in\s+time\b': 'Can be simplified to "now"',
+    r'\bfor\s+the\s+purpose\s+of\b': 'Can be simplified to "to"',
+    r'\bin\s+the\s+event\s+that\b': 'Can be simplified to "if"'
+}
+
+# Passive voice patterns
+PASSIVE_VOICE_PATTERNS = [
+    r'\b(was|were|is|are|am|be|been|being)\s+\w+ed\b',
+    r'\b(was|were|is|are|am|be|been|being)\s+\w+en\b'
+]
+
+# Tone indicators
+TONE_INDICATORS = {
+    'formal': ['furthermore', 'consequently', 'therefore', 'moreover', 'nevertheless'],
+    'informal': ['yeah', 'okay', 'cool', 'awesome', 'totally'],
+    'confident': ['certainly', 'definitely', 'absolutely', 'undoubtedly', 'clearly'],
+    'tentative': ['perhaps', 'maybe', 'possibly', 'might', 'could'],
+    'friendly': ['please', 'thank you', 'appreciate', 'wonderful', 'great'],
+    'professional': ['regarding', 'concerning', 'pursuant', 'accordingly', 'respectively']
+}
+
+# Conciseness suggestions
+CONCISENESS_PATTERNS = {
+    r'\ba\s+number\s+of\b': 'several',
+    r'\ba\s+large\s+number\s+of\b': 'many',
+    r'\ba\s+small\s+number\s+of\b': 'few',
+    r'\bin\s+spite\s+of\s+the\s+fact\s+that\b': 'although',
+    r'\bwith\s+regard\s+to\b': 'regarding',
+    r'\bin\s+connection\s+with\b': 'about',
+    r'\bfor\s+the\s+reason\s+that\b': 'because',
+    r'\bin\s+view\s+of\s+the\s+fact\s+that\b': 'since'
+}
+
+# Function words left out of overused-word and repeated-phrase detection
+COMMON_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'nor', 'so', 'yet', 'if', 'then', 'than', 'as', 'at', 'by',
+    'for', 'from', 'in', 'into', 'of', 'on', 'onto', 'to', 'with', 'without', 'about', 'over', 'under',
+    'i', 'me', 'my', 'we', 'us', 'our', 'you', 'your', 'he', 'him', 'his', 'she', 'her', 'it', 'its',
+    'they', 'them', 'their', 'this', 'that', 'these', 'those', 'who', 'whom', 'which', 'what', 'there',
+    'is', 'am', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'can', 'could', 'shall', 'should', 'may', 'might', 'must', 'not', 'no', 'also',
+    "it's", "don't", "i'm", 'all', 'some', 'any', 'each', 'more', 'most', 'very', 'just', 'when', 'where'
+}
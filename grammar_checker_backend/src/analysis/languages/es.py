@@ -0,0 +1,73 @@
+# Spanish rule pack
+
+GRAMMAR_RULES = {
+    # Spelling errors
+    'aver': ['a ver', 'haber'],
+    'haiga': ['haya'],
+    'nadien': ['nadie'],
+    'dijistes': ['dijiste'],
+    'fuistes': ['fuiste'],
+    'hechar': ['echar'],
+    'iva': ['iba'],
+    'abia': ['había'],
+    'asi': ['así'],
+    'tambien': ['también'],
+    'despues': ['después']
+}
+
+# Vocabulary enhancement suggestions
+VOCABULARY_ENHANCEMENT = {
+    'muy': ['sumamente', 'extremadamente', 'notablemente', 'especialmente'],
+    'bueno': ['excelente', 'estupendo', 'magnífico', 'sobresaliente'],
+    'malo': ['terrible', 'pésimo', 'deficiente', 'lamentable'],
+    'grande': ['enorme', 'inmenso', 'amplio', 'considerable'],
+    'pequeño': ['diminuto', 'reducido', 'minúsculo', 'compacto'],
+    'cosa': ['elemento', 'objeto', 'aspecto', 'asunto'],
+    'decir': ['afirmar', 'declarar', 'expresar', 'señalar'],
+    'hacer': ['crear', 'elaborar', 'producir', 'realizar'],
+    'bonito': ['hermoso', 'precioso', 'encantador', 'atractivo'],
+    'rápido': ['veloz', 'ágil', 'raudo', 'presto']
+}
+
+# Clarity improvement patterns
+CLARITY_PATTERNS = {
+    r'\bque\s+que\b': 'Uso redundante de "que"',
+    r'\bmuy\s+muy\b': 'Intensificador redundante',
+    r'\bcon\s+el\s+fin\s+de\b': 'Se puede simplificar a "para"',
+    r'\bdebido\s+al\s+hecho\s+de\s+que\b': 'Se puede simplificar a "porque"',
+    r'\ben\s+este\s+momento\s+en\s+el\s+tiempo\b': 'Se puede simplificar a "ahora"'
+}
+
+# Passive voice patterns
+PASSIVE_VOICE_PATTERNS = [
+    r'\b(es|son|fue|fueron|era|eran|será|serán|sido|ser)\s+\w+(ado|ada|ido|ida|to|ta|cho|cha)s?\b'
+]
+
+# Tone indicators
+TONE_INDICATORS = {
+    'formal': ['asimismo', 'por consiguiente', 'no obstante', 'por lo tanto', 'cabe destacar'],
+    'informal': ['vale', 'guay', 'genial', 'chévere', 'oye'],
+    'confident': ['ciertamente', 'definitivamente', 'sin duda', 'claramente', 'absolutamente'],
+    'tentative': ['quizás', 'tal vez', 'posiblemente', 'podría', 'acaso'],
+    'friendly': ['por favor', 'gracias', 'agradezco', 'maravilloso', 'encantado'],
+    'professional': ['respecto a', 'en relación con', 'conforme a', 'en consecuencia', 'respectivamente']
+}
+
+# Conciseness suggestions
+CONCISENESS_PATTERNS = {
+    r'\bun\s+gran\s+número\s+de\b': 'muchos',
+    r'\ba\s+pesar\s+del\s+hecho\s+de\s+que\b': 'aunque',
+    r'\bcon\s+respecto\s+a\b': 'sobre',
+    r'\ben\s+el\s+caso\s+de\s+que\b': 'si',
+    r'\bpor\s+la\s+razón\s+de\s+que\b': 'porque'
+}
+
+# Function words left out of overused-word and repeated-phrase detection
+COMMON_WORDS = {
+    'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'e', 'o', 'u', 'pero', 'ni', 'que', 'si',
+    'de', 'del', 'a', 'al', 'en', 'con', 'por', 'para', 'sin', 'sobre', 'entre', 'hasta', 'desde',
+    'yo', 'me', 'mi', 'mis', 'tú', 'te', 'tu', 'tus', 'él', 'ella', 'lo', 'le', 'les', 'se', 'su', 'sus',
+    'nosotros', 'nos', 'nuestro', 'nuestra', 'ellos', 'ellas', 'este', 'esta', 'esto', 'ese', 'esa', 'eso',
+    'es', 'son', 'era', 'fue', 'ser', 'está', 'están', 'estar', 'ha', 'han', 'hay', 'haber', 'no', 'más',
+    'muy', 'como', 'cuando', 'donde', 'quien', 'cual', 'ya', 'también', 'todo', 'todos'
+}
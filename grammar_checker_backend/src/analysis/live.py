@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.analysis.checker import check_text, AnalysisCancelled
+from src.analysis.lru import LRUCache
+
+# Updates arriving closer together than this are coalesced into one check
+DEBOUNCE_SECONDS = 0.3
+SESSION_IDLE_SECONDS = 10 * 60
+MAX_SESSIONS = 1000
+LIVE_CHECK_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=LIVE_CHECK_WORKERS, thread_name_prefix="live-check")
+
+class LiveSession:
+    """Server side state for one document being checked as the user types.
+
+    Every update carries a revision number. Only the newest revision is ever
+    analysed: updates inside the debounce window replace each other, and a
+    check already running is abandoned at its next checkpoint once a newer
+    revision arrives. Results are published to waiting event streams.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.latest_revision = 0
+        self.result_revision = 0
+        self.result = None
+        self.closed = False
+        self._pending = None
+        self._timer = None
+        self._condition = threading.Condition()
+
+    def submit(self, text, pack, ruleset, revision=None, time_budget=None):
+        """Queue a new revision; returns (revision, accepted)"""
+        with self._condition:
+            if revision is None:
+                revision = self.latest_revision + 1
+            if revision <= self.latest_revision:
+                # Arrived out of order behind a newer update
+                return self.latest_revision, False
+            self.latest_revision = revision
+            self._pending = (revision, text, pack, ruleset, time_budget)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(DEBOUNCE_SECONDS, self._dispatch)
+            self._timer.daemon = True
+            self._timer.start()
+        return revision, True
+
+    def _dispatch(self):
+        with self._condition:
+            pending, self._pending, self._timer = self._pending, None, None
+        if pending is not None:
+            _executor.submit(self._run, *pending)
+
+    def _is_stale(self, revision):
+        return self.closed or revision != self.latest_revision
+
+    def _run(self, revision, text, pack, ruleset, time_budget):
+        if self._is_stale(revision):
+            return
+        try:
+            result = check_text(text, pack, ruleset, should_stop=lambda: self._is_stale(revision),
+                                time_budget=time_budget)
+        except AnalysisCancelled:
+            return
+        with self._condition:
+            if self._is_stale(revision):
+                return
+            self.result_revision = revision
+            self.result = result
+            self._condition.notify_all()
+
+    def wait_for_result(self, after_revision, timeout):
+        """Block until a result newer than after_revision exists.
+
+        Returns (revision, result), or None on timeout or close.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.closed or self.result_revision > after_revision, timeout)
+            if self.result_revision > after_revision:
+                return self.result_revision, self.result
+            return None
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._pending = self._timer = None
+            self._condition.notify_all()
+
+_sessions = LRUCache(maxsize=MAX_SESSIONS, ttl=SESSION_IDLE_SECONDS,
+                     on_evict=lambda session_id, session: session.close())
+_sessions_lock = threading.Lock()
+
+def get_session(session_id, create=True):
+    """Return the live session for session_id, creating it if asked"""
+    session = _sessions.get(session_id)
+    if session is None and create:
+        with _sessions_lock:
+            session = _sessions.get(session_id)
+            if session is None:
+                session = LiveSession(session_id)
+                _sessions.put(session_id, session)
+    return session
+
+def close_session(session_id):
+    session = _sessions.pop(session_id)
+    if session is not None:
+        session.close()
+    return session is not None
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache.
+
+    Bounds the per-worker caches of compiled rulesets, paragraph results,
+    rewrites and live sessions to ``maxsize`` entries. With ``ttl`` set,
+    entries not used for that many seconds are dropped as well, and
+    ``on_evict`` is called with the key and value of everything that leaves
+    the cache.
+    """
+
+    def __init__(self, maxsize=128, ttl=None, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            evicted = self._expire()
+            if key in self._data:
+                value, _ = self._data.pop(key)
+                self._data[key] = (value, time.monotonic())
+            else:
+                value = default
+        self._notify(evicted)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, time.monotonic())
+            evicted = self._expire()
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False))
+        self._notify(evicted)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def _expire(self):
+        # Least recently used entries sit at the front, so stop at the first
+        # one that is still fresh
+        evicted = []
+        if self.ttl is None:
+            return evicted
+        cutoff = time.monotonic() - self.ttl
+        while self._data:
+            key, (value, last_used) = next(iter(self._data.items()))
+            if last_used >= cutoff:
+                break
+            del self._data[key]
+            evicted.append((key, (value, last_used)))
+        return evicted
+
+    def _notify(self, evicted):
+        if self.on_evict is None:
+            return
+        for key, (value, _) in evicted:
+            self.on_evict(key, value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
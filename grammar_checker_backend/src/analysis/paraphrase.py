@@ -0,0 +1,53 @@
+import random
+from src.analysis.tokenizer import iter_words
+
+MAX_VARIANTS = 50
+
+def match_case(replacement, original):
+    """Give replacement the capitalisation of the word it replaces"""
+    if len(original) > 1 and original.isupper():
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+class ParaphraseEngine:
+    """Word-level paraphrasing from a vocabulary table.
+
+    The replacement index is built once per vocabulary. A text is tokenized
+    a single time; every variant is then a splice of the same candidate
+    spans, so punctuation and spacing survive and N variants cost one pass
+    plus N joins.
+    """
+
+    def __init__(self, vocabulary):
+        self.index = {word.lower(): tuple(options) for word, options in vocabulary.items() if options}
+
+    def candidates(self, text):
+        """Return (start, end, word, options) for every replaceable word"""
+        spans = []
+        for match in iter_words(text):
+            options = self.index.get(match.group().lower())
+            if options:
+                spans.append((match.start(), match.end(), match.group(), options))
+        return spans
+
+    def variants(self, text, count=1, seed=None):
+        """Return count paraphrases of text; the same seed gives the same variants"""
+        spans = self.candidates(text)
+        results = []
+        for variant in range(count):
+            rng = random.Random(f"{seed}:{variant}")
+            parts = []
+            position = 0
+            for start, end, word, options in spans:
+                parts.append(text[position:start])
+                parts.append(match_case(rng.choice(options), word))
+                position = end
+            parts.append(text[position:])
+            results.append("".join(parts))
+        return results
+
+    def batch(self, texts, count=1, seed=None):
+        """Paraphrase several texts; each text gets its own seed derived from seed"""
+        return [self.variants(text, count, f"{seed}:{i}") for i, text in enumerate(texts)]
@@ -0,0 +1,171 @@
+"""Readability scores per sentence, paragraph and document.
+
+Flesch-Kincaid grade, Gunning Fog and SMOG all come down to per-group sums
+of words, sentences, syllables and complex (3+ syllable) words. Syllables
+are estimated as vowel groups. They are counted over a code point array of
+the whole text, and every sum is a bincount over group ids. The only
+per-word Python work left is collecting the tokenizer's spans. A batch of
+documents is joined and scored in the same single pass.
+"""
+import itertools
+
+import numpy as np
+
+from src.analysis.tokenizer import WORD_PATTERN, SENTENCE_END_PATTERN, PARAGRAPH_BREAK
+
+# Vowels for syllable estimation, including the accented vowels of the
+# Latin-script packs; case is handled by listing both
+_VOWEL_TABLE_SIZE = 0x250  # Basic Latin through Latin Extended-B; anything above is not a vowel
+_VOWEL_TABLE = np.zeros(_VOWEL_TABLE_SIZE + 1, dtype=bool)
+_VOWEL_TABLE[[ord(c) for c in "aeiouyáéíóúàèìòùâêîôûäëïöüÿ" + "AEIOUYÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÄËÏÖÜŸ"]] = True
+_E = (ord("e"), ord("E"))
+_L = (ord("l"), ord("L"))
+
+DOCUMENT_SEPARATOR = "\n\n"
+COMPLEX_WORD_SYLLABLES = 3
+
+def _spans(text):
+    """(starts, ends) of every word as int64 arrays"""
+    flat = np.fromiter(itertools.chain.from_iterable(match.span() for match in WORD_PATTERN.finditer(text)),
+                       dtype=np.int64)
+    return flat[0::2], flat[1::2]
+
+def syllable_counts(text, starts, ends, language="en"):
+    """Estimated syllables of each word span: its vowel groups, at least one"""
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    vowel = _VOWEL_TABLE[np.minimum(codes, _VOWEL_TABLE_SIZE)]
+    word_start = np.zeros(len(codes), dtype=bool)
+    word_start[starts] = True
+    # A vowel opens a group unless the previous character is a vowel of the same word
+    continues = np.zeros(len(codes), dtype=bool)
+    continues[1:] = vowel[:-1]
+    group_start = vowel & ~(continues & ~word_start)
+    inside = np.zeros(len(codes) + 1, dtype=np.int64)
+    inside[starts] += 1
+    inside[ends] -= 1
+    group_start &= np.cumsum(inside[:-1]) > 0
+    syllables = np.add.reduceat(group_start.astype(np.int64), starts)
+    if language == "en":
+        # Silent final "e" ("make", "note"), but not "-le" ("table")
+        last = codes[ends - 1]
+        before = codes[np.maximum(ends - 2, starts)]
+        silent = np.isin(last, _E) & ~np.isin(before, _L) & (syllables > 1)
+        syllables -= silent
+    return np.maximum(syllables, 1)
+
+def _scores(words, sentences, syllables, complex_words):
+    """Readability formulas over arrays of per-group totals"""
+    words = np.asarray(words, dtype=np.float64)
+    sentences = np.asarray(sentences, dtype=np.float64)
+    safe_words = np.maximum(words, 1)
+    safe_sentences = np.maximum(sentences, 1)
+    words_per_sentence = words / safe_sentences
+    empty = words == 0
+    return {
+        "flesch_kincaid_grade": np.where(empty, 0, 0.39 * words_per_sentence + 11.8 * syllables / safe_words - 15.59),
+        "gunning_fog": np.where(empty, 0, 0.4 * (words_per_sentence + 100 * complex_words / safe_words)),
+        "smog": np.where(empty, 0, 1.043 * np.sqrt(complex_words * 30 / safe_sentences) + 3.1291)
+    }
+
+def _rows(starts, ends, words, sentences, syllables, complex_words, offset=0):
+    scores = {name: np.round(values, 2).tolist() for name, values in
+              _scores(words, sentences, syllables, complex_words).items()}
+    columns = {
+        "start": (np.asarray(starts) - offset).tolist(),
+        "end": (np.asarray(ends) - offset).tolist(),
+        "words": np.asarray(words, dtype=np.int64).tolist(),
+        "sentences": np.asarray(sentences, dtype=np.int64).tolist(),
+        "syllables": np.asarray(syllables, dtype=np.int64).tolist(),
+        "complex_words": np.asarray(complex_words, dtype=np.int64).tolist(),
+        **scores
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def _group_ids(starts, breaks):
+    """Number the groups of consecutive words between break positions, from 0"""
+    raw = np.searchsorted(breaks, starts, side="right")
+    changed = np.empty(len(raw), dtype=bool)
+    changed[:1] = True
+    changed[1:] = raw[1:] != raw[:-1]
+    return np.cumsum(changed) - 1, np.flatnonzero(changed)
+
+def readability_batch(texts, language="en", detail=True):
+    """Score several documents in one vectorized pass.
+
+    Returns one dict per text with "document" scores and, when detail is
+    True, "paragraphs" and "sentences" lists of scored spans (offsets are
+    relative to that text).
+    """
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + len(DOCUMENT_SEPARATOR)
+    joined = DOCUMENT_SEPARATOR.join(texts)
+    offsets = np.array(offsets, dtype=np.int64)
+
+    starts, ends = _spans(joined)
+    syllables = syllable_counts(joined, starts, ends, language)
+    complex_word = syllables >= COMPLEX_WORD_SYLLABLES
+
+    # Sentences end at terminators, paragraphs at blank lines; both at document edges
+    terminators = np.array([match.start() for match in SENTENCE_END_PATTERN.finditer(joined)], dtype=np.int64)
+    blank_lines = np.array([match.start() for match in PARAGRAPH_BREAK.finditer(joined)], dtype=np.int64)
+    sentence_of, sentence_first = _group_ids(starts, np.sort(np.concatenate([terminators, offsets])))
+    paragraph_of, paragraph_first = _group_ids(starts, np.sort(np.concatenate([blank_lines, offsets])))
+    document_of = np.searchsorted(offsets, starts, side="right") - 1
+
+    def totals(groups, count):
+        return (np.bincount(groups, minlength=count),
+                np.bincount(groups, weights=syllables, minlength=count),
+                np.bincount(groups, weights=complex_word, minlength=count))
+
+    sentence_count = len(sentence_first)
+    paragraph_count = len(paragraph_first)
+    sentence_last = np.append(sentence_first[1:], len(starts)) - 1
+    paragraph_last = np.append(paragraph_first[1:], len(starts)) - 1
+
+    sentence_words, sentence_syllables, sentence_complex = totals(sentence_of, sentence_count)
+    paragraph_words, paragraph_syllables, paragraph_complex = totals(paragraph_of, paragraph_count)
+    document_words, document_syllables, document_complex = totals(document_of, len(texts))
+    paragraph_sentences = np.bincount(paragraph_of[sentence_first], minlength=paragraph_count)
+    document_sentences = np.bincount(document_of[sentence_first], minlength=len(texts))
+
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    documents = _rows(offsets, offsets + lengths, document_words, document_sentences,
+                      document_syllables, document_complex)
+    sentence_document = document_of[sentence_first]
+    paragraph_document = document_of[paragraph_first]
+    results = []
+    for index, offset in enumerate(offsets):
+        document = documents[index]
+        del document["start"], document["end"]
+        result = {"document": document}
+        if detail:
+            s_lo, s_hi = np.searchsorted(sentence_document, [index, index + 1])
+            p_lo, p_hi = np.searchsorted(paragraph_document, [index, index + 1])
+            result["sentences"] = _rows(starts[sentence_first[s_lo:s_hi]], ends[sentence_last[s_lo:s_hi]],
+                                        sentence_words[s_lo:s_hi], np.ones(s_hi - s_lo),
+                                        sentence_syllables[s_lo:s_hi], sentence_complex[s_lo:s_hi], offset)
+            result["paragraphs"] = _rows(starts[paragraph_first[p_lo:p_hi]], ends[paragraph_last[p_lo:p_hi]],
+                                         paragraph_words[p_lo:p_hi], paragraph_sentences[p_lo:p_hi],
+                                         paragraph_syllables[p_lo:p_hi], paragraph_complex[p_lo:p_hi], offset)
+        results.append(result)
+    return results
+
+def readability(text, language="en", detail=True):
+    """Readability scores for a single document"""
+    return readability_batch([text], language, detail)[0]
+
+def combined_document(parts):
+    """Document scores for a text scored in consecutive pieces, from the pieces' own document scores.
+
+    Exact as long as no sentence is split between two pieces (see
+    tokenizer.chunk_spans).
+    """
+    totals = [sum(part[column] for part in parts) for column in ("words", "sentences", "syllables", "complex_words")]
+    document = _rows([0], [0], *(np.array([total]) for total in totals))[0]
+    del document["start"], document["end"]
+    return document
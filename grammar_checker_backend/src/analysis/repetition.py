@@ -0,0 +1,186 @@
+"""Overused words and repeated phrases.
+
+Words are mapped to integer ids and every phrase of 2 to 5 words is
+identified by a polynomial hash computed from prefix hashes over the id
+array, so any window hashes in O(1). Phrases are grown one word at a
+time and only from windows that already repeat, so after the first
+length the candidate set shrinks quickly. No n-gram strings are built.
+Hash matches are verified against the ids before they count.
+"""
+from array import array
+from src.analysis.tokenizer import SENTENCE_END_PATTERN
+
+MIN_PHRASE_WORDS = 2
+MAX_PHRASE_WORDS = 5
+# How many times a phrase of n words must occur before it is worth a mention
+PHRASE_MIN_REPEATS = {2: 4, 3: 3, 4: 2, 5: 2}
+OVERUSED_MIN_COUNT = 5
+OVERUSED_MIN_SHARE = 0.005  # of all words in the document
+MAX_FINDINGS = 50
+
+_MOD = (1 << 61) - 1
+_BASE = 1000003
+
+class _Stop(Exception):
+    pass
+
+def find_repetitions(text, word_matches, common_words=(), max_spans=20, tick=None):
+    """Return the overused words and repeated phrases of text, in document order.
+
+    word_matches are the tokenizer's matches for text. Each finding is a dict
+    with kind ("word" or "phrase"), text (its first occurrence), words,
+    count and the first max_spans [start, end] spans. tick is polled once
+    per unit of work; when it returns True the scan stops and None is
+    returned.
+    """
+    try:
+        return _Scan(text, word_matches, common_words, max_spans, tick).findings()
+    except _Stop:
+        return None
+
+class _Scan:
+
+    def __init__(self, text, word_matches, common_words, max_spans, tick):
+        self.text = text
+        self.max_spans = max_spans
+        self.tick = tick or (lambda: False)
+
+        vocabulary = {}
+        self.ids = array('l')
+        self.starts = array('l')
+        self.ends = array('l')
+        self.sentence = array('l')
+        self.content = bytearray()
+        self.id_text = []
+        # Sentence number of each word, from a single pass over the sentence ends
+        sentence_ends = [end.start() for end in SENTENCE_END_PATTERN.finditer(text)]
+        sentence_ends.append(len(text))
+        sentence = 0
+        for match in word_matches:
+            self._step()
+            start = match.start()
+            while sentence_ends[sentence] < start:
+                sentence += 1
+            word = match.group().lower()
+            word_id = vocabulary.get(word)
+            if word_id is None:
+                word_id = vocabulary[word] = len(self.id_text)
+                self.id_text.append(word)
+            self.ids.append(word_id)
+            self.starts.append(start)
+            self.ends.append(match.end())
+            self.sentence.append(sentence)
+            self.content.append(word not in common_words)
+
+        # prefix[i] hashes ids[:i]; a window's hash is then two lookups away
+        self.prefix = array('q', [0])
+        value = 0
+        for word_id in self.ids:
+            value = (value * _BASE + word_id + 1) % _MOD
+            self.prefix.append(value)
+        self.powers = [pow(_BASE, n, _MOD) for n in range(MAX_PHRASE_WORDS + 1)]
+
+    def _step(self):
+        if self.tick():
+            raise _Stop()
+
+    def _spans(self, positions, n):
+        return [[self.starts[i], self.ends[i + n - 1]] for i in positions[:self.max_spans]]
+
+    def overused_words(self):
+        total = len(self.ids)
+        counts = [0] * len(self.id_text)
+        for word_id in self.ids:
+            counts[word_id] += 1
+        threshold = max(OVERUSED_MIN_COUNT, OVERUSED_MIN_SHARE * total)
+        overused = {word_id for word_id, count in enumerate(counts)
+                    if count >= threshold and len(self.id_text[word_id]) > 2}
+        positions = {word_id: [] for word_id in overused}
+        for i, word_id in enumerate(self.ids):
+            self._step()
+            if word_id in positions and self.content[i]:
+                positions[word_id].append(i)
+        return [{
+            "kind": "word",
+            "text": self.text[self.starts[found[0]]:self.ends[found[0]]],
+            "words": 1,
+            "count": len(found),
+            "spans": self._spans(found, 1)
+        } for found in positions.values() if found]
+
+    def repeated_groups(self):
+        """{n: [positions of each phrase of n words that occurs more than once]}"""
+        ids = self.ids
+        groups = {}
+        # Windows that stay inside one sentence and hold at least one content word
+        candidates = [i for i in range(len(ids) - 1)
+                      if self.sentence[i] == self.sentence[i + 1] and (self.content[i] or self.content[i + 1])]
+        prefix = self.prefix
+        step = self._step
+        for n in range(MIN_PHRASE_WORDS, MAX_PHRASE_WORDS + 1):
+            power = self.powers[n]
+            occurrences = {}
+            for i in candidates:
+                step()
+                key = (prefix[i + n] - prefix[i] * power) % _MOD
+                found = occurrences.get(key)
+                if found is None:
+                    occurrences[key] = [i]
+                # Hash collisions are vanishingly rare, but never merge different phrases
+                elif ids[found[0]:found[0] + n] == ids[i:i + n]:
+                    found.append(i)
+            groups[n] = [found for found in occurrences.values() if len(found) > 1]
+            # A longer phrase can only repeat where its first n words already do
+            candidates = sorted(i for found in groups[n] for i in found
+                                if i + n < len(ids) and self.sentence[i + n] == self.sentence[i])
+        return groups
+
+    def repeated_phrases(self):
+        groups = self.repeated_groups()
+        covered = bytearray(len(self.ids))
+        phrases = []
+
+        # Runs of overlapping longest windows, e.g. a duplicated sentence,
+        # become one finding rather than one per window
+        runs = []
+        for found in sorted(groups[MAX_PHRASE_WORDS], key=lambda found: found[0]):
+            if len(found) < PHRASE_MIN_REPEATS[MAX_PHRASE_WORDS]:
+                continue
+            if runs and runs[-1]["last"] == [i - 1 for i in found]:
+                runs[-1]["last"] = found
+                runs[-1]["words"] += 1
+            else:
+                runs.append({"first": found, "last": found, "words": MAX_PHRASE_WORDS})
+        level = [(run["first"], run["words"]) for run in runs]
+
+        for n in range(MAX_PHRASE_WORDS - 1, MIN_PHRASE_WORDS - 1, -1):
+            phrases += level
+            for positions, words in level:
+                for i in positions:
+                    covered[i:i + words] = b"\x01" * words
+            level = []
+            for found in groups[n]:
+                self._step()
+                # Skip phrases that only repeat as part of a longer reported one
+                free = [i for i in found if not all(covered[i:i + n])]
+                if len(free) >= PHRASE_MIN_REPEATS[n]:
+                    level.append((found, n))
+        phrases += level
+
+        return [{
+            "kind": "phrase",
+            "text": self.text[self.starts[positions[0]]:self.ends[positions[0] + words - 1]],
+            "words": words,
+            "count": len(positions),
+            "spans": self._spans(positions, words)
+        } for positions, words in phrases]
+
+    def findings(self):
+        if not self.ids:
+            return []
+        findings = self.overused_words() + self.repeated_phrases()
+        # Keep the most prominent, then report them in reading order
+        findings.sort(key=lambda finding: finding["count"] * finding["words"], reverse=True)
+        findings = findings[:MAX_FINDINGS]
+        findings.sort(key=lambda finding: finding["spans"][0][0])
+        return findings
@@ -0,0 +1,347 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from src.analysis.lru import LRUCache
+
+# kind is one of "suggestion" (the short hints in /check), "rewrite",
+# "tone" or "email"; style is the rewrite style, target tone or email type
+RewriteRequest = namedtuple("RewriteRequest", "kind text style")
+
+class RewriteError(Exception):
+    """The provider failed or broke its contract"""
+
+class RewriteTimeout(RewriteError):
+    pass
+
+class RewriteOverloaded(RewriteError):
+    """Too many requests are already waiting for the provider"""
+
+class RewriteProvider:
+    """Turns batches of RewriteRequests into rewritten text.
+
+    Implementations talk to a model server; they receive up to
+    max_batch_size requests at once and must return one string per request,
+    in order. Calls may be made concurrently from the service's worker pool.
+    A call must give up and raise within timeout seconds, e.g. by passing it
+    to the HTTP client, or a hung upstream ties up one of the pool's workers.
+    """
+    max_batch_size = 16
+
+    @property
+    def identity(self):
+        """Names the provider, and the model behind it, in result cache keys"""
+        return type(self).__name__
+
+    def rewrite_batch(self, requests, timeout=None):
+        raise NotImplementedError
+
+class TemplateRewriteProvider(RewriteProvider):
+    """Local stand-in that fills in fixed templates instead of calling a model"""
+
+    SUGGESTIONS = {
+        'improve': [
+            "Here's a clearer version of your text...",
+            "Consider this improved phrasing...",
+            "A more polished version might be..."
+        ],
+        'formal': [
+            "A more formal version would be...",
+            "In professional writing, consider...",
+            "For academic or business contexts..."
+        ],
+        'casual': [
+            "A more conversational approach...",
+            "In a casual tone, you might say...",
+            "For informal communication..."
+        ],
+        'concise': [
+            "A more concise version...",
+            "To be more direct...",
+            "Simplified, this becomes..."
+        ]
+    }
+
+    def rewrite_batch(self, requests, timeout=None):
+        return [getattr(self, f"_{request.kind}")(request.text, request.style) for request in requests]
+
+    def _suggestion(self, text, style):
+        options = self.SUGGESTIONS.get(style, self.SUGGESTIONS['improve'])
+        # Stable per text so cached and fresh answers agree
+        return options[zlib.crc32(text.encode("utf-8")) % len(options)]
+
+    def _rewrite(self, text, style):
+        rewrite_templates = {
+            "improve": f"Here's an enhanced version of your text: {text[:50]}... [This would be an AI-improved version]",
+            "formal": f"In a more formal tone: {text[:50]}... [This would be a more formal version]",
+            "casual": f"In a casual tone: {text[:50]}... [This would be a more casual version]",
+            "concise": f"More concisely: {text[:30]}... [This would be a shorter version]"
+        }
+        return rewrite_templates.get(style, rewrite_templates["improve"])
+
+    def _tone(self, text, tone):
+        tone_adjustments = {
+            "professional": f"In a professional tone: {text[:50]}... [Professional version would be generated here]",
+            "friendly": f"In a friendly tone: {text[:50]}... [Friendly version would be generated here]",
+            "assertive": f"More assertively: {text[:50]}... [Assertive version would be generated here]",
+            "diplomatic": f"More diplomatically: {text[:50]}... [Diplomatic version would be generated here]"
+        }
+        return tone_adjustments.get(tone, tone_adjustments["professional"])
+
+    def _email(self, prompt, email_type):
+        email_templates = {
+            "professional": f"""Subject: {prompt[:30]}...
+
+Dear [Recipient],
+
+I hope this email finds you well. I am writing to {prompt.lower()}.
+
+[Generated professional email content based on: {prompt}]
+
+Best regards,
+[Your Name]""",
+
+            "casual": f"""Hey [Name],
+
+Hope you're doing well! I wanted to reach out about {prompt.lower()}.
+
+[Generated casual email content based on: {prompt}]
+
+Thanks!
+[Your Name]""",
+
+            "follow-up": f"""Subject: Following up on {prompt[:30]}...
+
+Hi [Name],
+
+I wanted to follow up on {prompt.lower()}.
+
+[Generated follow-up email content based on: {prompt}]
+
+Looking forward to hearing from you.
+
+Best,
+[Your Name]"""
+        }
+        return email_templates.get(email_type, email_templates["professional"])
+
+PROVIDERS = {
+    "template": TemplateRewriteProvider,
+}
+
+class _Call:
+    """A queued or running request and the callers waiting on its result"""
+    __slots__ = ("future", "expires", "deadline", "waiters")
+
+    def __init__(self, expires, deadline):
+        self.future = Future()
+        # When the provider call counts as overdue, and when the last caller stops waiting
+        self.expires = expires
+        self.deadline = deadline
+        self.waiters = 0
+
+class RewriteService:
+    """Caching, batching front for a RewriteProvider.
+
+    Identical requests are answered from an LRU cache or share the call
+    already in flight. New requests are collected for batch_window seconds
+    (or until the provider's batch size is reached) and sent as one batch
+    on a bounded worker pool, so slow upstream calls neither serialize the
+    endpoints nor open unbounded connections. At most ``max_pending``
+    requests wait for a worker; past that new ones fail at once with
+    RewriteOverloaded. Callers wait at most ``timeout`` seconds. A request
+    every caller has given up on is dropped before it reaches the
+    provider; one already sent still lands in the cache. Each provider
+    call gets ``provider_timeout`` seconds (``timeout`` unless given). A
+    request still in flight after that is failed with RewriteTimeout, so
+    identical requests start a fresh call rather than joining one that may
+    never finish.
+    """
+
+    def __init__(self, provider, workers=8, batch_window=0.005, cache_size=4096, timeout=10.0,
+                 provider_timeout=None, max_pending=1024):
+        self.provider = provider
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.provider_timeout = timeout if provider_timeout is None else provider_timeout
+        self._cache = LRUCache(maxsize=cache_size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+        # The batcher takes a slot before handing a batch to the pool, so
+        # batches wait in the bounded queue above rather than in the executor
+        self._slots = threading.Semaphore(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rewrite")
+        self._batcher = None
+
+    @staticmethod
+    def _key(request):
+        # Digest rather than the text itself so the cache doesn't pin whole documents
+        digest = hashlib.blake2b(request.text.encode("utf-8"), digest_size=16).digest()
+        return request.kind, digest, request.style
+
+    def submit(self, request, deadline=None):
+        """Return a Future for request's rewritten text.
+
+        deadline is the time.monotonic() at which the caller stops waiting
+        (default: timeout from now). Call abandon() to give up sooner.
+        """
+        key = self._key(request)
+        cached = self._cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        now = time.monotonic()
+        deadline = now + self.timeout if deadline is None else deadline
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is not None and now > call.expires:
+                # Its provider call is overdue; don't let anyone else wait on it
+                del self._inflight[key]
+                self._fail(call.future, RewriteTimeout(f"Rewrite provider did not answer within {self.provider_timeout:g}s"))
+                call = None
+            if call is None:
+                call = _Call(now + self.batch_window + self.provider_timeout, deadline)
+                try:
+                    self._queue.put_nowait((request, call))
+                except queue.Full:
+                    self._fail(call.future, RewriteOverloaded(
+                        f"{self._queue.maxsize} rewrite requests are already waiting; try again later"))
+                    return call.future
+                self._inflight[key] = call
+                self._ensure_batcher()
+            call.deadline = max(call.deadline, deadline)
+            call.waiters += 1
+        return call.future
+
+    def abandon(self, request, future):
+        """Stop waiting for a submitted request; once no caller is left it is dropped"""
+        key = self._key(request)
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is None or call.future is not future:
+                return
+            call.waiters -= 1
+            if call.waiters > 0:
+                return
+            del self._inflight[key]
+        self._fail(future, RewriteTimeout("Every caller gave up waiting for this rewrite"))
+
+    def rewrite_many(self, requests, timeout=None):
+        """Rewrite several requests, raising RewriteTimeout if they don't all finish in time"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        submitted = [(request, self.submit(request, deadline)) for request in map(RewriteRequest._make, requests)]
+        results = []
+        try:
+            for _, future in submitted:
+                try:
+                    results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+                except FutureTimeout:
+                    raise RewriteTimeout(f"Rewrite did not finish within {timeout:g}s")
+        finally:
+            # Whatever we no longer wait for shouldn't keep the provider busy
+            for request, future in submitted[len(results):]:
+                self.abandon(request, future)
+        return results
+
+    def rewrite(self, kind, text, style, timeout=None):
+        return self.rewrite_many([(kind, text, style)], timeout)[0]
+
+    def _ensure_batcher(self):
+        if self._batcher is None or not self._batcher.is_alive():
+            self._batcher = threading.Thread(target=self._batch_loop, name="rewrite-batcher", daemon=True)
+            self._batcher.start()
+
+    def _batch_loop(self):
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            window_ends = time.monotonic() + self.batch_window
+            while len(batch) < self.provider.max_batch_size:
+                remaining = window_ends - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        try:
+            self._call_provider(batch)
+        finally:
+            self._slots.release()
+
+    def _call_provider(self, batch):
+        now = time.monotonic()
+        live = []
+        for request, call in batch:
+            if now > call.deadline:
+                self._finish(request, call, error=RewriteTimeout("No caller is waiting for this rewrite any more"))
+            elif not call.future.done():
+                live.append((request, call))
+        if not live:
+            return
+        try:
+            results = self.provider.rewrite_batch([request for request, _ in live], timeout=self.provider_timeout)
+            if len(results) != len(live):
+                raise RewriteError(f"Rewrite provider returned {len(results)} results for {len(live)} requests")
+            for (request, call), result in zip(live, results):
+                self._cache.put(self._key(request), result)
+                self._finish(request, call, result=result)
+        except Exception as e:
+            for request, call in live:
+                self._finish(request, call, error=e)
+        finally:
+            # Nothing in the batch may be left pending, whatever happened above
+            for request, call in live:
+                self._finish(request, call, error=RewriteError("Rewrite batch ended without a result"))
+
+    def _finish(self, request, call, result=None, error=None):
+        with self._lock:
+            key = self._key(request)
+            # A newer call may have replaced an overdue one under the same key
+            if self._inflight.get(key) is call:
+                del self._inflight[key]
+        if error is not None:
+            self._fail(call.future, error)
+        else:
+            try:
+                call.future.set_result(result)
+            except InvalidStateError:
+                pass
+
+    @staticmethod
+    def _fail(future, error):
+        try:
+            future.set_exception(error)
+        except InvalidStateError:
+            # Already failed as overdue or abandoned
+            pass
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_rewrite_service():
+    """Process-wide RewriteService, configured from the environment on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                provider = PROVIDERS[os.environ.get("REWRITE_PROVIDER", "template")]()
+                _service = RewriteService(
+                    provider,
+                    workers=int(os.environ.get("REWRITE_WORKERS", 8)),
+                    timeout=float(os.environ.get("REWRITE_TIMEOUT_SECONDS", 10)),
+                    provider_timeout=float(os.environ["REWRITE_PROVIDER_TIMEOUT_SECONDS"])
+                                     if "REWRITE_PROVIDER_TIMEOUT_SECONDS" in os.environ else None,
+                    max_pending=int(os.environ.get("REWRITE_MAX_PENDING", 1024))
+                )
+    return _service
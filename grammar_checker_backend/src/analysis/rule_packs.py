@@ -0,0 +1,60 @@
+import hashlib
+import importlib
+import re
+
+DEFAULT_LANGUAGE = 'en'
+SUPPORTED_LANGUAGES = ('en', 'es', 'de')
+
+class UnsupportedLanguageError(ValueError):
+    pass
+
+class RulePack:
+    """Rule tables and compiled patterns for a single language"""
+
+    def __init__(self, language, module):
+        self.language = language
+        self.grammar_rules = module.GRAMMAR_RULES
+        self.vocabulary = module.VOCABULARY_ENHANCEMENT
+        self.tone_indicators = module.TONE_INDICATORS
+        self.common_words = frozenset(getattr(module, 'COMMON_WORDS', ()))
+        self.clarity_patterns = [(re.compile(pattern, re.IGNORECASE), message)
+                                 for pattern, message in module.CLARITY_PATTERNS.items()]
+        self.conciseness_patterns = [(re.compile(pattern, re.IGNORECASE), replacement)
+                                     for pattern, replacement in module.CONCISENESS_PATTERNS.items()]
+        self.passive_voice_patterns = [re.compile(pattern, re.IGNORECASE)
+                                       for pattern in module.PASSIVE_VOICE_PATTERNS]
+        # Changes whenever any rule table does, so results cached by another
+        # worker or an older deploy are never mistaken for current ones
+        tables = (module.GRAMMAR_RULES, module.VOCABULARY_ENHANCEMENT, module.TONE_INDICATORS,
+                  module.CLARITY_PATTERNS, module.CONCISENESS_PATTERNS, module.PASSIVE_VOICE_PATTERNS,
+                  sorted(self.common_words))
+        self.version = hashlib.blake2b(repr((language, tables)).encode("utf-8"), digest_size=8).hexdigest()
+
+    def __repr__(self):
+        return f'<RulePack {self.language}>'
+
+def _module_name(language):
+    return f'src.analysis.languages.{language}'
+
+# Each pack is loaded on first use and then kept. There are only a few,
+# and the rulesets built from a pack hold on to its tables anyway.
+_packs = {}
+
+def normalize_language(language):
+    """Map a request's language tag ("en-US", "ES") onto a pack name"""
+    if not language:
+        return DEFAULT_LANGUAGE
+    code = str(language).strip().lower().replace('_', '-').split('-')[0]
+    if code not in SUPPORTED_LANGUAGES:
+        raise UnsupportedLanguageError(
+            f"Unsupported language '{language}'. Supported: {', '.join(SUPPORTED_LANGUAGES)}"
+        )
+    return code
+
+def load_pack(language=None):
+    """Return the rule pack for a language, importing and compiling it on first use"""
+    code = normalize_language(language)
+    pack = _packs.get(code)
+    if pack is None:
+        pack = _packs.setdefault(code, RulePack(code, importlib.import_module(_module_name(code))))
+    return pack
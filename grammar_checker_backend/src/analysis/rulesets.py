@@ -0,0 +1,123 @@
+import hashlib
+import re
+from functools import cached_property
+from sqlalchemy import func, or_
+from src.models.user import db
+from src.models.dictionary import DictionaryEntry, team_members
+from src.analysis.lru import LRUCache
+from src.analysis.rule_packs import SUPPORTED_LANGUAGES
+from src.analysis.paraphrase import ParaphraseEngine
+
+# Compiled rulesets, keyed by (language, user_id, team_id). Each value carries the
+# fingerprint of the dictionary rows it was built from so an edit made on
+# any worker is picked up on the next request without a recompile per call.
+_ruleset_cache = LRUCache(maxsize=256)
+
+class Ruleset:
+    """A language pack's rules merged with a user's or team's custom dictionary"""
+
+    def __init__(self, grammar_rules, vocabulary, ignored=(), replacements=None, pack_version=""):
+        self.ignored = frozenset(word.lower() for word in ignored)
+        self.replacements = {word.lower(): replacement for word, replacement in (replacements or {}).items()
+                             if word.lower() not in self.ignored}
+        self.grammar_rules = {word: fixes for word, fixes in grammar_rules.items()
+                              if word not in self.ignored and word not in self.replacements}
+        self.vocabulary = {word: options for word, options in vocabulary.items()
+                           if word not in self.ignored}
+        # Identifies what this ruleset checks for, the same on every worker
+        self.version = hashlib.blake2b(
+            repr((pack_version, sorted(self.ignored), sorted(self.replacements.items()))).encode("utf-8"),
+            digest_size=8
+        ).hexdigest()
+
+        self.replacement_pattern = None
+        if self.replacements:
+            # Longest phrases first so "e-mail address" wins over "e-mail"
+            phrases = sorted(self.replacements, key=len, reverse=True)
+            self.replacement_pattern = re.compile(
+                r'(?<!\w)(?:' + '|'.join(re.escape(phrase) for phrase in phrases) + r')(?!\w)',
+                re.IGNORECASE
+            )
+
+    @cached_property
+    def paraphraser(self):
+        """Paraphrase engine over this ruleset's vocabulary, built on first use"""
+        return ParaphraseEngine(self.vocabulary)
+
+    def house_style_matches(self, text):
+        """Yield (match, replacement) for every house style phrase in text"""
+        if self.replacement_pattern is None:
+            return
+        for match in self.replacement_pattern.finditer(text):
+            yield match, self.replacements[match.group().lower()]
+
+def _team_ids_for(user_id, team_id):
+    team_ids = set()
+    if team_id is not None:
+        team_ids.add(team_id)
+    if user_id is not None:
+        rows = db.session.query(team_members.c.team_id).filter(team_members.c.user_id == user_id)
+        team_ids.update(row.team_id for row in rows)
+    return tuple(sorted(team_ids))
+
+def _entry_filter(user_id, team_ids):
+    clauses = []
+    if user_id is not None:
+        clauses.append(DictionaryEntry.user_id == user_id)
+    if team_ids:
+        clauses.append(DictionaryEntry.team_id.in_(team_ids))
+    return or_(*clauses)
+
+def get_ruleset(pack, user_id=None, team_id=None):
+    """Return the compiled ruleset for a rule pack and a user and/or team.
+
+    Only a cheap aggregate query runs per request; the merge and regex
+    compile happen once per dictionary revision.
+    """
+    key = (pack.language, user_id, team_id)
+    if user_id is None and team_id is None:
+        cached = _ruleset_cache.get(key)
+        if cached is None:
+            cached = ((), Ruleset(pack.grammar_rules, pack.vocabulary, pack_version=pack.version))
+            _ruleset_cache.put(key, cached)
+        return cached[1]
+
+    team_ids = _team_ids_for(user_id, team_id)
+    entry_filter = _entry_filter(user_id, team_ids)
+    count, max_id, last_update = db.session.query(
+        func.count(DictionaryEntry.id), func.max(DictionaryEntry.id), func.max(DictionaryEntry.updated_at)
+    ).filter(entry_filter).one()
+    fingerprint = (team_ids, count, max_id, last_update)
+
+    cached = _ruleset_cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    ignored = set()
+    replacements = {}
+    # Team entries first so a user's own house style overrides their team's
+    entries = DictionaryEntry.query.filter(entry_filter).order_by(
+        DictionaryEntry.user_id.isnot(None), DictionaryEntry.id
+    )
+    for entry in entries:
+        if entry.kind == 'ignore':
+            ignored.add(entry.word)
+        elif entry.kind == 'replace' and entry.replacement:
+            replacements[entry.word] = entry.replacement
+
+    ruleset = Ruleset(pack.grammar_rules, pack.vocabulary, ignored, replacements, pack.version)
+    _ruleset_cache.put(key, (fingerprint, ruleset))
+    return ruleset
+
+def invalidate_rulesets(user_ids=(), team_id=None):
+    """Drop cached rulesets touched by a dictionary or membership edit.
+
+    Other workers notice the change through the fingerprint check; this just
+    frees the stale entries on the editing worker straight away.
+    """
+    for language in SUPPORTED_LANGUAGES:
+        for user_id in user_ids:
+            _ruleset_cache.pop((language, user_id, None))
+            _ruleset_cache.pop((language, user_id, team_id))
+        if team_id is not None:
+            _ruleset_cache.pop((language, None, team_id))
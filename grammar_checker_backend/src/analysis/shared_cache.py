@@ -0,0 +1,489 @@
+"""Result cache shared by every worker on a node.
+
+The LRU caches elsewhere live inside one gunicorn worker. With many
+workers per node, the same document checked twice usually lands on two
+different workers and is analyzed twice. This tier sits outside the
+workers. It stores finished /check and /auto_fix bodies and rendered PDF
+reports under a digest of everything that determines them, including the
+ruleset version, so a dictionary edit or a rule change simply stops
+matching the old entries.
+
+Backends:
+
+* ``sqlite``: a WAL-mode SQLite file. Entries are evicted least recently
+  used first once the stored bytes pass the size limit.
+* ``shm``: a fixed-size table in a memory-mapped file (under ``/dev/shm``
+  when available). Each key hashes to a set of four slots, and the oldest
+  slot in the set is overwritten, so the segment never grows.
+* ``memory``: an in-process stand-in for a networked store such as
+  memcached or Redis. A client for one only needs the same ``get``,
+  ``put`` and ``clear`` methods.
+* ``none``: caching disabled.
+
+The cached bodies contain the documents themselves, so the file backends
+keep their data in a directory only this user can enter, create their
+files with mode 0600 and refuse files that belong to someone else. Keys
+also cover a digest of this package's source, so a deploy that changes
+analysis or scoring code does not serve results computed by the old one.
+
+Values are zlib compressed when that makes them smaller. Any backend error
+is logged and then treated as a miss, so a cache problem never fails a
+request.
+"""
+import functools
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Mixed into every key along with code_fingerprint(); bump it when a cached
+# payload changes shape without any change to the package's source
+SCHEMA_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+COMPRESS_MIN_BYTES = 512
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint():
+    """Digest of every Python source file in the src package, read once per process"""
+    digest = hashlib.blake2b(digest_size=16)
+    for directory, subdirectories, files in os.walk(PACKAGE_ROOT):
+        subdirectories[:] = sorted(name for name in subdirectories if name not in ("__pycache__", "static"))
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, PACKAGE_ROOT).encode("utf-8") + b"\0")
+                with open(path, "rb") as handle:
+                    digest.update(hashlib.blake2b(handle.read(), digest_size=16).digest())
+    return digest.hexdigest()
+
+def cache_key(namespace, *parts):
+    """Digest identifying a cached value: a namespace plus the strings or bytes it depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{SCHEMA_VERSION}\0{code_fingerprint()}\0{namespace}".encode("utf-8"))
+    for part in parts:
+        part = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        # Length prefixed so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.digest()
+
+def _check_owner(info, path):
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user; not using it for the shared cache")
+
+def private_directory(path):
+    """Create path as a directory only this user can enter, or check that an existing one is ours.
+
+    Refuses symlinks and directories owned by another user, and takes
+    group and other permissions away from our own.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory; not using it for the shared cache")
+    _check_owner(info, path)
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+def _open_private(path):
+    """Open path read-write, creating it with mode 0600, refusing symlinks and other users' files"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        info = os.fstat(fd)
+        if not stat.S_ISREG(info.st_mode):
+            raise PermissionError(f"{path} is not a regular file; not using it for the shared cache")
+        _check_owner(info, path)
+        if info.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+class CacheBackend:
+    """Byte store behind SharedCache; keys are 16 byte digests.
+
+    Implementations must be safe to call from several threads and, for
+    the shared backends, from several processes at once.
+    """
+    name = "none"
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {}
+
+class SQLiteBackend(CacheBackend):
+    """Entries in a SQLite file, trimmed least recently used first above max_bytes"""
+    name = "sqlite"
+    # Reads refresh an entry's last use at most this often, to keep reads write-free
+    TOUCH_SECONDS = 60
+    # Eviction trims down to this share of max_bytes so it doesn't run on every put
+    LOW_WATER = 0.9
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        # Create the database ourselves so it is 0600 (SQLite gives its WAL
+        # and index files the same mode) and check any existing journal files
+        os.close(_open_private(path))
+        for suffix in ("-wal", "-shm"):
+            try:
+                info = os.lstat(path + suffix)
+            except FileNotFoundError:
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                raise PermissionError(f"{path + suffix} is not a regular file; not using it for the shared cache")
+            _check_owner(info, path + suffix)
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+                CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+                INSERT OR IGNORE INTO totals VALUES (0, 0);
+                CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries BEGIN
+                    UPDATE totals SET bytes = bytes + new.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries BEGIN
+                    UPDATE totals SET bytes = bytes - old.size WHERE id = 0;
+                END;
+            """)
+
+    def _connection(self):
+        # One connection per thread, reopened in forked workers
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        connection = self._connection()
+        row = connection.execute("SELECT value, used FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.TOUCH_SECONDS:
+            connection.execute("UPDATE entries SET used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            # Delete then insert so the size triggers see the replaced entry leave
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", (key, value, len(value), time.time()))
+            total = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(connection, total - int(self.max_bytes * self.LOW_WATER))
+
+    def _evict(self, connection, excess):
+        freed = 0
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def stats(self):
+        connection = self._connection()
+        entries = connection.execute("SELECT count(*) FROM entries").fetchone()[0]
+        stored = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        return {"path": self.path, "entries": entries, "bytes": stored, "max_bytes": self.max_bytes}
+
+class SharedMemoryBackend(CacheBackend):
+    """Set-associative table in a memory-mapped file shared by all workers.
+
+    The file holds a header and slot_count slots of slot_size bytes. A slot
+    is its write stamp, key, value length and value. Values that do not fit
+    in a slot are not cached. A file lock serializes access across
+    processes, and a thread lock does the same within one process.
+    """
+    name = "shm"
+    WAYS = 4
+    MAGIC = b"GPCACHE1"
+    _HEADER = struct.Struct("<8sIIQ")     # magic, slot count, slot size, write counter
+    _SLOT = struct.Struct("<Q16sI")       # write stamp, key, value length
+    HEADER_SIZE = 64
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, slot_size=64 * 1024):
+        self.path = path
+        self.slot_size = slot_size
+        self.slot_count = max(self.WAYS, max_bytes // slot_size // self.WAYS * self.WAYS)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._open()
+
+    def _open(self):
+        import fcntl
+        fd = _open_private(self.path)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, self._HEADER.size, 0)
+            if len(header) == self._HEADER.size and header[:8] == self.MAGIC:
+                # Another worker created it; adopt its geometry
+                _, self.slot_count, self.slot_size, _ = self._HEADER.unpack(header)
+            else:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.HEADER_SIZE + self.slot_count * self.slot_size)
+                os.pwrite(fd, self._HEADER.pack(self.MAGIC, self.slot_count, self.slot_size, 0), 0)
+            self._map = mmap.mmap(fd, self.HEADER_SIZE + self.slot_count * self.slot_size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        import fcntl
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker shares the parent's open file, and with it the lock
+                os.close(self._fd)
+                self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slots(self, key):
+        first = int.from_bytes(key[:8], "little") % (self.slot_count // self.WAYS) * self.WAYS
+        return [self.HEADER_SIZE + (first + way) * self.slot_size for way in range(self.WAYS)]
+
+    def get(self, key):
+        with self._locked(exclusive=False):
+            for offset in self._slots(key):
+                stamp, slot_key, length = self._SLOT.unpack_from(self._map, offset)
+                if stamp and slot_key == key:
+                    start = offset + self._SLOT.size
+                    return self._map[start:start + length]
+        return None
+
+    def put(self, key, value):
+        if len(value) > self.slot_size - self._SLOT.size:
+            return
+        with self._locked(exclusive=True):
+            counter = self._HEADER.unpack_from(self._map, 0)[3] + 1
+            struct.pack_into("<Q", self._map, 16, counter)
+            # Same key, else an empty slot, else the least recently written one
+            target = None
+            oldest = None
+            for offset in self._slots(key):
+                stamp, slot_key, _ = self._SLOT.unpack_from(self._map, offset)
+                if stamp and slot_key == key:
+                    target = offset
+                    break
+                if oldest is None or stamp < oldest[0]:
+                    oldest = (stamp, offset)
+            target = target if target is not None else oldest[1]
+            start = target + self._SLOT.size
+            self._map[start:start + len(value)] = value
+            self._SLOT.pack_into(self._map, target, counter, key, len(value))
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for slot in range(self.slot_count):
+                self._SLOT.pack_into(self._map, self.HEADER_SIZE + slot * self.slot_size, 0, bytes(16), 0)
+
+    def stats(self):
+        with self._locked(exclusive=False):
+            used = sum(1 for slot in range(self.slot_count)
+                       if self._SLOT.unpack_from(self._map, self.HEADER_SIZE + slot * self.slot_size)[0])
+        return {"path": self.path, "entries": used, "slots": self.slot_count, "slot_size": self.slot_size}
+
+class MemoryBackend(CacheBackend):
+    """In-process, size-bounded LRU standing in for a networked key-value store"""
+    name = "memory"
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._data[key] = value
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+class SharedCache:
+    """Compressing front for a CacheBackend that never lets backend errors escape"""
+
+    def __init__(self, backend, compress_level=6):
+        self.backend = backend
+        self.compress_level = compress_level
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self):
+        return self.backend.name != "none"
+
+    def get(self, key):
+        """The cached bytes for key, or None"""
+        try:
+            stored = self.backend.get(key)
+            value = None
+            if stored:
+                stored = bytes(stored)
+                value = zlib.decompress(stored[1:]) if stored[:1] == _ZLIB else stored[1:]
+        except (OSError, sqlite3.Error, zlib.error) as e:
+            self.errors += 1
+            logger.warning("Shared cache read failed: %s", e)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store bytes under key, compressed when that pays off"""
+        if not self.enabled:
+            return
+        stored = _RAW + value
+        if len(value) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(value, self.compress_level)
+            if len(compressed) < len(value):
+                stored = _ZLIB + compressed
+        try:
+            self.backend.put(key, stored)
+        except (OSError, sqlite3.Error) as e:
+            self.errors += 1
+            logger.warning("Shared cache write failed: %s", e)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """This worker's hit counts plus whatever the backend reports about itself"""
+        try:
+            backend = self.backend.stats()
+        except (OSError, sqlite3.Error) as e:
+            backend = {"error": str(e)}
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            **backend
+        }
+
+_directory = None
+
+def configure_shared_cache(directory):
+    """Set the directory the file backends use unless SHARED_CACHE_PATH names a file.
+
+    create_app() points it at the app's instance folder. Without it the
+    cache goes in a per-user directory under the system temp directory.
+    Only a call made before the first get_shared_cache() has any effect.
+    """
+    global _directory
+    _directory = directory
+
+def _user_directory(parent):
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(parent, f"grammarpro-{user}")
+
+def _default_path(name, filename):
+    if name == "shm" and os.path.isdir("/dev/shm"):
+        # Keep the table in memory rather than the app's folder on disk
+        directory = _user_directory("/dev/shm")
+    else:
+        directory = _directory or _user_directory(tempfile.gettempdir())
+    return os.path.join(private_directory(directory), filename)
+
+def create_backend(name, path=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Build a backend by name: sqlite, shm, memory or none"""
+    if name == "sqlite":
+        return SQLiteBackend(path or _default_path(name, "cache.sqlite3"), max_bytes)
+    if name == "shm":
+        return SharedMemoryBackend(path or _default_path(name, "cache.shm"), max_bytes)
+    if name == "memory":
+        return MemoryBackend(max_bytes)
+    if name == "none":
+        return CacheBackend()
+    raise ValueError(f"Unknown shared cache backend '{name}'. Use sqlite, shm, memory or none")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_shared_cache():
+    """Process-wide SharedCache, configured from the environment on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                name = os.environ.get("SHARED_CACHE_BACKEND", "sqlite")
+                max_bytes = int(float(os.environ.get("SHARED_CACHE_MAX_MB", 256)) * 1024 * 1024)
+                try:
+                    backend = create_backend(name, os.environ.get("SHARED_CACHE_PATH"), max_bytes)
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning("Shared cache unavailable, continuing without it: %s", e)
+                    backend = CacheBackend()
+                _cache = SharedCache(backend)
+    return _cache
@@ -0,0 +1,95 @@
+import re
+
+# Scripts written without spaces between words; every character becomes its
+# own token (Han ideographs, Hiragana, Katakana)
+_UNSPACED = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+
+# Combining marks that str.isalnum() rejects, so a bare \w splits words
+# written in decomposed Latin, Hebrew, Arabic, Indic or Thai script
+_MARKS = (
+    '\u0300-\u036f\u0483-\u0489\u0591-\u05c7\u0610-\u061a\u064b-\u065f\u0670'
+    '\u06d6-\u06ed\u0900-\u0903\u093a-\u094f\u0951-\u0957\u0962\u0963'
+    '\u0981-\u0983\u09bc-\u09d7\u0a01-\u0a03\u0a3c-\u0a51\u0b01-\u0b03'
+    '\u0bbe-\u0bcd\u0c00-\u0c04\u0c3e-\u0c56\u0d00-\u0d03\u0d3e-\u0d4d'
+    '\u0e31\u0e34-\u0e3a\u0e47-\u0e4e'
+)
+
+# Letters and digits, minus the unspaced scripts and the marks (kept
+# disjoint so runs of them match without backtracking)
+_LETTER = rf'[^\W_{_UNSPACED}{_MARKS}]'
+_MARK = rf'[{_MARKS}]'
+_RUN = rf'(?:{_LETTER}|{_MARK}){_LETTER}*(?:{_MARK}+{_LETTER}*)*'
+
+# A word is a run of letters/digits plus their combining marks, optionally
+# joined by an apostrophe or hyphen ("don't", "e-mail", "l'homme")
+WORD_PATTERN = re.compile(rf"[{_UNSPACED}]|{_RUN}(?:['’\-]{_RUN})*")
+
+# Sentence terminators across the scripts above, including the CJK full
+# stop and the Devanagari danda
+SENTENCE_END_PATTERN = re.compile(r'[.!?。！？।॥]+')
+
+# A blank line, possibly holding spaces, and the whitespace after it
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+
+_WHITESPACE = re.compile(r'\s')
+
+def iter_words(text):
+    """Yield a match object for every word in text"""
+    return WORD_PATTERN.finditer(text)
+
+def words(text):
+    """Return the list of words in text"""
+    return WORD_PATTERN.findall(text)
+
+def split_sentences(text):
+    """Split text into stripped, non-empty sentences"""
+    return [s.strip() for s in SENTENCE_END_PATTERN.split(text) if s.strip()]
+
+def count_sentences(text):
+    """Count sentence terminators, treating unterminated text as one sentence"""
+    return max(1, sum(1 for _ in SENTENCE_END_PATTERN.finditer(text)))
+
+def count_words_and_sentences(text):
+    """Word and sentence counts without keeping the tokens around.
+
+    Counting the matches of each pattern is faster than a single combined
+    pattern here, since the per-match Python work dominates, not the scan.
+    """
+    word_count = sum(1 for _ in WORD_PATTERN.finditer(text))
+    return word_count, count_sentences(text)
+
+def paragraph_spans(text):
+    """(start, end) of each paragraph with the break that follows it; together they cover text"""
+    spans = []
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        if match.end() < len(text):
+            spans.append((start, match.end()))
+            start = match.end()
+    spans.append((start, len(text)))
+    return spans
+
+def chunk_spans(text, size):
+    """(start, end) spans of at least size characters (bar the last) that together cover text.
+
+    A chunk ends just after a run of sentence terminators, so no word or
+    sentence is split between two chunks. When there is none within the
+    next size characters it ends at whitespace instead, which splits a
+    sentence but never a word, and failing that it runs to the end.
+    """
+    spans = []
+    start = 0
+    while len(text) - start > size:
+        target = start + size
+        match = SENTENCE_END_PATTERN.search(text, target, target + size)
+        if match is not None:
+            # The whole run, which may carry on past the search window
+            match = SENTENCE_END_PATTERN.match(text, match.start())
+        else:
+            match = _WHITESPACE.search(text, target)
+        if match is None:
+            break
+        spans.append((start, match.end()))
+        start = match.end()
+    spans.append((start, len(text)))
+    return spans
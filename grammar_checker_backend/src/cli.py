@@ -0,0 +1,198 @@
+"""Offline grammar checking for files, directories and stdin.
+
+    python -m src.cli check docs/ --workers 8 > results.jsonl
+    cat corpus.txt | python -m src.cli fix --lines --language es
+
+Runs the same analysis as /api/grammar/check and /api/grammar/auto_fix
+across a process pool and writes one JSON line per document, in input
+order, to stdout. Progress and throughput go to stderr.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from src.analysis.checker import check_text, auto_fix, document_insights, select_analyzers
+from src.analysis.rule_packs import load_pack, UnsupportedLanguageError
+
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Per-process state set up once by the pool initializer
+_worker = {}
+
+def _init_worker(command, language, time_budget, analyzers=None, insights=False):
+    _worker["command"] = command
+    _worker["pack"] = load_pack(language)
+    _worker["time_budget"] = time_budget
+    _worker["analyzers"] = analyzers
+    _worker["insights"] = insights
+
+def _analyze(text):
+    pack = _worker["pack"]
+    if _worker["command"] == "fix":
+        return auto_fix(text, pack)
+    if _worker["insights"]:
+        return document_insights(text, pack)
+    return check_text(text, pack, time_budget=_worker["time_budget"], analyzers=_worker["analyzers"])
+
+def _process(item):
+    """Run one document; item is (source, path, text) with text None for files.
+
+    Any failure becomes an "error" in that document's record, so one bad
+    input can't abort the whole run.
+    """
+    source, path, text = item
+    record = {"source": source}
+    try:
+        if text is None:
+            with open(path, encoding="utf-8") as handle:
+                text = handle.read()
+    except (OSError, UnicodeDecodeError) as e:
+        record["characters"] = 0
+        record["error"] = str(e)
+        return record
+    record["characters"] = len(text)
+    try:
+        record["result"] = _analyze(text)
+    except Exception as e:
+        record["error"] = f"Analysis failed: {type(e).__name__}: {e}"
+    return record
+
+def _iter_files(path, extensions):
+    if os.path.isfile(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if not extensions or os.path.splitext(name)[1].lower() in extensions:
+                yield os.path.join(root, name)
+
+def iter_inputs(paths, extensions, lines=False, stdin=sys.stdin):
+    """Yield (source, path, text) work items in a stable order"""
+    if not paths or paths == ["-"]:
+        if lines:
+            for number, line in enumerate(stdin, 1):
+                line = line.rstrip("\n")
+                if line.strip():
+                    yield f"stdin:{number}", None, line
+        else:
+            yield "stdin", None, stdin.read()
+        return
+    for path in paths:
+        for file_path in _iter_files(path, extensions):
+            yield file_path, file_path, None
+
+class Progress:
+    """Throttled documents/characters throughput report on stderr"""
+
+    def __init__(self, enabled=True, stream=sys.stderr):
+        self.enabled = enabled
+        self.stream = stream
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.documents = 0
+        self.characters = 0
+        self.failures = 0
+
+    def update(self, record):
+        self.documents += 1
+        self.characters += record.get("characters", 0)
+        self.failures += "error" in record
+        now = time.monotonic()
+        if self.enabled and now - self.last_report >= PROGRESS_INTERVAL_SECONDS:
+            self.last_report = now
+            self.stream.write("\r" + self.summary())
+            self.stream.flush()
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (f"{self.documents} docs ({self.failures} failed), "
+                f"{self.characters / 1e6:.1f} MB in {elapsed:.1f}s: "
+                f"{self.documents / elapsed:.1f} docs/s, {self.characters / 1e6 / elapsed:.2f} MB/s")
+
+    def finish(self):
+        if self.enabled:
+            self.stream.write("\r" + self.summary() + "\n")
+            self.stream.flush()
+
+def run(args, stdin=sys.stdin, stdout=sys.stdout):
+    try:
+        language = load_pack(args.language).language
+    except UnsupportedLanguageError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    try:
+        analyzers = select_analyzers(getattr(args, "analyzers", None))
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    extensions = {ext if ext.startswith(".") else "." + ext
+                  for ext in args.extensions.lower().split(",") if ext}
+    items = iter_inputs(args.paths, extensions, args.lines, stdin)
+    time_budget = args.time_budget_ms / 1000 if args.time_budget_ms else None
+    progress = Progress(enabled=not args.quiet)
+    initargs = (args.command, language, time_budget, analyzers, getattr(args, "insights", False))
+
+    if args.workers == 1:
+        _init_worker(*initargs)
+        records = map(_process, items)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=initargs)
+        # imap keeps input order while the pool works ahead
+        records = pool.imap(_process, items, chunksize=args.chunksize)
+
+    try:
+        for record in records:
+            stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            progress.update(record)
+    except BaseException:
+        # Output closed (e.g. piped into head) or interrupted: don't wait
+        # for the rest of the corpus
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        progress.finish()
+    return 1 if progress.failures else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Offline grammar checking")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("check", "Report errors and insights (same as /check)"),
+                            ("fix", "Apply automatic fixes (same as /auto_fix)")):
+        command = subcommands.add_parser(name, help=help_text)
+        command.add_argument("paths", nargs="*", help="Files or directories; omit or '-' to read stdin")
+        command.add_argument("--language", default=None, help="Rule pack language (default: en)")
+        command.add_argument("--lines", action="store_true", help="Treat each stdin line as a separate document")
+        command.add_argument("--extensions", default=".txt,.md", help="Comma separated extensions to pick up from directories")
+        command.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+        command.add_argument("--chunksize", type=int, default=16, help="Documents handed to a worker at a time")
+        command.add_argument("--time-budget-ms", type=float, default=None, help="Per-document time budget for check")
+        command.add_argument("--quiet", action="store_true", help="Suppress progress output")
+        if name == "check":
+            command.add_argument("--analyzers", default=None, help="Comma separated analyzers to run (default: all but repetition)")
+            command.add_argument("--insights", action="store_true", help="Only counts, reading time and tone")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        print("--workers must be at least 1", file=sys.stderr)
+        return 2
+    try:
+        return run(args)
+    except BrokenPipeError:
+        # Keep the interpreter from complaining again while flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
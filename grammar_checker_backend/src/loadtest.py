@@ -0,0 +1,397 @@
+"""HTTP load generator for the grammar endpoints.
+
+    python -m src.loadtest --url http://127.0.0.1:5000 --duration 60 --concurrency 32
+    python -m src.loadtest --spawn "gunicorn -w 4 -b 127.0.0.1:5000 src.main:app" --json > run.json
+
+Drives a weighted mix of /check, /auto_fix, /pdf_report and /paraphrase
+requests from closed-loop worker threads. Documents are drawn from a
+log-normal size distribution, so most requests are a few hundred words
+and a tail runs to many thousands. The report gives throughput, error
+rates and p50/p95/p99 latency per endpoint, and a per-second timeline
+with the resident memory of the server's process tree. Pass --pid or
+--spawn to get the memory figures; they are read from /proc, so Linux only.
+A single client process tops out at a few hundred requests per second;
+run several side by side to push a large deployment.
+
+The document pool is small and seeded, so against a warm shared result
+cache nearly every request would be a hit. A server started with --spawn
+therefore runs with SHARED_CACHE_BACKEND=none unless --cache is given.
+A server started some other way keeps its own setting. The report counts
+X-Cache hits per endpoint, so a run that measured the cache shows it.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_SENTENCES = [
+    "Teh grammer of this sentance is very good.",
+    "The quarterly report was written by the finance team in order to explain the results.",
+    "Our customers said the new dashboard is a big improvement over the old one.",
+    "Due to the fact that the deadline moved, we need to act quickly.",
+    "Its important to check your work before you send it to there manager.",
+    "The committee reviewed the proposal carefully before the vote was taken.",
+    "In my opinion, this approach is really very interesting and quite useful.",
+    "A large number of users reported that the app was slow on older phones.",
+    "Please let me know if you have any questions about the plan.",
+    "The experiment was repeated three times and the results were consistent.",
+    "We will leverage our existing tools rather than build new ones from scratch.",
+    "At this point in time, the budget has not been approved by the board.",
+]
+
+SAMPLE_INSIGHTS = {
+    "overall_score": 78, "word_count": 0, "character_count": 0, "sentence_count": 0,
+    "reading_time": 1, "speaking_time": 1, "tone": "professional",
+    "correctness_errors": 3, "clarity_suggestions": 2, "engagement_suggestions": 4, "delivery_suggestions": 1
+}
+
+def _check(document):
+    return {"text": document}
+
+def _pdf_report(document):
+    insights = dict(SAMPLE_INSIGHTS, word_count=len(document.split()), character_count=len(document))
+    return {"text": document, "insights": insights, "suggestions": {"Teh": ["the"], "grammer": ["grammar"]}}
+
+def _paraphrase(document):
+    return {"text": document, "variants": 3}
+
+# name -> (path, payload builder)
+ENDPOINTS = {
+    "check": ("/api/grammar/check", _check),
+    "auto_fix": ("/api/grammar/auto_fix", _check),
+    "pdf_report": ("/api/grammar/pdf_report", _pdf_report),
+    "paraphrase": ("/api/grammar/paraphrase", _paraphrase),
+}
+DEFAULT_MIX = "check=60,auto_fix=20,paraphrase=15,pdf_report=5"
+
+def parse_mix(mix):
+    """"check=60,auto_fix=20" -> {"check": 60.0, "auto_fix": 20.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+        if weights[name] < 0:
+            raise ValueError(f"Weight for {name} must not be negative")
+    if not any(weights.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return weights
+
+def make_document(rng, words):
+    """Paragraphs of sample sentences adding up to roughly words words"""
+    paragraphs = []
+    count = 0
+    while count < words:
+        paragraph = []
+        for _ in range(rng.randint(3, 7)):
+            sentence = rng.choice(SAMPLE_SENTENCES)
+            paragraph.append(sentence)
+            count += len(sentence.split())
+            if count >= words:
+                break
+        paragraphs.append(" ".join(paragraph))
+    return "\n\n".join(paragraphs)
+
+def document_pool(rng, size, median_words, sigma, max_words):
+    """Documents with log-normally distributed lengths"""
+    return [make_document(rng, int(min(max_words, max(20, rng.lognormvariate(math.log(median_words), sigma)))))
+            for _ in range(size)]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+# Server memory
+
+def _children(pid):
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as handle:
+                children += [int(child) for child in handle.read().split()]
+    except OSError:
+        pass
+    return children
+
+def process_tree(pid):
+    pids = [pid]
+    for parent in pids:
+        pids += _children(parent)
+    return pids
+
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+class MemorySampler(threading.Thread):
+    """Samples the RSS of pid and its descendants (e.g. gunicorn workers) every interval seconds"""
+
+    def __init__(self, pid, interval, started):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.started = started
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            sizes = {pid: rss_bytes(pid) for pid in process_tree(self.pid)}
+            sizes = {pid: size for pid, size in sizes.items() if size is not None}
+            if sizes:
+                self.samples.append({
+                    "t": round(time.monotonic() - self.started, 2),
+                    "total_rss_mb": round(sum(sizes.values()) / 2 ** 20, 1),
+                    "max_process_rss_mb": round(max(sizes.values()) / 2 ** 20, 1),
+                    "processes": len(sizes)
+                })
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+# Load generation
+
+class Worker(threading.Thread):
+    """Closed loop client: sends the next request as soon as the last one finishes"""
+
+    def __init__(self, index, base_url, weights, documents, deadline, timeout, seed):
+        super().__init__(name=f"load-{index}", daemon=True)
+        self.base_url = base_url
+        self.names = list(weights)
+        self.weights = list(weights.values())
+        self.documents = documents
+        self.deadline = deadline
+        self.timeout = timeout
+        self.rng = random.Random(f"{seed}:{index}")
+        self.results = []
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            name = self.rng.choices(self.names, self.weights)[0]
+            path, build = ENDPOINTS[name]
+            body = json.dumps(build(self.rng.choice(self.documents))).encode("utf-8")
+            request = urllib.request.Request(self.base_url + path, data=body, method="POST",
+                                             headers={"Content-Type": "application/json"})
+            started = time.monotonic()
+            error = None
+            cached = False
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                    status = response.status
+                    cached = response.headers.get("X-Cache") == "hit"
+            except urllib.error.HTTPError as e:
+                e.read()
+                status = e.code
+            except (urllib.error.URLError, OSError) as e:
+                status = 0
+                error = type(getattr(e, "reason", e)).__name__
+            finished = time.monotonic()
+            self.results.append((finished, name, finished - started, status, error, cached))
+
+def _wait_for_port(url, timeout):
+    parsed = urllib.parse.urlparse(url)
+    address = (parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(address, timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def _summarize(results, elapsed):
+    latencies = sorted(latency for _, _, latency, _, _, _ in results)
+    errors = [status for _, _, _, status, _, _ in results if not 200 <= status < 300]
+    return {
+        "requests": len(results),
+        "cache_hits": sum(cached for *_, cached in results),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(results), 4) if results else 0.0,
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        **{f"{label}_ms": round(percentile(latencies, fraction) * 1000, 1) if latencies else None
+           for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))}
+    }
+
+def build_report(results, run_started, measured_from, measured_until, memory, args, weights):
+    measured = [result for result in results if measured_from <= result[0] <= measured_until]
+    elapsed = measured_until - measured_from
+    by_endpoint = {name: [result for result in measured if result[1] == name] for name in weights}
+    failures = {}
+    for _, name, _, status, error, _ in measured:
+        if not 200 <= status < 300:
+            key = f"{name}: {error or status}"
+            failures[key] = failures.get(key, 0) + 1
+
+    # Per-second timeline over the whole run, warm-up included
+    timeline = {}
+    for finished, _, latency, status, _, _ in results:
+        bucket = timeline.setdefault(int(finished - run_started), {"requests": 0, "errors": 0, "latencies": []})
+        bucket["requests"] += 1
+        bucket["errors"] += not 200 <= status < 300
+        bucket["latencies"].append(latency)
+    for sample in memory:
+        timeline.setdefault(int(sample["t"]), {"requests": 0, "errors": 0, "latencies": []})["rss"] = sample
+    seconds = []
+    for second in sorted(timeline):
+        bucket = timeline[second]
+        latencies = sorted(bucket.pop("latencies"))
+        rss = bucket.pop("rss", None)
+        seconds.append({
+            "second": second,
+            **bucket,
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+            "total_rss_mb": rss["total_rss_mb"] if rss else None,
+            "max_process_rss_mb": rss["max_process_rss_mb"] if rss else None
+        })
+
+    return {
+        "config": {
+            "url": args.url, "concurrency": args.concurrency, "duration_s": args.duration,
+            "warmup_s": args.warmup, "mix": weights, "median_words": args.median_words,
+            "size_sigma": args.size_sigma, "max_words": args.max_words, "shared_cache": args.cache
+        },
+        "overall": _summarize(measured, elapsed),
+        "endpoints": {name: _summarize(items, elapsed) for name, items in by_endpoint.items()},
+        "failures": failures,
+        "memory": {
+            "peak_total_rss_mb": max((sample["total_rss_mb"] for sample in memory), default=None),
+            "peak_process_rss_mb": max((sample["max_process_rss_mb"] for sample in memory), default=None),
+            "final_total_rss_mb": memory[-1]["total_rss_mb"] if memory else None
+        },
+        "timeline": seconds
+    }
+
+def format_report(report):
+    def cell(value):
+        return "-" if value is None else f"{value:g}"
+
+    lines = [f"{'endpoint':<12} {'reqs':>7} {'hits':>6} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+             f"{'max':>8}  (ms)"]
+    rows = list(report["endpoints"].items()) + [("all", report["overall"])]
+    for name, stats in rows:
+        lines.append(f"{name:<12} {stats['requests']:>7} {stats['cache_hits']:>6} {stats['throughput_rps']:>8.1f} "
+                     f"{stats['error_rate'] * 100:>6.2f} {cell(stats['p50_ms']):>8} {cell(stats['p95_ms']):>8} "
+                     f"{cell(stats['p99_ms']):>8} {cell(stats['max_ms']):>8}")
+    memory = report["memory"]
+    if memory["peak_total_rss_mb"] is not None:
+        lines += ["", f"Server RSS: peak {memory['peak_total_rss_mb']:g} MB total, "
+                      f"{memory['peak_process_rss_mb']:g} MB largest process, "
+                      f"{memory['final_total_rss_mb']:g} MB at the end"]
+    if report["failures"]:
+        lines += ["", "Failures:"] + [f"  {key}: {count}" for key, count in sorted(report["failures"].items())]
+    lines += ["", "Timeline:", f"  {'s':>4} {'reqs':>6} {'err':>5} {'p95 ms':>8} {'rss MB':>8}"]
+    for second in report["timeline"]:
+        lines.append(f"  {second['second']:>4} {second['requests']:>6} {second['errors']:>5} "
+                     f"{cell(second['p95_ms']):>8} {cell(second['total_rss_mb']):>8}")
+    return "\n".join(lines)
+
+def run(args):
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    documents = document_pool(rng, args.documents, args.median_words, args.size_sigma, args.max_words)
+
+    server = None
+    pid = args.pid
+    if args.spawn:
+        # The server's own output goes to stderr so it can't mix with a JSON report
+        env = dict(os.environ) if args.cache else {**os.environ, "SHARED_CACHE_BACKEND": "none"}
+        server = subprocess.Popen(shlex.split(args.spawn), cwd=BACKEND_ROOT, stdout=sys.stderr, env=env)
+        pid = server.pid
+    try:
+        if not _wait_for_port(args.url, args.startup_timeout):
+            print(f"Nothing is listening at {args.url}", file=sys.stderr)
+            return 2
+
+        run_started = time.monotonic()
+        sampler = None
+        if pid:
+            sampler = MemorySampler(pid, args.sample_interval, run_started)
+            sampler.start()
+        deadline = run_started + args.warmup + args.duration
+        workers = [Worker(i, args.url.rstrip("/"), weights, documents, deadline, args.timeout, args.seed)
+                   for i in range(args.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if sampler is not None:
+            sampler.stop()
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    results = sorted(result for worker in workers for result in worker.results)
+    report = build_report(results, run_started, run_started + args.warmup, deadline,
+                          sampler.samples if sampler else [], args, weights)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    if args.max_error_rate is not None and report["overall"]["error_rate"] > args.max_error_rate:
+        return 1
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.loadtest", description="HTTP load test for the grammar API")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Server base URL")
+    parser.add_argument("--spawn", default=None, help="Start this server command first and stop it afterwards")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the shared result cache on in a --spawn server (off by default)")
+    parser.add_argument("--pid", type=int, default=None, help="Server pid to sample RSS from (its children are included)")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring starts")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--median-words", type=int, default=350, help="Median document length")
+    parser.add_argument("--size-sigma", type=float, default=0.9, help="Spread of the log-normal document length")
+    parser.add_argument("--max-words", type=int, default=20000, help="Longest document")
+    parser.add_argument("--documents", type=int, default=200, help="Distinct documents to draw from")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument("--startup-timeout", type=float, default=30, help="Seconds to wait for the server to listen")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for documents and request choice")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Exit 1 if the error rate exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.concurrency < 1 or args.duration <= 0:
+        print("--concurrency must be at least 1 and --duration positive", file=sys.stderr)
+        return 2
+    try:
+        return run(args)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,45 +3,94 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from src.startup import startup_timer
+
+import click
+from flask import Flask, send_from_directory, jsonify
+from flask.cli import with_appcontext
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.grammar_check import grammar_check_bp
+from src.routes.dictionary import dictionary_bp
+from src.analysis.shared_cache import configure_shared_cache
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+startup_timer.mark_imported()
 
-# Enable CORS for all routes
-CORS(app)
+def create_app(config=None):
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    # Upper bound on a single /check; requests may ask for less via time_budget_ms
+    app.config['CHECK_TIME_BUDGET_MS'] = int(os.environ.get('CHECK_TIME_BUDGET_MS', 5000))
+    # Hard cap on any request body; endpoints set tighter limits of their own
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 8 * 1024 * 1024))
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Private folder for the shared result cache's files; it holds document text
+    app.config['SHARED_CACHE_DIR'] = os.environ.get('SHARED_CACHE_DIR', os.path.join(app.instance_path, 'shared-cache'))
+    if config:
+        app.config.update(config)
+    configure_shared_cache(app.config['SHARED_CACHE_DIR'])
 
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(grammar_check_bp, url_prefix='/api/grammar')
+    # Enable CORS for all routes
+    CORS(app)
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(dictionary_bp, url_prefix='/api')
+    app.register_blueprint(grammar_check_bp, url_prefix='/api/grammar')
+
+    # Schema creation is an explicit step (`flask --app src.main init-db`),
+    # not something every worker does on boot
+    db.init_app(app)
+    app.cli.add_command(init_db_command)
+
+    startup_timer.install(app)
+
+    # Body and parsing errors are answered in the same shape as the API's own errors
+    for error in (BadRequest, RequestEntityTooLarge, UnsupportedMediaType):
+        app.register_error_handler(error, lambda e: (jsonify({"error": e.description}), e.code))
+
+    @app.route('/api/startup', methods=['GET'])
+    def startup_report():
+        return jsonify(startup_timer.report())
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+
+    startup_timer.mark_app_created()
+    return app
+
+def init_db(app):
+    """Create any missing tables"""
+    with app.app_context():
+        db.create_all()
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing database tables."""
+    db.create_all()
+    click.echo('Initialized the database.')
+
+app = create_app()
 
 
 if __name__ == '__main__':
+    init_db(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
-
@@ -0,0 +1,52 @@
+from datetime import datetime
+from src.models.user import db
+
+team_members = db.Table(
+    'team_members',
+    db.Column('team_id', db.Integer, db.ForeignKey('team.id'), primary_key=True),
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+)
+
+class Team(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    members = db.relationship('User', secondary=team_members, lazy='select',
+                              backref=db.backref('teams', lazy='select'))
+
+    def __repr__(self):
+        return f'<Team {self.name}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'member_ids': [member.id for member in self.members]
+        }
+
+class DictionaryEntry(db.Model):
+    """A custom dictionary word owned by either a user or a team.
+
+    ``kind`` is ``'ignore'`` for words that must never be flagged (product
+    names, jargon) or ``'replace'`` for house style rewrites, in which case
+    ``replacement`` holds the preferred spelling.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=True, index=True)
+    kind = db.Column(db.String(16), nullable=False, default='ignore')
+    word = db.Column(db.String(120), nullable=False)
+    replacement = db.Column(db.String(120), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DictionaryEntry {self.kind}:{self.word}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'team_id': self.team_id,
+            'kind': self.kind,
+            'word': self.word,
+            'replacement': self.replacement
+        }
@@ -0,0 +1,171 @@
+"""Bounded, incremental parsing of JSON request bodies.
+
+``request.get_json()`` buffers the raw body, decodes it to one big string
+and then parses that, so a large paste is held in memory three times
+before any validation runs. ``json_body()`` instead reads the stream in
+chunks: string values (the document ``text``) are decoded straight into
+their final form and everything already consumed is dropped. ``body_limit``
+caps the body size per endpoint; anything over it gets a 413 before the
+body is read, or as soon as a chunked upload crosses the limit.
+"""
+import codecs
+import functools
+import json
+import re
+from json.decoder import scanstring
+
+from flask import current_app, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters and complete escapes inside a JSON string; a high surrogate is
+# only taken together with its low half, or once it is known to have none
+_HIGH = r'\\u[dD][89abAB][0-9a-fA-F]{2}'
+_LOW = r'\\u[dD][c-fC-F][0-9a-fA-F]{2}'
+_STRING_BODY = re.compile(
+    r'(?:[^"\\\x00-\x1f]+|\\["\\/bfnrt]|\\u(?![dD][89abAB])[0-9a-fA-F]{4}'
+    rf'|{_HIGH}(?:{_LOW}|(?=[^\\]|\\[^u]|\\u(?![dD][c-fC-F])[0-9a-fA-F]{{4}})))*'
+)
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+_decoder = json.JSONDecoder()
+
+class _ObjectReader:
+    """Parses one top-level JSON object from a byte stream, a chunk at a time"""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum=1):
+        """Make at least minimum unread characters available; False if the body ends first"""
+        if len(self.buffer) - self.pos >= minimum or self.eof:
+            return len(self.buffer) - self.pos >= minimum
+        pieces = [self.buffer[self.pos:]]
+        available = len(pieces[0])
+        while available < minimum and not self.eof:
+            chunk = self.stream.read(self.chunk_size)
+            if chunk:
+                text = self.utf8.decode(chunk)
+            else:
+                self.eof = True
+                text = self.utf8.decode(b"", final=True)
+            pieces.append(text)
+            available += len(text)
+        # One join per fill so long values are not copied once per chunk
+        self.buffer = "".join(pieces)
+        self.pos = 0
+        return available >= minimum
+
+    def peek(self):
+        """Skip whitespace and return the next character, or "" at the end of the body"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expecting '{char}' at character {self.pos}")
+        self.pos += 1
+
+    def read_string(self):
+        self.expect('"')
+        parts = []
+        while True:
+            # Enough lookahead that an escape is never split across the edge
+            self.fill(12)
+            end = _STRING_BODY.match(self.buffer, self.pos).end()
+            if end > self.pos:
+                # Decode everything up to the edge of the buffer in one go,
+                # so a long value is a handful of chunk sized parts
+                parts.append(scanstring(self.buffer[self.pos:end] + '"', 0)[0])
+                self.pos = end
+                continue
+            if self.pos >= len(self.buffer):
+                raise ValueError("Unterminated string")
+            char = self.buffer[self.pos]
+            if char == '"':
+                self.pos += 1
+                return "".join(parts)
+            if char == '\\':
+                raise ValueError("Invalid \\escape")
+            raise ValueError("Invalid control character in string")
+
+    def read_value(self):
+        if self.peek() == '"':
+            return self.read_string()
+        # Numbers, literals and nested containers are small in practice;
+        # grow the buffer geometrically until the decoder can finish one
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(e.msg)
+                self.fill(2 * (len(self.buffer) - self.pos) + self.chunk_size)
+                continue
+            if not self.eof and _NUMBER_TAIL.fullmatch(self.buffer, end):
+                # A number cut at "1" or "1." could continue in the next chunk
+                self.fill(len(self.buffer) - self.pos + 1)
+                continue
+            self.pos = end
+            return value
+
+    def read_object(self):
+        if self.peek() != '{':
+            raise ValueError("Request body must be a JSON object")
+        self.pos += 1
+        data = {}
+        if self.peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                if self.peek() != '"':
+                    raise ValueError("Expecting property name enclosed in double quotes")
+                key = self.read_string()
+                self.expect(':')
+                data[key] = self.read_value()
+                char = self.peek()
+                self.pos += 1
+                if char == '}':
+                    break
+                if char != ',':
+                    raise ValueError("Expecting ',' delimiter")
+        if self.peek() != "":
+            raise ValueError("Extra data after the JSON object")
+        return data
+
+def parse_json_object(stream, chunk_size=CHUNK_SIZE):
+    """Parse a JSON object from a binary stream; raises ValueError on malformed input"""
+    return _ObjectReader(stream, chunk_size).read_object()
+
+def json_body():
+    """The request's JSON object, parsed incrementally within the endpoint's size limit"""
+    if not request.is_json:
+        raise UnsupportedMediaType("Request body must be JSON (Content-Type: application/json)")
+    try:
+        return parse_json_object(request.stream)
+    except ValueError as e:
+        raise BadRequest(f"Invalid JSON body: {e}")
+
+def body_limit(max_bytes):
+    """Cap the request body of a view at max_bytes (or MAX_CONTENT_LENGTH if lower)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def limited(*args, **kwargs):
+            app_limit = current_app.config.get("MAX_CONTENT_LENGTH")
+            limit = min(max_bytes, app_limit) if app_limit else max_bytes
+            request.max_content_length = limit
+            if request.content_length is not None and request.content_length > limit:
+                raise RequestEntityTooLarge(f"Request body is limited to {limit} bytes on this endpoint")
+            return view(*args, **kwargs)
+        return limited
+    return decorator
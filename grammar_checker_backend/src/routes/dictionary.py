@@ -0,0 +1,140 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy.exc import IntegrityError
+from src.models.user import User, db
+from src.models.dictionary import Team, DictionaryEntry
+from src.analysis.rulesets import invalidate_rulesets
+
+dictionary_bp = Blueprint('dictionary', __name__)
+
+ENTRY_KINDS = ('ignore', 'replace')
+
+def _invalidate_for(entry):
+    if entry.team_id is not None:
+        team = Team.query.get(entry.team_id)
+        member_ids = [member.id for member in team.members] if team else []
+        invalidate_rulesets(member_ids, team_id=entry.team_id)
+    else:
+        invalidate_rulesets([entry.user_id])
+
+def _text(data, key):
+    """A stripped string field of the payload, '' when missing or null; TypeError for other types"""
+    value = data.get(key)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise TypeError(f"{key} must be a string")
+    return value.strip()
+
+def _create_entry(data, user_id=None, team_id=None):
+    try:
+        word = _text(data, 'word')
+        replacement = _text(data, 'replacement') or None
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
+    kind = data.get('kind', 'ignore')
+    if not word:
+        return jsonify({"error": "No word provided"}), 400
+    if kind not in ENTRY_KINDS:
+        return jsonify({"error": f"kind must be one of {', '.join(ENTRY_KINDS)}"}), 400
+    if kind == 'replace' and not replacement:
+        return jsonify({"error": "replace entries need a replacement"}), 400
+
+    entry = DictionaryEntry(user_id=user_id, team_id=team_id, kind=kind, word=word, replacement=replacement)
+    db.session.add(entry)
+    db.session.commit()
+    _invalidate_for(entry)
+    return jsonify(entry.to_dict()), 201
+
+@dictionary_bp.route('/users/<int:user_id>/dictionary', methods=['GET'])
+def get_user_dictionary(user_id):
+    User.query.get_or_404(user_id)
+    entries = DictionaryEntry.query.filter_by(user_id=user_id).all()
+    return jsonify([entry.to_dict() for entry in entries])
+
+@dictionary_bp.route('/users/<int:user_id>/dictionary', methods=['POST'])
+def add_user_dictionary_entry(user_id):
+    User.query.get_or_404(user_id)
+    return _create_entry(request.json or {}, user_id=user_id)
+
+@dictionary_bp.route('/teams', methods=['POST'])
+def create_team():
+    data = request.json or {}
+    try:
+        name = _text(data, 'name')
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
+    if not name:
+        return jsonify({"error": "No name provided"}), 400
+    team = Team(name=name)
+    db.session.add(team)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": f"A team named '{name}' already exists"}), 409
+    return jsonify(team.to_dict()), 201
+
+@dictionary_bp.route('/teams/<int:team_id>', methods=['GET'])
+def get_team(team_id):
+    team = Team.query.get_or_404(team_id)
+    return jsonify(team.to_dict())
+
+@dictionary_bp.route('/teams/<int:team_id>/members', methods=['POST'])
+def add_team_member(team_id):
+    team = Team.query.get_or_404(team_id)
+    user = User.query.get_or_404((request.json or {}).get('user_id'))
+    if user not in team.members:
+        team.members.append(user)
+        db.session.commit()
+    invalidate_rulesets([user.id], team_id=team_id)
+    return jsonify(team.to_dict())
+
+@dictionary_bp.route('/teams/<int:team_id>/members/<int:user_id>', methods=['DELETE'])
+def remove_team_member(team_id, user_id):
+    team = Team.query.get_or_404(team_id)
+    user = User.query.get_or_404(user_id)
+    if user in team.members:
+        team.members.remove(user)
+        db.session.commit()
+    invalidate_rulesets([user_id], team_id=team_id)
+    return '', 204
+
+@dictionary_bp.route('/teams/<int:team_id>/dictionary', methods=['GET'])
+def get_team_dictionary(team_id):
+    Team.query.get_or_404(team_id)
+    entries = DictionaryEntry.query.filter_by(team_id=team_id).all()
+    return jsonify([entry.to_dict() for entry in entries])
+
+@dictionary_bp.route('/teams/<int:team_id>/dictionary', methods=['POST'])
+def add_team_dictionary_entry(team_id):
+    Team.query.get_or_404(team_id)
+    return _create_entry(request.json or {}, team_id=team_id)
+
+@dictionary_bp.route('/dictionary/<int:entry_id>', methods=['PUT'])
+def update_dictionary_entry(entry_id):
+    entry = DictionaryEntry.query.get_or_404(entry_id)
+    data = request.json or {}
+    kind = data.get('kind', entry.kind)
+    try:
+        word = _text(data, 'word') or entry.word
+        replacement = (_text(data, 'replacement') or None) if 'replacement' in data else entry.replacement
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
+    if kind not in ENTRY_KINDS:
+        return jsonify({"error": f"kind must be one of {', '.join(ENTRY_KINDS)}"}), 400
+    if kind == 'replace' and not replacement:
+        return jsonify({"error": "replace entries need a replacement"}), 400
+    entry.kind = kind
+    entry.word = word
+    entry.replacement = replacement
+    db.session.commit()
+    _invalidate_for(entry)
+    return jsonify(entry.to_dict())
+
+@dictionary_bp.route('/dictionary/<int:entry_id>', methods=['DELETE'])
+def delete_dictionary_entry(entry_id):
+    entry = DictionaryEntry.query.get_or_404(entry_id)
+    db.session.delete(entry)
+    db.session.commit()
+    _invalidate_for(entry)
+    return '', 204
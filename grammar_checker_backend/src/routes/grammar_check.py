@@ -1,578 +1,274 @@
-from flask import Blueprint, request, jsonify, send_file, make_response
+from flask import Blueprint, request, jsonify, send_file, make_response, Response, current_app
 import re
 import random
 import json
 import os
-from fpdf import FPDF
 import io
+from src.analysis.rulesets import get_ruleset
+from src.analysis.rule_packs import load_pack, UnsupportedLanguageError
+from src.analysis.checker import (check_text, auto_fix, document_insights, select_analyzers, rule_hits,
+                                  DEFAULT_ANALYZERS, MAX_HITS_PER_RULE)
+from src.analysis.paraphrase import MAX_VARIANTS
+from src.analysis.rewrite import get_rewrite_service, RewriteError, RewriteOverloaded, RewriteTimeout
+from src.analysis.fixes import apply_fixes, FixConflict
+from src.analysis.compare import compare_texts
+from src.analysis.live import get_session, close_session
+from src.analysis.shared_cache import get_shared_cache, cache_key
+from src.request_body import json_body, body_limit
 
 grammar_check_bp = Blueprint("grammar_check", __name__)
 
-# Enhanced grammar rules for demonstration
-GRAMMAR_RULES = {
-    # Spelling errors
-    'grammer': ['grammar'],
-    'gramar': ['grammar'],
-    'erors': ['errors'],
-    'mispellings': ['misspellings'],
-    'sentance': ['sentence'],
-    'recieve': ['receive'],
-    'seperate': ['separate'],
-    'occured': ['occurred'],
-    'definately': ['definitely'],
-    'neccessary': ['necessary'],
-    'accomodate': ['accommodate'],
-    'embarass': ['embarrass'],
-    'maintainance': ['maintenance'],
-    'independant': ['independent'],
-    'existance': ['existence'],
-    'teh': ['the'],
-    'adn': ['and'],
-    'hte': ['the'],
-    'taht': ['that'],
-    'thier': ['their'],
-    'ther': ['their', 'there'],
-    'youre': ['you\'re'],
-    'its': ['it\'s'],
-    'alot': ['a lot'],
-    'loose': ['lose'],
-    'affect': ['effect'],
-    'then': ['than'],
-    'your': ['you\'re'],
-    'there': ['their'],
-    'to': ['too'],
-    'weather': ['whether'],
-    'accept': ['except'],
-    'advise': ['advice'],
-    'breath': ['breathe'],
-    'choose': ['chose'],
-    'desert': ['dessert'],
-    'emigrate': ['immigrate'],
-    'farther': ['further'],
-    'historic': ['historical'],
-    'imply': ['infer'],
-    'lay': ['lie'],
-    'principal': ['principle'],
-    'stationary': ['stationery'],
-    'who': ['whom']
-}
-
-# Vocabulary enhancement suggestions
-VOCABULARY_ENHANCEMENT = {
-    'very': ['extremely', 'incredibly', 'remarkably', 'exceptionally'],
-    'good': ['excellent', 'outstanding', 'superb', 'exceptional'],
-    'bad': ['terrible', 'awful', 'dreadful', 'poor'],
-    'big': ['enormous', 'massive', 'huge', 'substantial'],
-    'small': ['tiny', 'minuscule', 'compact', 'petite'],
-    'nice': ['pleasant', 'delightful', 'wonderful', 'charming'],
-    'said': ['stated', 'declared', 'mentioned', 'expressed'],
-    'got': ['obtained', 'acquired', 'received', 'secured'],
-    'make': ['create', 'produce', 'generate', 'construct'],
-    'thing': ['item', 'object', 'element', 'aspect'],
-    'stuff': ['items', 'materials', 'things', 'elements'],
-    'really': ['truly', 'genuinely', 'actually', 'certainly'],
-    'pretty': ['quite', 'rather', 'fairly', 'considerably'],
-    'walk': ['stroll', 'stride', 'march', 'wander'],
-    'look': ['observe', 'examine', 'inspect', 'gaze'],
-    'think': ['consider', 'contemplate', 'ponder', 'reflect'],
-    'happy': ['joyful', 'elated', 'delighted', 'cheerful'],
-    'sad': ['melancholy', 'dejected', 'sorrowful', 'despondent'],
-    'fast': ['rapid', 'swift', 'quick', 'speedy'],
-    'slow': ['gradual', 'leisurely', 'unhurried', 'deliberate']
-}
-
-# Clarity improvement patterns
-CLARITY_PATTERNS = {
-    r'\bthat\s+that\b': 'Redundant "that" usage',
-    r'\bvery\s+very\b': 'Redundant intensifier',
-    r'\bin\s+order\s+to\b': 'Can be simplified to "to"',
-    r'\bdue\s+to\s+the\s+fact\s+that\b': 'Can be simplified to "because"',
-    r'\bat\s+this\s+point\s+in\s+time\b': 'Can be simplified to "now"',
-    r'\bfor\s+the\s+purpose\s+of\b': 'Can be simplified to "to"',
-    r'\bin\s+the\s+event\s+that\b': 'Can be simplified to "if"'
-}
-
-# Passive voice patterns
-PASSIVE_VOICE_PATTERNS = [
-    r'\b(was|were|is|are|am|be|been|being)\s+\w+ed\b',
-    r'\b(was|were|is|are|am|be|been|being)\s+\w+en\b'
-]
-
-# Tone indicators
-TONE_INDICATORS = {
-    'formal': ['furthermore', 'consequently', 'therefore', 'moreover', 'nevertheless'],
-    'informal': ['yeah', 'okay', 'cool', 'awesome', 'totally'],
-    'confident': ['certainly', 'definitely', 'absolutely', 'undoubtedly', 'clearly'],
-    'tentative': ['perhaps', 'maybe', 'possibly', 'might', 'could'],
-    'friendly': ['please', 'thank you', 'appreciate', 'wonderful', 'great'],
-    'professional': ['regarding', 'concerning', 'pursuant', 'accordingly', 'respectively']
-}
-
-# Conciseness suggestions
-CONCISENESS_PATTERNS = {
-    r'\ba\s+number\s+of\b': 'several',
-    r'\ba\s+large\s+number\s+of\b': 'many',
-    r'\ba\s+small\s+number\s+of\b': 'few',
-    r'\bin\s+spite\s+of\s+the\s+fact\s+that\b': 'although',
-    r'\bwith\s+regard\s+to\b': 'regarding',
-    r'\bin\s+connection\s+with\b': 'about',
-    r'\bfor\s+the\s+reason\s+that\b': 'because',
-    r'\bin\s+view\s+of\s+the\s+fact\s+that\b': 'since'
-}
-
-def detect_tone(text):
-    """Detect the overall tone of the text"""
-    text_lower = text.lower()
-    tone_scores = {}
-    
-    for tone, indicators in TONE_INDICATORS.items():
-        score = sum(1 for indicator in indicators if indicator in text_lower)
-        if score > 0:
-            tone_scores[tone] = score
-    
-    if not tone_scores:
-        return 'neutral'
-    
-    # Return the tone with the highest score
-    return max(tone_scores, key=tone_scores.get)
-
-def analyze_sentence_variety(text):
-    """Analyze sentence variety and structure"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    
-    if not sentences:
-        return []
-    
-    suggestions = []
-    sentence_lengths = [len(s.split()) for s in sentences]
-    avg_length = sum(sentence_lengths) / len(sentence_lengths)
-    
-    # Check for monotonous sentence length
-    if len(set(sentence_lengths)) < len(sentence_lengths) * 0.3:
-        suggestions.append({
-            "type": "delivery",
-            "message": "Consider varying your sentence length for better flow",
-            "suggestion": "Mix short and long sentences to create rhythm"
-        })
-    
-    # Check for very long sentences
-    long_sentences = [i for i, length in enumerate(sentence_lengths) if length > 25]
-    if long_sentences:
-        suggestions.append({
-            "type": "clarity",
-            "message": f"Sentence {long_sentences[0] + 1} is quite long. Consider breaking it up.",
-            "suggestion": "Break long sentences into shorter, clearer ones"
-        })
-    
-    return suggestions
-
-def check_passive_voice(text):
-    """Check for passive voice usage"""
-    passive_instances = []
-    
-    for pattern in PASSIVE_VOICE_PATTERNS:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            passive_instances.append({
-                "start": match.start(),
-                "end": match.end(),
-                "text": match.group(),
-                "type": "delivery",
-                "message": "Consider using active voice for more direct communication",
-                "suggestion": "Rewrite in active voice"
-            })
-    
-    return passive_instances
-
-def generate_ai_rewrite(text, style='improve'):
-    """Generate AI-powered rewrite suggestions"""
-    # This is a simplified version - in a real implementation, you'd use an AI API
-    rewrites = {
-        'improve': [
-            "Here's a clearer version of your text...",
-            "Consider this improved phrasing...",
-            "A more polished version might be..."
-        ],
-        'formal': [
-            "A more formal version would be...",
-            "In professional writing, consider...",
-            "For academic or business contexts..."
-        ],
-        'casual': [
-            "A more conversational approach...",
-            "In a casual tone, you might say...",
-            "For informal communication..."
-        ],
-        'concise': [
-            "A more concise version...",
-            "To be more direct...",
-            "Simplified, this becomes..."
-        ]
-    }
-    
-    return random.choice(rewrites.get(style, rewrites['improve']))
+LIVE_SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+LIVE_KEEPALIVE_SECONDS = 15
+
+# Request body caps per endpoint; MAX_CONTENT_LENGTH still bounds them all
+DOCUMENT_BODY_LIMIT = 2 * 1024 * 1024     # whole documents: check, auto_fix, live, paraphrase
+REPORT_BODY_LIMIT = 4 * 1024 * 1024       # the document plus its insights and suggestions, or two revisions
+SNIPPET_BODY_LIMIT = 256 * 1024           # rewrites, prompts and other short inputs
+
+def _optional_id(data, key):
+    """Read an optional integer id from the request payload"""
+    value = data.get(key)
+    if value is None or value == "":
+        return None
+    return int(value)
+
+def rules_for_request(data):
+    """Resolve the language pack and the caller's user/team ruleset.
+
+    Returns (pack, ruleset, None) or (None, None, error_response).
+    """
+    try:
+        pack = load_pack(data.get("language"))
+    except UnsupportedLanguageError as e:
+        return None, None, (jsonify({"error": str(e)}), 400)
+    
+    try:
+        ruleset = get_ruleset(pack,
+                              user_id=_optional_id(data, "user_id"),
+                              team_id=_optional_id(data, "team_id"))
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"error": "user_id and team_id must be integers"}), 400)
+    
+    return pack, ruleset, None
+
+def time_budget_for_request(data):
+    """Seconds a check may run: the request's time_budget_ms, capped by the server budget"""
+    server_ms = current_app.config.get("CHECK_TIME_BUDGET_MS")
+    requested_ms = data.get("time_budget_ms")
+    if requested_ms is not None:
+        requested_ms = float(requested_ms)
+        if requested_ms <= 0:
+            raise ValueError("time_budget_ms must be positive")
+    
+    budgets = [ms for ms in (server_ms, requested_ms) if ms]
+    return min(budgets) / 1000 if budgets else None
+
+def cached_json(key, compute):
+    """Answer from the shared result cache, or compute, store and answer.
+
+    compute returns (result, cacheable); results cut short by a time budget
+    should not be stored. The X-Cache header says which way it went.
+    """
+    cache = get_shared_cache()
+    body = cache.get(key)
+    status = "hit"
+    if body is None:
+        result, cacheable = compute()
+        body = current_app.json.dumps(result).encode("utf-8")
+        if cacheable:
+            cache.put(key, body)
+        status = "miss"
+    response = current_app.response_class(body + b"\n", mimetype=current_app.json.mimetype)
+    response.headers["X-Cache"] = status
+    return response
+
+CHECK_MODES = ("full", "insights")
+# Upper bound for the per-rule hit cap and page size a client may ask for
+MAX_HITS_PAGE = 500
+
+def _bounded_int(data, key, default, low, high):
+    """Read an integer in [low, high] from the payload; raises ValueError otherwise"""
+    value = int(data.get(key, default))
+    if not low <= value <= high:
+        raise ValueError(f"{key} must be between {low} and {high}")
+    return value
 
 @grammar_check_bp.route("/check", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
 def check_grammar():
-    data = request.get_json()
+    data = json_body()
+    text = data.get("text", "")
+    mode = data.get("mode", "full")
+    
+    if mode not in CHECK_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(CHECK_MODES)}"}), 400
+    
+    if mode == "insights":
+        # Counts, timings and tone only: no ruleset lookup, no token list
+        try:
+            pack = load_pack(data.get("language"))
+        except UnsupportedLanguageError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(document_insights(text, pack))
+    
+    try:
+        analyzers = select_analyzers(data.get("analyzers"))
+        max_hits = _bounded_int(data, "max_hits_per_rule", MAX_HITS_PER_RULE, 1, MAX_HITS_PAGE)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    pack, ruleset, error = rules_for_request(data)
+    if error:
+        return error
+    
+    try:
+        time_budget = time_budget_for_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "time_budget_ms must be a positive number"}), 400
+    
+    def check():
+        result = check_text(text, pack, ruleset, time_budget=time_budget, analyzers=analyzers,
+                            max_hits_per_rule=max_hits)
+        analysis = result.get("analysis", {})
+        return result, not analysis.get("truncated") and not analysis.get("skipped")
+    
+    key = cache_key("check", ruleset.version, get_rewrite_service().provider.identity,
+                    ",".join(DEFAULT_ANALYZERS if analyzers is None else analyzers), max_hits, text)
+    return cached_json(key, check)
+
+@grammar_check_bp.route("/check/hits", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
+def check_rule_hits():
+    """Page through the matches of one rule listed in a /check "aggregated_hits" entry"""
+    data = json_body()
     text = data.get("text", "")
     
-    if not text.strip():
-        return jsonify({
-            "score": 100,
-            "suggestions": {},
-            "errors": [],
-            "document_insights": {
-                "word_count": 0,
-                "character_count": 0,
-                "sentence_count": 0,
-                "reading_time": 0,
-                "speaking_time": 0,
-                "tone": "neutral"
-            },
-            "advanced_features": {
-                "tone_detection": "neutral",
-                "ai_rewrites": [],
-                "conciseness_suggestions": [],
-                "passive_voice_instances": []
-            }
-        })
-    
-    # Calculate basic metrics
-    words = re.findall(r'\b\w+\b', text.lower())
-    word_count = len(words)
-    character_count = len(text)
-    sentence_count = len(re.findall(r'[.!?]+', text))
-    if sentence_count == 0:
-        sentence_count = 1
-    
-    reading_time = max(1, word_count // 200)  # Average reading speed: 200 words per minute
-    speaking_time = max(1, word_count // 150)  # Average speaking speed: 150 words per minute
-    
-    # Detect tone
-    detected_tone = detect_tone(text)
-    
-    # Check for grammar errors and suggestions
-    suggestions = {}
-    errors = []  # List of error objects with positions
-    correctness_errors = 0
-    clarity_suggestions = 0
-    engagement_suggestions = 0
-    delivery_suggestions = 0
-    
-    # Find all words with their positions
-    word_pattern = re.compile(r'\b\w+\b')
-    word_matches = list(word_pattern.finditer(text))
-    
-    # Check for spelling/grammar errors (correctness)
-    for match in word_matches:
-        word = match.group()
-        word_lower = word.lower()
-        start_pos = match.start()
-        end_pos = match.end()
-        
-        if word_lower in GRAMMAR_RULES:
-            if word not in suggestions:
-                suggestions[word] = GRAMMAR_RULES[word_lower]
-                errors.append({
-                    "word": word,
-                    "start": start_pos,
-                    "end": end_pos,
-                    "type": "correctness",
-                    "color": "red",
-                    "suggestions": GRAMMAR_RULES[word_lower],
-                    "message": "Spelling or grammar error"
-                })
-                correctness_errors += 1
-    
-    # Check for vocabulary enhancement (engagement)
-    word_frequency = {}
-    word_positions = {}
-    
-    for match in word_matches:
-        word = match.group()
-        word_lower = word.lower()
-        if len(word_lower) > 2:  # Check words longer than 2 characters
-            if word_lower not in word_frequency:
-                word_frequency[word_lower] = 0
-                word_positions[word_lower] = []
-            word_frequency[word_lower] += 1
-            word_positions[word_lower].append({
-                "word": word,
-                "start": match.start(),
-                "end": match.end()
-            })
-    
-    # Find vocabulary enhancement opportunities
-    for word_lower, positions in word_positions.items():
-        if word_lower in VOCABULARY_ENHANCEMENT:
-            # Add the first instance as an engagement suggestion
-            pos_info = positions[0]
-            word = pos_info["word"]
-            if word not in suggestions:
-                suggestions[word] = VOCABULARY_ENHANCEMENT[word_lower]
-                errors.append({
-                    "word": word,
-                    "start": pos_info["start"],
-                    "end": pos_info["end"],
-                    "type": "engagement",
-                    "color": "blue",
-                    "suggestions": VOCABULARY_ENHANCEMENT[word_lower],
-                    "message": "Consider a more precise or engaging word"
-                })
-                engagement_suggestions += 1
-    
-    # Check for clarity issues
-    for pattern, message in CLARITY_PATTERNS.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            errors.append({
-                "word": match.group(),
-                "start": match.start(),
-                "end": match.end(),
-                "type": "clarity",
-                "color": "green",
-                "suggestions": ["Simplify this phrase"],
-                "message": message
-            })
-            clarity_suggestions += 1
-    
-    # Check for conciseness issues
-    for pattern, replacement in CONCISENESS_PATTERNS.items():
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            errors.append({
-                "word": match.group(),
-                "start": match.start(),
-                "end": match.end(),
-                "type": "clarity",
-                "color": "green",
-                "suggestions": [replacement],
-                "message": "This phrase can be simplified"
-            })
-            clarity_suggestions += 1
-    
-    # Check for passive voice
-    passive_voice_instances = check_passive_voice(text)
-    for instance in passive_voice_instances:
-        errors.append({
-            "word": instance["text"],
-            "start": instance["start"],
-            "end": instance["end"],
-            "type": "delivery",
-            "color": "orange",
-            "suggestions": ["Use active voice"],
-            "message": instance["message"]
-        })
-        delivery_suggestions += 1
-    
-    # Analyze sentence variety
-    sentence_variety_suggestions = analyze_sentence_variety(text)
-    
-    # Calculate grammar score based on number and type of errors
-    total_errors = correctness_errors + clarity_suggestions + engagement_suggestions + delivery_suggestions
-    
-    if total_errors == 0:
-        score = 100
-    else:
-        # Weight different types of errors differently
-        weighted_score = (
-            correctness_errors * 20 +  # Most important
-            clarity_suggestions * 15 +
-            delivery_suggestions * 10 +
-            engagement_suggestions * 5   # Least critical
-        )
-        score = max(30, 100 - weighted_score)
-    
-    # Categorize suggestions by type for better organization
-    categorized_suggestions = {
-        "correctness": [],
-        "clarity": [],
-        "engagement": [],
-        "delivery": []
-    }
-    
-    for error in errors:
-        category = error["type"]
-        categorized_suggestions[category].append({
-            "word": error["word"],
-            "suggestions": error["suggestions"],
-            "message": error["message"]
-        })
-    
-    # Add sentence variety suggestions to delivery
-    for suggestion in sentence_variety_suggestions:
-        categorized_suggestions[suggestion["type"]].append({
-            "word": "Sentence structure",
-            "suggestions": [suggestion["suggestion"]],
-            "message": suggestion["message"]
-        })
-    
-    # Generate AI rewrite suggestions
-    ai_rewrites = []
-    if word_count > 10:  # Only for substantial text
-        ai_rewrites = [
-            {
-                "type": "improve",
-                "title": "Overall Improvement",
-                "suggestion": generate_ai_rewrite(text, 'improve')
-            },
-            {
-                "type": "formal",
-                "title": "More Formal",
-                "suggestion": generate_ai_rewrite(text, 'formal')
-            },
-            {
-                "type": "concise",
-                "title": "More Concise",
-                "suggestion": generate_ai_rewrite(text, 'concise')
-            }
-        ]
-    
-    return jsonify({
-        "score": score,
-        "suggestions": suggestions,
-        "errors": errors,  # Enhanced with color information
-        "categorized_suggestions": categorized_suggestions,
-        "document_insights": {
-            "word_count": word_count,
-            "character_count": character_count,
-            "sentence_count": sentence_count,
-            "reading_time": reading_time,
-            "speaking_time": speaking_time,
-            "tone": detected_tone,
-            "correctness_errors": correctness_errors,
-            "clarity_suggestions": clarity_suggestions,
-            "engagement_suggestions": engagement_suggestions,
-            "delivery_suggestions": delivery_suggestions
-        },
-        "advanced_features": {
-            "tone_detection": detected_tone,
-            "ai_rewrites": ai_rewrites,
-            "conciseness_suggestions": len([e for e in errors if "simplified" in e.get("message", "").lower()]),
-            "passive_voice_instances": len(passive_voice_instances),
-            "sentence_variety_score": 85 if len(sentence_variety_suggestions) == 0 else 70
-        }
-    })
+    try:
+        pack = load_pack(data.get("language"))
+    except UnsupportedLanguageError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        cursor = _bounded_int(data, "cursor", 0, 0, len(text))
+        limit = _bounded_int(data, "limit", MAX_HITS_PER_RULE, 1, MAX_HITS_PAGE)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    rule = data.get("rule")
+    if not isinstance(rule, str):
+        return jsonify({"error": "rule must be a rule id string such as \"clarity:2\""}), 400
+    
+    try:
+        return jsonify(rule_hits(text, rule, pack, cursor, limit))
+    except KeyError:
+        return jsonify({"error": f"Unknown rule: {rule}"}), 400
+
+REWRITE_TITLES = {
+    "improve": "Improved Version",
+    "formal": "Formal Version",
+    "casual": "Casual Version",
+    "concise": "Concise Version"
+}
+TONES = ("professional", "friendly", "assertive", "diplomatic")
+EMAIL_TYPES = ("professional", "casual", "follow-up")
+
+def _rewrite_or_timeout(kind, text, style):
+    """Run a rewrite through the shared service; returns (text, error_response)"""
+    try:
+        return get_rewrite_service().rewrite(kind, text, style), None
+    except RewriteTimeout as e:
+        return None, (jsonify({"error": str(e)}), 504)
+    except RewriteOverloaded as e:
+        return None, (jsonify({"error": str(e)}), 503)
+    except RewriteError as e:
+        return None, (jsonify({"error": str(e)}), 502)
 
 @grammar_check_bp.route("/ai_rewrite", methods=["POST"])
+@body_limit(SNIPPET_BODY_LIMIT)
 def ai_rewrite():
     """Generate AI-powered rewrites for text"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     style = data.get("style", "improve")  # improve, formal, casual, concise
     
     if not text.strip():
         return jsonify({"error": "No text provided"}), 400
     
-    # In a real implementation, this would call an AI API like OpenAI
-    # For now, we'll provide template-based rewrites
-    
-    rewrite_templates = {
-        "improve": {
-            "title": "Improved Version",
-            "rewrite": f"Here's an enhanced version of your text: {text[:50]}... [This would be an AI-improved version]"
-        },
-        "formal": {
-            "title": "Formal Version",
-            "rewrite": f"In a more formal tone: {text[:50]}... [This would be a more formal version]"
-        },
-        "casual": {
-            "title": "Casual Version", 
-            "rewrite": f"In a casual tone: {text[:50]}... [This would be a more casual version]"
-        },
-        "concise": {
-            "title": "Concise Version",
-            "rewrite": f"More concisely: {text[:30]}... [This would be a shorter version]"
-        }
-    }
+    if style not in REWRITE_TITLES:
+        style = "improve"
     
-    return jsonify(rewrite_templates.get(style, rewrite_templates["improve"]))
+    rewrite, error = _rewrite_or_timeout("rewrite", text, style)
+    if error:
+        return error
+    
+    return jsonify({
+        "title": REWRITE_TITLES[style],
+        "rewrite": rewrite
+    })
 
 @grammar_check_bp.route("/tone_adjust", methods=["POST"])
+@body_limit(SNIPPET_BODY_LIMIT)
 def tone_adjust():
     """Adjust the tone of text"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     target_tone = data.get("tone", "professional")  # professional, friendly, assertive, diplomatic
     
     if not text.strip():
         return jsonify({"error": "No text provided"}), 400
     
-    tone_adjustments = {
-        "professional": f"In a professional tone: {text[:50]}... [Professional version would be generated here]",
-        "friendly": f"In a friendly tone: {text[:50]}... [Friendly version would be generated here]",
-        "assertive": f"More assertively: {text[:50]}... [Assertive version would be generated here]",
-        "diplomatic": f"More diplomatically: {text[:50]}... [Diplomatic version would be generated here]"
-    }
+    adjusted, error = _rewrite_or_timeout("tone", text, target_tone if target_tone in TONES else "professional")
+    if error:
+        return error
     
     return jsonify({
         "original": text,
-        "adjusted": tone_adjustments.get(target_tone, tone_adjustments["professional"]),
+        "adjusted": adjusted,
         "tone": target_tone
     })
 
 @grammar_check_bp.route("/email_generate", methods=["POST"])
+@body_limit(SNIPPET_BODY_LIMIT)
 def email_generate():
     """Generate email from prompt"""
-    data = request.get_json()
+    data = json_body()
     prompt = data.get("prompt", "")
     email_type = data.get("type", "professional")  # professional, casual, follow-up
     
     if not prompt.strip():
         return jsonify({"error": "No prompt provided"}), 400
     
-    # Template-based email generation (would use AI in real implementation)
-    email_templates = {
-        "professional": f"""Subject: {prompt[:30]}...
-
-Dear [Recipient],
-
-I hope this email finds you well. I am writing to {prompt.lower()}.
-
-[Generated professional email content based on: {prompt}]
-
-Best regards,
-[Your Name]""",
-        
-        "casual": f"""Hey [Name],
-
-Hope you're doing well! I wanted to reach out about {prompt.lower()}.
-
-[Generated casual email content based on: {prompt}]
-
-Thanks!
-[Your Name]""",
-        
-        "follow-up": f"""Subject: Following up on {prompt[:30]}...
-
-Hi [Name],
-
-I wanted to follow up on {prompt.lower()}.
-
-[Generated follow-up email content based on: {prompt}]
-
-Looking forward to hearing from you.
-
-Best,
-[Your Name]"""
-    }
+    email, error = _rewrite_or_timeout("email", prompt, email_type if email_type in EMAIL_TYPES else "professional")
+    if error:
+        return error
     
     return jsonify({
         "prompt": prompt,
-        "email": email_templates.get(email_type, email_templates["professional"]),
+        "email": email,
         "type": email_type
     })
 
+# Bump when the report layout changes so cached PDFs are not served
+PDF_REPORT_VERSION = 1
+
 @grammar_check_bp.route("/pdf_report", methods=["POST"])
+@body_limit(REPORT_BODY_LIMIT)
 def generate_pdf_report():
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     insights = data.get("insights", {})
     suggestions = data.get("suggestions", {})
     
-    # Create PDF using FPDF
+    cache = get_shared_cache()
+    key = cache_key("pdf_report", PDF_REPORT_VERSION, text,
+                    json.dumps(insights, sort_keys=True), json.dumps(suggestions, sort_keys=True))
+    cached = cache.get(key)
+    if cached is not None:
+        return _pdf_response(cached, "hit")
+    
+    # Create PDF using FPDF, imported here so only report requests pay for it
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font('Arial', 'B', 16)
@@ -690,13 +386,20 @@ def generate_pdf_report():
         safe_line = line.encode('latin-1', 'replace').decode('latin-1')
         pdf.cell(0, 6, safe_line, 0, 1)
     
-    # Create a BytesIO buffer to hold the PDF
-    buffer = io.BytesIO()
-    pdf_string = pdf.output(dest='S').encode('latin-1')
-    buffer.write(pdf_string)
-    buffer.seek(0)
-    
-    return send_file(buffer, as_attachment=True, download_name="advanced_grammar_report.pdf", mimetype='application/pdf')
+    pdf_bytes = pdf.output(dest='S').encode('latin-1')
+    cache.put(key, pdf_bytes)
+    return _pdf_response(pdf_bytes, "miss")
+
+def _pdf_response(pdf_bytes, cache_status):
+    response = send_file(io.BytesIO(pdf_bytes), as_attachment=True,
+                         download_name="advanced_grammar_report.pdf", mimetype='application/pdf')
+    response.headers["X-Cache"] = cache_status
+    return response
+
+@grammar_check_bp.route("/cache", methods=["GET"])
+def shared_cache_stats():
+    """Shared result cache backend and this worker's hit counts"""
+    return jsonify(get_shared_cache().stats())
 
 
 
@@ -704,12 +407,31 @@ def generate_pdf_report():
 # Premium Features
 
 @grammar_check_bp.route("/paraphrase", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
 def paraphrase_text():
-    """Paraphrase text with different styles"""
-    data = request.get_json()
-    text = data.get("text", "")
+    """Paraphrase text with different styles.
+
+    Accepts a single "text" or a batch of "texts", and returns "variants"
+    paraphrases of each. Passing the same "seed" reproduces the same output.
+    """
+    data = json_body()
     style = data.get("style", "standard")  # standard, formal, casual, creative
     
+    pack, ruleset, error = rules_for_request(data)
+    if error:
+        return error
+    
+    try:
+        count = int(data.get("variants", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "variants must be an integer"}), 400
+    if not 1 <= count <= MAX_VARIANTS:
+        return jsonify({"error": f"variants must be between 1 and {MAX_VARIANTS}"}), 400
+    
+    seed = data.get("seed")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    
     # Simplified paraphrasing - in production, use advanced AI models
     paraphrase_templates = {
         "standard": [
@@ -734,33 +456,69 @@ def paraphrase_text():
         ]
     }
     
-    template = random.choice(paraphrase_templates.get(style, paraphrase_templates["standard"]))
+    rng = random.Random(f"{seed}:{style}")
+    template = rng.choice(paraphrase_templates.get(style, paraphrase_templates["standard"]))
+    engine = ruleset.paraphraser
     
-    # Simple word replacement for demonstration
-    words = text.split()
-    paraphrased_words = []
-    
-    for word in words:
-        word_lower = word.lower()
-        if word_lower in VOCABULARY_ENHANCEMENT:
-            replacement = random.choice(VOCABULARY_ENHANCEMENT[word_lower])
-            paraphrased_words.append(replacement)
-        else:
-            paraphrased_words.append(word)
+    if "texts" in data:
+        texts = data.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({"error": "texts must be a list of strings"}), 400
+        
+        return jsonify({
+            "results": [
+                {"original": text, "variants": variants}
+                for text, variants in zip(texts, engine.batch(texts, count, seed))
+            ],
+            "style": style,
+            "seed": seed
+        })
     
-    paraphrased_text = " ".join(paraphrased_words)
+    text = data.get("text", "")
+    if not isinstance(text, str):
+        return jsonify({"error": "text must be a string"}), 400
+    variants = engine.variants(text, count, seed)
     
     return jsonify({
         "original": text,
-        "paraphrased": template + paraphrased_text,
+        "paraphrased": template + variants[0],
+        "variants": variants,
         "style": style,
-        "confidence": random.randint(85, 98)
+        "seed": seed,
+        "confidence": rng.randint(85, 98)
     })
 
+@grammar_check_bp.route("/readability", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
+def readability_scores():
+    """Flesch-Kincaid, Gunning Fog and SMOG per sentence, paragraph and document.
+
+    Accepts a single "text" or a batch of "texts"; "detail": false returns
+    only the document scores.
+    """
+    data = json_body()
+    
+    try:
+        pack = load_pack(data.get("language"))
+    except UnsupportedLanguageError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    texts = data.get("texts") if "texts" in data else [data.get("text", "")]
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "texts must be a list of strings"}), 400
+    
+    # Imported here so numpy is only loaded by requests that use it
+    from src.analysis.readability import readability_batch
+    results = readability_batch(texts, pack.language, detail=bool(data.get("detail", True)))
+    if "texts" in data:
+        return jsonify({"results": results, "language": pack.language})
+    return jsonify({**results[0], "language": pack.language})
+
 @grammar_check_bp.route("/citations", methods=["POST"])
+@body_limit(SNIPPET_BODY_LIMIT)
 def generate_citations():
     """Generate citations for text"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     style = data.get("style", "APA")  # APA, MLA, Chicago, Harvard
     
@@ -793,9 +551,10 @@ def generate_citations():
     })
 
 @grammar_check_bp.route("/ai_detector", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
 def detect_ai_content():
     """Detect if content is AI-generated"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     
     # Mock AI detection - in production, use specialized models
@@ -837,9 +596,10 @@ def detect_ai_content():
     })
 
 @grammar_check_bp.route("/essay_helper", methods=["POST"])
+@body_limit(SNIPPET_BODY_LIMIT)
 def essay_helper():
     """Provide essay writing assistance"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     help_type = data.get("type", "structure")  # structure, thesis, conclusion, transitions
     
@@ -902,52 +662,159 @@ def essay_helper():
     })
 
 @grammar_check_bp.route("/auto_fix", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
 def auto_fix_text():
     """Automatically fix all detected errors in text"""
-    data = request.get_json()
+    data = json_body()
     text = data.get("text", "")
     
-    if not text.strip():
-        return jsonify({
-            "original": text,
-            "fixed": text,
-            "changes": []
-        })
+    pack, ruleset, error = rules_for_request(data)
+    if error:
+        return error
     
-    fixed_text = text
-    changes = []
+    return cached_json(cache_key("auto_fix", ruleset.version, text),
+                       lambda: (auto_fix(text, pack, ruleset), True))
+
+@grammar_check_bp.route("/apply_fixes", methods=["POST"])
+@body_limit(REPORT_BODY_LIMIT)
+def apply_selected_fixes():
+    """Apply the fixes the user accepted, by error id, without re-checking the text.
+
+    Takes the text, the errors from /check and "fixes": a list of error ids
+    or {"id", "replacement"} objects. Returns the new text and the remaining
+    errors with their offsets moved to match it.
+    """
+    data = json_body()
+    text = data.get("text", "")
+    errors = data.get("errors", [])
+    fixes = data.get("fixes", [])
+    
+    if not isinstance(text, str) or not isinstance(errors, list) or not isinstance(fixes, list):
+        return jsonify({"error": "text must be a string, errors and fixes lists"}), 400
+    
+    try:
+        return jsonify(apply_fixes(text, errors, fixes))
+    except FixConflict as e:
+        return jsonify({"error": str(e), "conflicts": e.ids}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@grammar_check_bp.route("/compare", methods=["POST"])
+@body_limit(REPORT_BODY_LIMIT)
+def compare_revisions():
+    """Word diff of two revisions of a document, with score, insight and error changes.
+
+    Takes "old_text" and "new_text" plus the usual language, user_id,
+    team_id, analyzers, max_hits_per_rule and time_budget_ms.
+    """
+    data = json_body()
+    old_text = data.get("old_text", "")
+    new_text = data.get("new_text", "")
+    
+    if not isinstance(old_text, str) or not isinstance(new_text, str):
+        return jsonify({"error": "old_text and new_text must be strings"}), 400
+    
+    try:
+        analyzers = select_analyzers(data.get("analyzers"))
+        max_hits = _bounded_int(data, "max_hits_per_rule", MAX_HITS_PER_RULE, 1, MAX_HITS_PAGE)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    pack, ruleset, error = rules_for_request(data)
+    if error:
+        return error
+    
+    try:
+        time_budget = time_budget_for_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "time_budget_ms must be a positive number"}), 400
+    
+    return jsonify(compare_texts(old_text, new_text, pack, ruleset, analyzers, max_hits, time_budget))
+
+
+# Live checking
+#
+# The editor POSTs every revision of a document to /live/<session_id> and
+# listens on /live/<session_id>/events (Server-Sent Events) for results.
+# Sessions live in the worker process, so run gunicorn with threaded
+# workers and route a session's requests to the same worker.
+
+@grammar_check_bp.route("/live/<session_id>", methods=["POST"])
+@body_limit(DOCUMENT_BODY_LIMIT)
+def live_update(session_id):
+    """Submit a new revision of a live document"""
+    if not LIVE_SESSION_ID.match(session_id):
+        return jsonify({"error": "Invalid session id"}), 400
+    
+    data = json_body()
+    text = data.get("text", "")
     
-    # Fix spelling/grammar errors
-    words = re.findall(r'\b\w+\b', text)
-    for word in words:
-        word_lower = word.lower()
-        if word_lower in GRAMMAR_RULES:
-            replacement = GRAMMAR_RULES[word_lower][0]  # Use first suggestion
-            fixed_text = re.sub(r'\b' + re.escape(word) + r'\b', replacement, fixed_text, count=1)
-            changes.append({
-                "original": word,
-                "fixed": replacement,
-                "type": "spelling",
-                "position": text.find(word)
-            })
+    pack, ruleset, error = rules_for_request(data)
+    if error:
+        return error
     
-    # Fix conciseness issues
-    for pattern, replacement in CONCISENESS_PATTERNS.items():
-        matches = list(re.finditer(pattern, fixed_text, re.IGNORECASE))
-        for match in matches:
-            original_phrase = match.group()
-            fixed_text = fixed_text.replace(original_phrase, replacement, 1)
-            changes.append({
-                "original": original_phrase,
-                "fixed": replacement,
-                "type": "conciseness",
-                "position": match.start()
-            })
+    try:
+        revision = _optional_id(data, "revision")
+    except (TypeError, ValueError):
+        return jsonify({"error": "revision must be an integer"}), 400
+    
+    try:
+        time_budget = time_budget_for_request(data)
+    except (TypeError, ValueError):
+        return jsonify({"error": "time_budget_ms must be a positive number"}), 400
+    
+    revision, accepted = get_session(session_id).submit(text, pack, ruleset, revision, time_budget)
     
     return jsonify({
-        "original": text,
-        "fixed": fixed_text,
-        "changes": changes,
-        "total_fixes": len(changes)
+        "session_id": session_id,
+        "revision": revision,
+        "accepted": accepted
+    }), 202
+
+@grammar_check_bp.route("/live/<session_id>", methods=["GET"])
+def live_result(session_id):
+    """Return the most recent finished result for a live document"""
+    session = get_session(session_id, create=False)
+    if session is None or session.result is None:
+        return jsonify({"error": "No result yet"}), 404
+    
+    return jsonify({
+        "session_id": session_id,
+        "revision": session.result_revision,
+        "latest_revision": session.latest_revision,
+        "result": session.result
+    })
+
+@grammar_check_bp.route("/live/<session_id>/events", methods=["GET"])
+def live_events(session_id):
+    """Stream results for a live document as Server-Sent Events"""
+    if not LIVE_SESSION_ID.match(session_id):
+        return jsonify({"error": "Invalid session id"}), 400
+    
+    session = get_session(session_id)
+    try:
+        last_sent = int(request.headers.get("Last-Event-ID") or request.args.get("after", 0))
+    except ValueError:
+        last_sent = 0
+    
+    def stream():
+        sent = last_sent
+        while not session.closed:
+            update = session.wait_for_result(sent, LIVE_KEEPALIVE_SECONDS)
+            if update is None:
+                yield ": keepalive\n\n"
+                continue
+            sent, result = update
+            yield f"id: {sent}\nevent: result\ndata: {json.dumps(result)}\n\n"
+    
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
     })
 
+@grammar_check_bp.route("/live/<session_id>", methods=["DELETE"])
+def live_close(session_id):
+    """End a live session and its event streams"""
+    if not close_session(session_id):
+        return jsonify({"error": "Unknown session"}), 404
+    return '', 204
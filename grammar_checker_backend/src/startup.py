@@ -0,0 +1,177 @@
+"""Import-time and first-request latency for the backend.
+
+    python -m src.startup            # human readable report
+    python -m src.startup --json     # machine readable, for tracking regressions
+
+The report runs in fresh interpreters so it measures a real cold start:
+wall-clock time to import src.main and build the app, the latency of the
+first requests to the main endpoints, and the slowest modules according to
+``python -X importtime``. The shared result cache is switched off in those
+interpreters, so the first requests are analyzed rather than answered
+from an earlier run. A running server exposes its own numbers at
+/api/startup.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_TEXT = "Teh grammer of this sentance is very good. It was finished in order to win the game."
+
+class StartupTimer:
+    """Records how long this process took to import, build the app and serve its first request"""
+
+    def __init__(self):
+        self.import_started = time.perf_counter()
+        self.import_finished = None
+        self.app_created = None
+        self.first_request = None
+        self._lock = threading.Lock()
+
+    def mark_imported(self):
+        self.import_finished = time.perf_counter()
+
+    def mark_app_created(self):
+        self.app_created = time.perf_counter()
+
+    def install(self, app):
+        """Time the first request served by app"""
+        from flask import g, request
+
+        @app.before_request
+        def _start_request_timer():
+            # Polling the report must not count as the first real request
+            if self.first_request is None and request.path != "/api/startup":
+                g.startup_request_started = time.perf_counter()
+
+        @app.after_request
+        def _record_first_request(response):
+            started = g.pop("startup_request_started", None)
+            if started is not None:
+                with self._lock:
+                    if self.first_request is None:
+                        finished = time.perf_counter()
+                        self.first_request = {
+                            "path": request.path,
+                            "latency_ms": _ms(finished - started),
+                            "since_import_ms": _ms(finished - self.import_started)
+                        }
+            return response
+
+    def report(self):
+        return {
+            "import_ms": _ms(self.import_finished - self.import_started) if self.import_finished else None,
+            "app_create_ms": _ms(self.app_created - self.import_finished)
+                             if self.app_created and self.import_finished else None,
+            "first_request": self.first_request
+        }
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+startup_timer = StartupTimer()
+
+def _measure_cold_start():
+    """Child process: import the app and time the first request to each endpoint"""
+    started = time.perf_counter()
+    from src.main import create_app
+    imported = time.perf_counter()
+    app = create_app({"TESTING": True})
+    created = time.perf_counter()
+
+    client = app.test_client()
+    requests = [
+        ("/api/grammar/check", {"text": SAMPLE_TEXT}),
+        ("/api/grammar/auto_fix", {"text": SAMPLE_TEXT}),
+        ("/api/grammar/paraphrase", {"text": SAMPLE_TEXT}),
+        ("/api/grammar/pdf_report", {"text": SAMPLE_TEXT, "insights": {}, "suggestions": {}}),
+    ]
+    first_requests = []
+    for path, payload in requests:
+        request_started = time.perf_counter()
+        status = client.post(path, json=payload).status_code
+        first_requests.append({
+            "path": path,
+            "status": status,
+            "latency_ms": _ms(time.perf_counter() - request_started)
+        })
+
+    return {
+        "import_ms": _ms(imported - started),
+        "app_create_ms": _ms(created - imported),
+        "first_requests": first_requests
+    }
+
+def _slowest_imports(limit):
+    """Run `python -X importtime` on src.main and return the most expensive modules"""
+    import subprocess
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=BACKEND_ROOT, capture_output=True, text=True
+    )
+    modules = []
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        # Output is post-order with two spaces of indent per level, so the
+        # level 1 lines just before "src.main" are the modules it imports
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append({"module": name.strip(), "cumulative_ms": int(cumulative_us) / 1000})
+        elif depth == 0:
+            if name.strip() == "src.main":
+                modules = children
+            children = []
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules[:limit]
+
+def build_report(limit=15):
+    import subprocess
+    child = subprocess.run(
+        [sys.executable, "-m", "src.startup", "--child"],
+        cwd=BACKEND_ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "SHARED_CACHE_BACKEND": "none"}
+    )
+    report = json.loads(child.stdout.strip().splitlines()[-1])
+    report["slowest_imports"] = _slowest_imports(limit)
+    return report
+
+def format_report(report):
+    lines = [
+        f"import src.main      {report['import_ms']:>9.1f} ms",
+        f"create_app()         {report['app_create_ms']:>9.1f} ms",
+        "",
+        "First request latency:"
+    ]
+    for item in report["first_requests"]:
+        lines.append(f"  {item['path']:<28} {item['latency_ms']:>9.1f} ms  ({item['status']})")
+    lines += ["", "Slowest imports made by src.main (cumulative):"]
+    for item in report["slowest_imports"]:
+        lines.append(f"  {item['module']:<28} {item['cumulative_ms']:>9.1f} ms")
+    return "\n".join(lines)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m src.startup", description="Backend cold start report")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--limit", type=int, default=15, help="How many imports to list")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_measure_cold_start()))
+        return 0
+
+    report = build_report(args.limit)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Tests must not read or fill a cache shared with a running server
+os.environ["SHARED_CACHE_BACKEND"] = "none"
+
+import pytest
+
+from src.analysis import shared_cache
+from src.analysis.shared_cache import SharedCache, MemoryBackend
+from src.main import create_app
+from src.models.user import db
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "SHARED_CACHE_DIR": str(tmp_path / "shared-cache")
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """Swap the process-wide shared cache for an in-process one"""
+    cache = SharedCache(MemoryBackend())
+    monkeypatch.setattr(shared_cache, "_cache", cache)
+    return cache
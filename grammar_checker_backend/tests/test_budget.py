@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from src.analysis import checker
+from src.analysis.checker import check_text, Budget, DEFAULT_ANALYZERS
+from src.analysis.rule_packs import load_pack
+
+TEXT = "Teh cat sat in order to win. " * 300
+
+@pytest.fixture
+def pack():
+    return load_pack("en")
+
+def _slowed(name):
+    """ANALYZERS with the named analyzer starting only once the budget is spent"""
+    def wrap(analyzer):
+        def slow(state, budget):
+            time.sleep(budget.remaining())
+            return analyzer(state, budget)
+        return slow
+    return tuple((each, wrap(analyzer) if each == name else analyzer) for each, analyzer in checker.ANALYZERS)
+
+def test_unbounded_check_completes_everything(pack):
+    analysis = check_text(TEXT, pack)["analysis"]
+    assert analysis["complete"]
+    assert analysis["completed"] == list(DEFAULT_ANALYZERS)
+    assert analysis["truncated"] == analysis["skipped"] == []
+
+def test_zero_budget_still_runs_the_first_analyzer(pack):
+    result = check_text(TEXT, pack, time_budget=0)
+    analysis = result["analysis"]
+    assert not analysis["complete"]
+    # Not even the tokenizer got to run, so correctness saw no words
+    assert analysis["completed"] == []
+    assert analysis["truncated"] == ["correctness"]
+    assert analysis["skipped"] == list(DEFAULT_ANALYZERS[1:])
+
+def test_partial_results_keep_what_finished(pack, monkeypatch):
+    monkeypatch.setattr(checker, "ANALYZERS", _slowed("clarity"))
+    result = check_text(TEXT, pack, time_budget=0.5)
+    analysis = result["analysis"]
+    assert not analysis["complete"]
+    assert analysis["completed"] == ["correctness"]
+    assert analysis["truncated"] == ["clarity"]
+    assert analysis["skipped"] == ["delivery", "engagement", "tone", "readability", "ai_rewrites"]
+
+    rules = {error["rule"] for error in result["errors"]}
+    assert "correctness:teh" in rules
+    # Clarity stopped at its first look at the clock, after a few hundred matches
+    (hits,) = result["aggregated_hits"]
+    assert 0 < hits["count"] < 300
+    assert result["document_insights"]["word_count"] == 7 * 300
+
+def test_selection_order_does_not_change_priority(pack, monkeypatch):
+    monkeypatch.setattr(checker, "ANALYZERS", _slowed("correctness"))
+    analysis = check_text(TEXT, pack, time_budget=0.2, analyzers=["tone", "correctness"])["analysis"]
+    # Correctness runs first and, started late, stops at its first look at the clock
+    assert analysis["completed"] == []
+    assert analysis["truncated"] == ["correctness"]
+    assert analysis["skipped"] == ["tone"]
+
+def test_budget_ticks_read_the_clock_sparingly():
+    budget = Budget(0)
+    assert budget.expired()
+    assert not any(budget.tick() for _ in range(checker.BUDGET_CHECK_INTERVAL - 1))
+    assert budget.tick()
+    assert budget.remaining() == 0.0
+    assert Budget().remaining() is None
+
+def test_truncated_checks_are_not_cached(client, memory_cache):
+    payload = {"text": TEXT, "time_budget_ms": 0.001}
+    first = client.post("/api/grammar/check", json=payload)
+    assert not first.get_json()["analysis"]["complete"]
+    assert client.post("/api/grammar/check", json=payload).headers["X-Cache"] == "miss"
@@ -0,0 +1,120 @@
+from src.analysis.checker import DEFAULT_ANALYZERS
+
+TEXT = "Teh grammer of this sentance is good."
+
+def _check(client, **payload):
+    return client.post("/api/grammar/check", json={"text": TEXT, **payload})
+
+def test_repeated_check_is_served_from_the_cache(client, memory_cache):
+    first = _check(client)
+    second = _check(client)
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("miss", "hit")
+    assert first.get_json() == second.get_json()
+
+def test_empty_analyzer_selection_has_its_own_cache_entry(client, memory_cache):
+    empty = _check(client, analyzers=[])
+    assert empty.get_json()["errors"] == []
+
+    full = _check(client)
+    assert full.headers["X-Cache"] == "miss"
+    assert {error["word"] for error in full.get_json()["errors"]} >= {"Teh", "grammer"}
+    assert _check(client, analyzers=[]).headers["X-Cache"] == "hit"
+
+SENTENCE = "We came in order to win. "
+
+def test_pattern_rule_hits_are_capped_and_counted(client):
+    text = SENTENCE * 7
+    result = _check(client, text=text, max_hits_per_rule=3, analyzers=["clarity"]).get_json()
+    listed = [error for error in result["errors"] if error["rule"] == "clarity:2"]
+    assert [error["start"] for error in listed] == [text.index("in order", 25 * i) for i in range(3)]
+    (hits,) = result["aggregated_hits"]
+    assert hits["rule"] == "clarity:2"
+    assert (hits["count"], hits["returned"], hits["next_cursor"]) == (7, 3, listed[-1]["end"])
+    # Every match counts towards the insights, listed or not
+    assert result["document_insights"]["clarity_suggestions"] == 7
+
+def test_rules_under_the_cap_are_not_aggregated(client):
+    result = _check(client, text=SENTENCE * 2, max_hits_per_rule=3, analyzers=["clarity"]).get_json()
+    assert result["aggregated_hits"] == []
+    assert len(result["errors"]) == 2
+
+def test_hits_pages_continue_where_check_stopped(client):
+    text = SENTENCE * 7
+    result = _check(client, text=text, max_hits_per_rule=3, analyzers=["clarity"]).get_json()
+    starts = [error["start"] for error in result["errors"]]
+    cursor = result["aggregated_hits"][0]["next_cursor"]
+    while cursor is not None:
+        page = client.post("/api/grammar/check/hits",
+                           json={"text": text, "rule": "clarity:2", "cursor": cursor, "limit": 3}).get_json()
+        assert page["rule"] == "clarity:2"
+        assert len(page["errors"]) <= 3
+        starts += [error["start"] for error in page["errors"]]
+        cursor = page["next_cursor"]
+    assert starts == [25 * i + text.index("in order") for i in range(7)]
+
+def test_hits_errors_match_check_errors(client):
+    text = SENTENCE * 2
+    checked = _check(client, text=text, analyzers=["clarity"]).get_json()["errors"]
+    paged = client.post("/api/grammar/check/hits", json={"text": text, "rule": "clarity:2"}).get_json()
+    assert paged["errors"] == checked
+    assert paged["next_cursor"] is None
+
+def test_hits_rejects_bad_rules_and_cursors(client):
+    def hits(**payload):
+        return client.post("/api/grammar/check/hits", json={"text": SENTENCE, **payload})
+
+    for payload in ({"rule": ["clarity:2"]}, {"rule": 2}, {}, {"rule": "clarity:999"},
+                    {"rule": "clarity:2", "cursor": -1}, {"rule": "clarity:2", "cursor": 10_000},
+                    {"rule": "clarity:2", "limit": 0}, {"rule": "clarity:2", "limit": "many"}):
+        response = hits(**payload)
+        assert response.status_code == 400, payload
+        assert "error" in response.get_json()
+
+def test_insights_mode_returns_counts_only(client):
+    result = _check(client, mode="insights").get_json()
+    assert set(result) == {"document_insights", "analysis"}
+    insights = result["document_insights"]
+    assert insights["word_count"] == 7
+    assert insights["sentence_count"] == 1
+    assert insights["character_count"] == len(TEXT)
+    assert {"reading_time", "speaking_time", "tone"} <= set(insights)
+
+def test_insights_mode_counts_match_a_full_check(client):
+    text = "One sentence here. Another one follows! And a third? " * 20
+    insights = _check(client, text=text, mode="insights").get_json()["document_insights"]
+    full = _check(client, text=text).get_json()["document_insights"]
+    for key in ("word_count", "sentence_count", "character_count", "reading_time", "speaking_time", "tone"):
+        assert insights[key] == full[key], key
+
+def test_insights_mode_of_an_empty_text(client):
+    result = _check(client, text="   ", mode="insights").get_json()
+    assert result["document_insights"]["word_count"] == 0
+
+def test_analyzers_may_be_comma_separated(client):
+    result = _check(client, analyzers=" clarity, correctness ,,").get_json()
+    # Run in priority order whatever order they were given in
+    assert result["analysis"]["completed"] == ["correctness", "clarity"]
+    assert {error["type"] for error in result["errors"]} == {"correctness"}
+    as_list = _check(client, analyzers=["clarity", "correctness"]).get_json()
+    assert as_list["analysis"]["completed"] == result["analysis"]["completed"]
+    assert as_list["errors"] == result["errors"]
+
+def test_missing_or_blank_analyzers_mean_the_defaults(client):
+    for payload in ({}, {"analyzers": None}, {"analyzers": ""}):
+        assert _check(client, **payload).get_json()["analysis"]["completed"] == list(DEFAULT_ANALYZERS)
+
+def test_an_empty_analyzer_list_runs_nothing(client):
+    result = _check(client, analyzers=[]).get_json()
+    assert result["analysis"]["completed"] == []
+    assert result["analysis"]["complete"]
+    assert result["errors"] == []
+    # The counts still describe the text
+    assert result["document_insights"]["word_count"] == 7
+
+def test_unknown_modes_and_analyzers_are_rejected(client):
+    for payload in ({"mode": "quick"}, {"analyzers": ["correctness", "telepathy"]}, {"analyzers": "grammar"},
+                    {"analyzers": 5}, {"max_hits_per_rule": 0}, {"time_budget_ms": -5}):
+        response = _check(client, **payload)
+        assert response.status_code == 400, payload
+        assert "error" in response.get_json()
+    assert "telepathy" in _check(client, analyzers="telepathy").get_json()["error"]
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from src import cli
+
+LINES = ["Teh first line.", "", "A second line with grammer.", "Third.", "   ", "The fourth and last line."]
+
+def _run(argv, stdin=""):
+    """Run the CLI in-process; returns (exit code, JSON records)"""
+    args = cli.build_parser().parse_args(argv)
+    stdout = io.StringIO()
+    code = cli.run(args, stdin=io.StringIO(stdin) if isinstance(stdin, str) else stdin, stdout=stdout)
+    return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_check_lines_keeps_input_order(tmp_path, workers):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    with open(corpus, encoding="utf-8") as stdin:
+        code, records = _run(["check", "--lines", "--quiet", "--workers", workers, "--chunksize", "1"], stdin)
+    assert code == 0
+    # Blank lines are skipped but keep their numbers
+    assert [record["source"] for record in records] == ["stdin:1", "stdin:3", "stdin:4", "stdin:6"]
+    assert [record["characters"] for record in records] == [len(LINES[i]) for i in (0, 2, 3, 5)]
+    assert [record["result"]["document_insights"]["word_count"] for record in records] == [3, 5, 1, 5]
+    assert "correctness:teh" in {error["rule"] for error in records[0]["result"]["errors"]}
+
+def test_check_files_and_directories(tmp_path):
+    (tmp_path / "b.txt").write_text("Teh end.", encoding="utf-8")
+    (tmp_path / "a.md").write_text("Hello there.", encoding="utf-8")
+    (tmp_path / "skip.csv").write_text("not,picked,up", encoding="utf-8")
+    code, records = _run(["check", str(tmp_path), "--quiet", "--workers", "1"])
+    assert code == 0
+    assert [record["source"] for record in records] == [str(tmp_path / "a.md"), str(tmp_path / "b.txt")]
+
+def test_fix_reads_stdin_as_one_document():
+    code, (record,) = _run(["fix", "--quiet", "--workers", "1"], "Teh grammer.\nSecond line.")
+    assert code == 0
+    assert record["source"] == "stdin"
+    assert record["characters"] == len("Teh grammer.\nSecond line.")
+    assert record["result"]["fixed"].endswith("grammar.\nSecond line.")
+    assert record["result"]["total_fixes"] == 2
+
+def test_check_insights_and_analyzers():
+    _, (insights,) = _run(["check", "--insights", "--quiet", "--workers", "1"], "Teh cat sat.")
+    assert "errors" not in insights["result"]
+    assert insights["result"]["document_insights"]["word_count"] == 3
+    _, (record,) = _run(["check", "--analyzers", "clarity", "--quiet", "--workers", "1"], "Teh cat sat.")
+    assert record["result"]["errors"] == []
+    assert record["result"]["analysis"]["completed"] == ["clarity"]
+
+def test_a_bad_file_fails_only_its_own_record(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text("Fine text.", encoding="utf-8")
+    bad = tmp_path / "bad.txt"
+    bad.write_bytes(b"\xff\xfe\xfa")
+    code, records = _run(["check", str(bad), str(good), "--quiet", "--workers", "1"])
+    assert code == 1
+    assert records[0]["source"] == str(bad) and "error" in records[0] and records[0]["characters"] == 0
+    assert records[1]["source"] == str(good) and "error" not in records[1]
+
+def test_bad_arguments_exit_2(capsys):
+    assert cli.main(["check", "--workers", "0"]) == 2
+    assert _run(["check", "--language", "xx", "--quiet"])[0] == 2
+    assert _run(["check", "--analyzers", "nope", "--quiet"])[0] == 2
+    assert "nope" in capsys.readouterr().err
+
+def test_progress_summary():
+    stream = io.StringIO()
+    progress = cli.Progress(stream=stream)
+    progress.update({"characters": 2_000_000})
+    progress.update({"characters": 0, "error": "boom"})
+    progress.finish()
+    assert stream.getvalue().startswith("\r2 docs (1 failed), 2.0 MB in ")
@@ -0,0 +1,112 @@
+import pytest
+
+def _user(client, name="ada"):
+    response = client.post("/api/users", json={"username": name, "email": f"{name}@example.com"})
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def _team(client, name="docs"):
+    response = client.post("/api/teams", json={"name": name})
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+def _flagged(client, text, **ids):
+    response = client.post("/api/grammar/check", json={"text": text, "analyzers": ["correctness"], **ids})
+    assert response.status_code == 200
+    return {error["word"].lower() for error in response.get_json()["errors"]}
+
+def test_user_dictionary_crud(client):
+    user_id = _user(client)
+
+    created = client.post(f"/api/users/{user_id}/dictionary", json={"word": "  Grammarpro  "})
+    assert created.status_code == 201
+    entry = created.get_json()
+    assert entry["word"] == "Grammarpro"
+    assert entry["kind"] == "ignore"
+    assert entry["user_id"] == user_id
+
+    listed = client.get(f"/api/users/{user_id}/dictionary").get_json()
+    assert [item["id"] for item in listed] == [entry["id"]]
+
+    updated = client.put(f"/api/dictionary/{entry['id']}",
+                         json={"kind": "replace", "replacement": "GrammarPro"})
+    assert updated.status_code == 200
+    assert updated.get_json()["kind"] == "replace"
+    assert updated.get_json()["replacement"] == "GrammarPro"
+    assert updated.get_json()["word"] == "Grammarpro"
+
+    # Clearing the replacement of a replace entry is refused
+    assert client.put(f"/api/dictionary/{entry['id']}", json={"replacement": None}).status_code == 400
+
+    assert client.delete(f"/api/dictionary/{entry['id']}").status_code == 204
+    assert client.get(f"/api/users/{user_id}/dictionary").get_json() == []
+    assert client.delete(f"/api/dictionary/{entry['id']}").status_code == 404
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"word": "   "},
+    {"word": 42},
+    {"word": "teh", "replacement": ["the"]},
+    {"word": "teh", "kind": "banish"},
+    {"word": "teh", "kind": "replace"},
+])
+def test_invalid_entries_are_rejected(client, payload):
+    user_id = _user(client)
+    response = client.post(f"/api/users/{user_id}/dictionary", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+def test_entries_for_unknown_owners_are_not_found(client):
+    assert client.post("/api/users/99/dictionary", json={"word": "teh"}).status_code == 404
+    assert client.post("/api/teams/99/dictionary", json={"word": "teh"}).status_code == 404
+
+def test_team_names(client):
+    _team(client, "docs")
+    duplicate = client.post("/api/teams", json={"name": "docs"})
+    assert duplicate.status_code == 409
+    assert client.post("/api/teams", json={"name": ["docs"]}).status_code == 400
+    assert client.post("/api/teams", json={}).status_code == 400
+    # The session is still usable after the rolled back insert
+    _team(client, "legal")
+
+def test_team_membership(client):
+    user_id = _user(client)
+    team_id = _team(client)
+    team = client.post(f"/api/teams/{team_id}/members", json={"user_id": user_id}).get_json()
+    assert team["member_ids"] == [user_id]
+    assert client.delete(f"/api/teams/{team_id}/members/{user_id}").status_code == 204
+    assert client.get(f"/api/teams/{team_id}").get_json()["member_ids"] == []
+
+def test_user_entries_change_the_next_check(client):
+    user_id = _user(client)
+    assert "teh" in _flagged(client, "Teh cat sat.", user_id=user_id)
+
+    entry = client.post(f"/api/users/{user_id}/dictionary", json={"word": "teh"}).get_json()
+    assert "teh" not in _flagged(client, "Teh cat sat.", user_id=user_id)
+    # Other users and the anonymous ruleset are unaffected
+    assert "teh" in _flagged(client, "Teh cat sat.", user_id=_user(client, "bob"))
+    assert "teh" in _flagged(client, "Teh cat sat.")
+
+    client.delete(f"/api/dictionary/{entry['id']}")
+    assert "teh" in _flagged(client, "Teh cat sat.", user_id=user_id)
+
+def test_team_entries_follow_membership(client):
+    user_id = _user(client)
+    team_id = _team(client)
+    client.post(f"/api/teams/{team_id}/dictionary", json={"word": "teh"})
+    assert "teh" not in _flagged(client, "Teh cat sat.", team_id=team_id)
+    assert "teh" in _flagged(client, "Teh cat sat.", user_id=user_id)
+
+    client.post(f"/api/teams/{team_id}/members", json={"user_id": user_id})
+    assert "teh" not in _flagged(client, "Teh cat sat.", user_id=user_id)
+
+    client.delete(f"/api/teams/{team_id}/members/{user_id}")
+    assert "teh" in _flagged(client, "Teh cat sat.", user_id=user_id)
+
+def test_replace_entries_add_house_style(client):
+    user_id = _user(client)
+    client.post(f"/api/users/{user_id}/dictionary",
+                json={"word": "e-mail", "kind": "replace", "replacement": "email"})
+    response = client.post("/api/grammar/check", json={"text": "Send an e-mail today.", "user_id": user_id})
+    matches = [error for error in response.get_json()["errors"] if error["word"].lower() == "e-mail"]
+    assert matches and matches[0]["suggestions"] == ["email"]
@@ -0,0 +1,161 @@
+import difflib
+import random
+
+import pytest
+
+from src.analysis.diff import WordDiff, matching_blocks, opcodes
+
+def _assert_valid_blocks(a, b, blocks):
+    assert blocks[-1] == (len(a), len(b), 0)
+    i_end = j_end = 0
+    for i, j, size in blocks[:-1]:
+        assert size > 0
+        # Increasing on both sides, never overlapping
+        assert i >= i_end and j >= j_end
+        assert a[i:i + size] == b[j:j + size]
+        # Touching runs are joined
+        assert not (i == i_end and j == j_end and (i, j) != (0, 0))
+        i_end, j_end = i + size, j + size
+
+def _assert_valid_opcodes(a, b, steps):
+    i = j = 0
+    for tag, i1, i2, j1, j2 in steps:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        elif tag == "delete":
+            assert i1 < i2 and j1 == j2
+        elif tag == "insert":
+            assert i1 == i2 and j1 < j2
+        else:
+            assert tag == "replace" and i1 < i2 and j1 < j2
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+
+def _edited(rng, tokens):
+    tokens = list(tokens)
+    for _ in range(rng.randint(0, 8)):
+        position = rng.randint(0, len(tokens))
+        action = rng.choice(["insert", "delete", "replace", "move"])
+        if action == "insert":
+            tokens[position:position] = [rng.randint(0, 30) for _ in range(rng.randint(1, 4))]
+        elif action == "delete":
+            del tokens[position:position + rng.randint(1, 4)]
+        elif action == "replace":
+            tokens[position:position + 1] = [rng.randint(0, 30)]
+        else:
+            moved = tokens[position:position + rng.randint(1, 6)]
+            del tokens[position:position + len(moved)]
+            target = rng.randint(0, len(tokens))
+            tokens[target:target] = moved
+    return tokens
+
+@pytest.mark.parametrize("a, b", [
+    ([], []),
+    ([1, 2, 3], []),
+    ([], [1, 2, 3]),
+    ([1, 2, 3], [1, 2, 3]),
+    ([1, 2, 3], [4, 5, 6]),
+    ([1, 2, 3, 4], [1, 9, 3, 4]),
+    ([1, 1, 1, 2], [2, 1, 1, 1]),
+    ([1, 2, 1, 2, 1, 2], [2, 1, 2, 1]),
+])
+def test_blocks_are_valid_for_small_cases(a, b):
+    blocks = matching_blocks(a, b)
+    _assert_valid_blocks(a, b, blocks)
+    _assert_valid_opcodes(a, b, opcodes(blocks))
+
+def test_blocks_are_valid_for_random_edits():
+    rng = random.Random(20260101)
+    for _ in range(500):
+        a = [rng.randint(0, 30) for _ in range(rng.randint(0, 60))]
+        b = _edited(rng, a)
+        blocks = matching_blocks(a, b)
+        _assert_valid_blocks(a, b, blocks)
+        _assert_valid_opcodes(a, b, opcodes(blocks))
+
+def test_without_unique_tokens_the_diff_is_minimal():
+    # No token occurs once on each side, so Myers alone decides the alignment
+    rng = random.Random(7)
+    for _ in range(200):
+        a = [rng.randint(0, 2) for _ in range(rng.randint(0, 30))] * 2
+        b = [rng.randint(0, 2) for _ in range(rng.randint(0, 30))] * 2
+        matched = sum(size for _, _, size in matching_blocks(a, b))
+        longest = _lcs_length(a, b)
+        assert matched == longest
+
+def _lcs_length(a, b):
+    row = [0] * (len(b) + 1)
+    for x in a:
+        previous = 0
+        for j, y in enumerate(b, 1):
+            previous, row[j] = row[j], previous + 1 if x == y else max(row[j], row[j - 1])
+    return row[-1]
+
+def test_timeout_leaves_a_valid_partial_diff():
+    rng = random.Random(3)
+    a = [rng.randint(0, 5) for _ in range(3000)]
+    b = [rng.randint(0, 5) for _ in range(3000)]
+    blocks = matching_blocks(a, b, timeout=0)
+    _assert_valid_blocks(a, b, blocks)
+    _assert_valid_opcodes(a, b, opcodes(blocks))
+
+def test_agrees_with_difflib_on_plain_edits():
+    a = "the cat sat on the mat and looked at the dog".split()
+    b = "the cat sat on a red mat and looked at the big dog".split()
+    ours = sum(size for _, _, size in matching_blocks(a, b))
+    theirs = sum(block.size for block in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks())
+    assert ours == theirs
+
+OLD = "Teh first paragraph stays. The second one changes here.\n\nThe last paragraph stays too."
+NEW = "Teh first paragraph stays. The second one was rewritten here.\n\nThe last paragraph stays too."
+
+def _span(text, word, occurrence=0):
+    start = -1
+    for _ in range(occurrence + 1):
+        start = text.index(word, start + 1)
+    return start, start + len(word)
+
+def test_changes_report_the_edited_stretch():
+    changes = WordDiff(OLD, NEW).changes()
+    assert [(change["type"], change["old_text"], change["new_text"]) for change in changes] == \
+        [("replace", "changes", "was rewritten")]
+
+def test_map_span_follows_unchanged_text():
+    diff = WordDiff(OLD, NEW)
+    for word in ("Teh", "first paragraph", "second one", "here.", "last paragraph stays too"):
+        start, end = _span(OLD, word)
+        moved = diff.map_span(start, end)
+        assert moved is not None
+        assert NEW[moved[0]:moved[1]] == word
+    assert diff.map_span(*_span(OLD, "changes")) is None
+    # A span reaching into the edit doesn't carry over either
+    assert diff.map_span(*_span(OLD, "one changes")) is None
+
+def test_map_span_is_exact_for_random_edits():
+    rng = random.Random(11)
+    words = "alpha beta gamma delta epsilon zeta eta theta iota kappa , .".split()
+    for _ in range(200):
+        old_tokens = [rng.choice(words) for _ in range(rng.randint(1, 40))]
+        new_tokens = list(old_tokens)
+        for _ in range(rng.randint(0, 4)):
+            position = rng.randint(0, len(new_tokens))
+            new_tokens[position:position + rng.randint(0, 2)] = rng.sample(words, rng.randint(0, 2))
+        old, new = " ".join(old_tokens), " ".join(new_tokens)
+        diff = WordDiff(old, new)
+        for _ in range(20):
+            start = rng.randint(0, len(old))
+            end = rng.randint(start, len(old))
+            moved = diff.map_span(start, end)
+            if moved is not None:
+                assert new[moved[0]:moved[1]] == old[start:end]
+        if old == new:
+            assert diff.map_span(0, len(old)) == (0, len(new))
+
+def test_stats_count_words_on_both_sides():
+    stats = WordDiff(OLD, NEW).stats()
+    assert stats["words_removed"] == 1
+    assert stats["words_added"] == 2
+    assert stats["old_words"] - stats["words_removed"] == stats["words_unchanged"]
+    # Passing the old word count gives the same answer
+    assert WordDiff(OLD, NEW).stats(stats["old_words"]) == stats
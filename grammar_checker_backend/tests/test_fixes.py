@@ -0,0 +1,106 @@
+import pytest
+
+from src.analysis.checker import check_text
+from src.analysis.fixes import apply_fixes, error_id, FixConflict
+from src.analysis.rule_packs import load_pack
+
+TEXT = "Teh grammer of this sentance is good."
+
+@pytest.fixture
+def errors():
+    errors = check_text(TEXT, load_pack("en"), analyzers=["correctness"])["errors"]
+    assert [error["word"] for error in errors] == ["Teh", "grammer", "sentance"]
+    return errors
+
+def _error(rule, start, word, suggestions=()):
+    return {"id": error_id(rule, start, word), "rule": rule, "word": word, "start": start,
+            "end": start + len(word), "suggestions": list(suggestions)}
+
+def test_applies_fixes_and_moves_the_rest(errors):
+    teh, grammer, sentance = errors
+    result = apply_fixes(TEXT, errors, [teh["id"], {"id": grammer["id"], "replacement": "spelling"}])
+    assert result["text"] == "The spelling of this sentance is good."
+    assert [(fix["original"], fix["replacement"], fix["start"], fix["end"]) for fix in result["applied"]] == \
+        [("Teh", "The", 0, 3), ("grammer", "spelling", 4, 12)]
+
+    (moved,) = result["errors"]
+    assert moved["word"] == "sentance"
+    assert result["text"][moved["start"]:moved["end"]] == "sentance"
+    assert moved["start"] == sentance["start"] + 1
+    # The id follows the offset, so the moved error can be fixed in turn
+    assert moved["id"] == error_id(moved["rule"], moved["start"], "sentance") != sentance["id"]
+    again = apply_fixes(result["text"], result["errors"], [moved["id"]])
+    assert again["text"] == "The spelling of this sentence is good."
+    assert result["invalidated"] == []
+
+def test_fixing_nothing_keeps_everything(errors):
+    result = apply_fixes(TEXT, errors, [])
+    assert result["text"] == TEXT
+    assert result["errors"] == errors
+
+def test_suggestions_follow_the_case_of_the_text():
+    text = "GRAMMER matters."
+    error = _error("correctness:grammer", 0, "GRAMMER", ["grammar"])
+    assert apply_fixes(text, [error], [error["id"]])["text"] == "GRAMMAR matters."
+
+def test_errors_overlapping_a_fix_are_invalidated():
+    text = "in order to win"
+    wordy = _error("clarity:2", 0, "in order to", ["Simplify this phrase"])
+    inner = _error("correctness:order", 3, "order", ["sequence"])
+    after = _error("correctness:win", 12, "win", ["succeed"])
+    result = apply_fixes(text, [wordy, inner, after], [{"id": wordy["id"], "replacement": "to"}])
+    assert result["text"] == "to win"
+    assert result["invalidated"] == [inner["id"]]
+    assert [(error["word"], error["start"]) for error in result["errors"]] == [("win", 3)]
+
+def test_descriptive_rules_need_a_replacement():
+    error = _error("clarity:2", 0, "in order to", ["Simplify this phrase"])
+    with pytest.raises(ValueError, match="needs an explicit replacement"):
+        apply_fixes("in order to win", [error], [error["id"]])
+
+def test_stale_spans_conflict(errors):
+    edited = "A " + TEXT
+    with pytest.raises(FixConflict) as raised:
+        apply_fixes(edited, errors, [errors[0]["id"], errors[1]["id"]])
+    assert raised.value.ids == [errors[0]["id"], errors[1]["id"]]
+
+def test_a_tampered_id_conflicts(errors):
+    moved = {**errors[0], "id": error_id(errors[0]["rule"], 5, "Teh")}
+    with pytest.raises(FixConflict):
+        apply_fixes(TEXT, [moved], [moved["id"]])
+
+def test_overlapping_fixes_conflict():
+    text = "a large number of cats"
+    outer = _error("conciseness:1", 0, "a large number of", ["many"])
+    inner = _error("conciseness:0", 8, "number of", ["several"])
+    with pytest.raises(FixConflict, match="overlap") as raised:
+        apply_fixes(text, [outer, inner], [outer["id"], inner["id"]])
+    assert raised.value.ids == [outer["id"], inner["id"]]
+
+@pytest.mark.parametrize("start, end", [(-1, 3), (5, 3), (0, len(TEXT) + 1), (len(TEXT) + 2, len(TEXT) + 5)])
+def test_spans_outside_the_text_are_rejected(errors, start, end):
+    bad = {**errors[0], "start": start, "end": end}
+    with pytest.raises(ValueError, match="outside the text") as raised:
+        apply_fixes(TEXT, [bad, *errors[1:]], [errors[1]["id"]])
+    assert not isinstance(raised.value, FixConflict)
+
+def test_unknown_ids_are_rejected(errors):
+    with pytest.raises(ValueError, match="Unknown error id"):
+        apply_fixes(TEXT, errors, ["nope"])
+
+def test_route_status_codes(client, errors):
+    def post(**payload):
+        return client.post("/api/grammar/apply_fixes", json={"text": TEXT, "errors": errors, **payload})
+
+    response = post(fixes=[errors[0]["id"]])
+    assert response.status_code == 200
+    assert response.get_json()["text"].startswith("The grammer")
+
+    conflict = post(text="A " + TEXT, fixes=[errors[0]["id"]])
+    assert conflict.status_code == 409
+    assert conflict.get_json()["conflicts"] == [errors[0]["id"]]
+
+    out_of_range = post(errors=[{**errors[0], "end": 10_000}], fixes=[errors[0]["id"]])
+    assert out_of_range.status_code == 400
+    assert post(fixes="all").status_code == 400
+    assert post(fixes=["nope"]).status_code == 400
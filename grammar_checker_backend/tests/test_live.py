@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from src.analysis import live
+from src.analysis.checker import check_text, AnalysisCancelled
+from src.analysis.live import LiveSession
+from src.analysis.rule_packs import load_pack
+from src.analysis.rulesets import Ruleset
+
+DEBOUNCE = 0.05
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Record the text of every check a session actually runs"""
+    monkeypatch.setattr(live, "DEBOUNCE_SECONDS", DEBOUNCE)
+    texts = []
+
+    def recording_check(text, pack, ruleset, should_stop=None, time_budget=None):
+        texts.append(text)
+        return check_text(text, pack, ruleset, should_stop=should_stop, time_budget=time_budget)
+
+    monkeypatch.setattr(live, "check_text", recording_check)
+    return texts
+
+@pytest.fixture
+def rules():
+    pack = load_pack("en")
+    return pack, Ruleset(pack.grammar_rules, pack.vocabulary, pack_version=pack.version)
+
+def test_updates_inside_the_debounce_window_are_checked_once(checks, rules):
+    session = LiveSession("doc")
+    for index, text in enumerate(["Teh", "Teh cat", "Teh cat sat."], 1):
+        assert session.submit(text, *rules) == (index, True)
+    revision, result = session.wait_for_result(0, timeout=5)
+    assert revision == 3
+    assert checks == ["Teh cat sat."]
+    assert result["document_insights"]["word_count"] == 3
+    # Nothing else arrives for the superseded revisions
+    assert session.wait_for_result(3, timeout=3 * DEBOUNCE) is None
+
+def test_revisions_after_the_window_are_each_checked(checks, rules):
+    session = LiveSession("doc")
+    session.submit("First draft.", *rules)
+    assert session.wait_for_result(0, timeout=5)[0] == 1
+    session.submit("Second draft.", *rules)
+    assert session.wait_for_result(1, timeout=5)[0] == 2
+    assert checks == ["First draft.", "Second draft."]
+
+def test_out_of_order_revisions_are_rejected(checks, rules):
+    session = LiveSession("doc")
+    assert session.submit("newer", *rules, revision=5) == (5, True)
+    assert session.submit("older", *rules, revision=4) == (5, False)
+    assert session.submit("same", *rules, revision=5) == (5, False)
+    revision, _ = session.wait_for_result(0, timeout=5)
+    assert revision == 5
+    assert checks == ["newer"]
+
+def test_a_running_check_is_cancelled_by_a_newer_revision(monkeypatch, rules):
+    monkeypatch.setattr(live, "DEBOUNCE_SECONDS", DEBOUNCE)
+    started = threading.Event()
+    cancelled = []
+
+    def slow_check(text, pack, ruleset, should_stop=None, time_budget=None):
+        if text == "old":
+            started.set()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if should_stop():
+                    cancelled.append(text)
+                    raise AnalysisCancelled()
+                time.sleep(0.005)
+        return {"text": text}
+
+    monkeypatch.setattr(live, "check_text", slow_check)
+    session = LiveSession("doc")
+    session.submit("old", *rules)
+    assert started.wait(timeout=5)
+    session.submit("new", *rules)
+    assert session.wait_for_result(0, timeout=5) == (2, {"text": "new"})
+    assert cancelled == ["old"]
+
+def test_should_stop_cancels_check_text(rules):
+    with pytest.raises(AnalysisCancelled):
+        check_text("Teh cat sat. " * 100, *rules, should_stop=lambda: True)
+
+def test_closing_drops_the_pending_revision(checks, rules):
+    session = LiveSession("doc")
+    session.submit("Teh cat.", *rules)
+    session.close()
+    assert session.wait_for_result(0, timeout=3 * DEBOUNCE) is None
+    time.sleep(2 * DEBOUNCE)
+    assert checks == []
+
+def test_sessions_are_shared_by_id():
+    session = live.get_session("shared-doc")
+    assert live.get_session("shared-doc") is session
+    assert live.close_session("shared-doc")
+    assert session.closed
+    assert live.get_session("shared-doc", create=False) is None
+    assert not live.close_session("shared-doc")
@@ -0,0 +1,92 @@
+import json
+import random
+import socket
+import sys
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from src import loadtest
+
+SMALL_RUN = ["--duration", "0.5", "--warmup", "0", "--concurrency", "2", "--documents", "4",
+             "--median-words", "30", "--max-words", "60", "--startup-timeout", "5", "--json"]
+
+@pytest.fixture
+def server_url(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    thread.join()
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_run_against_a_live_server(server_url, capsys):
+    assert loadtest.main(["--url", server_url, "--mix", "check=3,auto_fix=1", *SMALL_RUN]) == 0
+    report = json.loads(capsys.readouterr().out)
+    overall = report["overall"]
+    assert overall["requests"] > 0
+    assert overall["errors"] == 0 and report["failures"] == {}
+    assert set(report["endpoints"]) == {"check", "auto_fix"}
+    assert sum(stats["requests"] for stats in report["endpoints"].values()) == overall["requests"]
+    assert overall["p50_ms"] <= overall["p95_ms"] <= overall["p99_ms"] <= overall["max_ms"]
+    # The timeline also has the requests that were still in flight at the deadline
+    assert sum(second["requests"] for second in report["timeline"]) >= overall["requests"]
+    assert report["config"]["shared_cache"] is False
+
+def test_spawned_server_is_stopped_and_its_failures_counted(capfd):
+    # A server that answers every POST with 501
+    port = _free_port()
+    spawn = f"{sys.executable} -m http.server {port} --bind 127.0.0.1"
+    code = loadtest.main(["--url", f"http://127.0.0.1:{port}", "--spawn", spawn, "--mix", "check",
+                          "--max-error-rate", "0.5", "--sample-interval", "0.1", *SMALL_RUN])
+    assert code == 1
+    report = json.loads(capfd.readouterr().out)
+    assert report["overall"]["error_rate"] == 1.0
+    assert list(report["failures"]) == ["check: 501"]
+    assert report["memory"]["peak_total_rss_mb"] > 0
+    with pytest.raises(OSError):
+        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+
+def test_nothing_listening_exits_2(capsys):
+    port = _free_port()
+    assert loadtest.main(["--url", f"http://127.0.0.1:{port}", *SMALL_RUN[:-3], "--startup-timeout", "0.3"]) == 2
+    assert "Nothing is listening" in capsys.readouterr().err
+
+@pytest.mark.parametrize("argv", [["--mix", "check=1,nope=2"], ["--mix", "check=0"], ["--concurrency", "0"]])
+def test_bad_arguments_exit_2(argv):
+    assert loadtest.main(argv) == 2
+
+def test_parse_mix():
+    assert loadtest.parse_mix("check=60, auto_fix=20,paraphrase") == {"check": 60.0, "auto_fix": 20.0, "paraphrase": 1.0}
+    with pytest.raises(ValueError, match="must not be negative"):
+        loadtest.parse_mix("check=-1")
+
+def test_document_sizes_stay_in_bounds():
+    documents = loadtest.document_pool(random.Random(0), 50, 100, 1.5, 400)
+    lengths = [len(document.split()) for document in documents]
+    assert min(lengths) >= 20
+    # The last sentence may run a little past the target
+    assert max(lengths) < 400 + 20
+    assert documents == loadtest.document_pool(random.Random(0), 50, 100, 1.5, 400)
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [loadtest.percentile(values, f) for f in (0.5, 0.95, 0.99, 1.0)] == [50, 95, 99, 100]
+    assert loadtest.percentile([], 0.5) is None
+
+def test_format_report_counts_cache_hits():
+    results = [(0.5, "check", 0.01, 200, None, True), (0.7, "check", 0.03, 200, None, False),
+               (1.2, "check", 0.02, 503, None, False)]
+    args = loadtest.build_parser().parse_args(["--mix", "check"])
+    report = loadtest.build_report(results, 0.0, 0.0, 2.0, [], args, {"check": 1.0})
+    assert report["overall"]["cache_hits"] == 1
+    assert report["failures"] == {"check: 503": 1}
+    assert [second["requests"] for second in report["timeline"]] == [2, 1]
+    lines = loadtest.format_report(report).splitlines()
+    assert lines[1].split()[:3] == ["check", "3", "1"]
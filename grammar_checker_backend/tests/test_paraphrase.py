@@ -0,0 +1,81 @@
+import pytest
+
+from src.analysis.paraphrase import ParaphraseEngine, MAX_VARIANTS, match_case
+
+VOCABULARY = {"happy": ["joyful", "glad", "cheerful"], "fast": ["quick", "swift"], "empty": []}
+TEXT = "Happy dogs run fast, very FAST; the happy end."
+
+@pytest.fixture
+def engine():
+    return ParaphraseEngine(VOCABULARY)
+
+def test_match_case():
+    assert match_case("joyful", "happy") == "joyful"
+    assert match_case("joyful", "Happy") == "Joyful"
+    assert match_case("joyful", "HAPPY") == "JOYFUL"
+    assert match_case("joyful", "A") == "Joyful"
+
+def test_variants_replace_only_known_words_and_keep_the_rest(engine):
+    (variant,) = engine.variants(TEXT, seed=1)
+    words = variant.replace(",", "").replace(";", "").replace(".", "").split()
+    assert words[0] in ("Joyful", "Glad", "Cheerful")
+    assert words[3] in ("quick", "swift")
+    assert words[5] in ("QUICK", "SWIFT")
+    assert words[1:3] == ["dogs", "run"]
+    # Punctuation and spacing survive the splice
+    assert [char for char in variant if not char.isalpha()] == [char for char in TEXT if not char.isalpha()]
+
+def test_the_same_seed_gives_the_same_variants(engine):
+    assert engine.variants(TEXT, 5, seed=42) == engine.variants(TEXT, 5, seed=42)
+    assert engine.variants(TEXT, 5, seed=42) != engine.variants(TEXT, 5, seed=43)
+    # Asking for more variants doesn't change the first ones
+    assert engine.variants(TEXT, 8, seed=42)[:5] == engine.variants(TEXT, 5, seed=42)
+
+def test_texts_without_candidates_come_back_unchanged(engine):
+    assert engine.variants("Nothing to swap here.", 3, seed=0) == ["Nothing to swap here."] * 3
+    assert engine.candidates("Empty words stay empty.") == []
+
+def test_batch_seeds_each_text_separately(engine):
+    batch = engine.batch([TEXT, TEXT, "fast"], 2, seed=7)
+    assert len(batch) == 3 and all(len(variants) == 2 for variants in batch)
+    assert batch == engine.batch([TEXT, TEXT, "fast"], 2, seed=7)
+    assert batch[0] == engine.variants(TEXT, 2, "7:0")
+    assert batch[1] == engine.variants(TEXT, 2, "7:1")
+
+def _paraphrase(client, **payload):
+    return client.post("/api/grammar/paraphrase", json=payload)
+
+def test_route_is_deterministic_for_a_seed(client):
+    first = _paraphrase(client, text="I am happy and fast.", variants=3, seed=5).get_json()
+    second = _paraphrase(client, text="I am happy and fast.", variants=3, seed=5).get_json()
+    assert first == second
+    assert len(first["variants"]) == 3
+    assert first["seed"] == 5
+    assert first["paraphrased"].endswith(first["variants"][0])
+
+def test_route_picks_and_returns_a_seed_when_none_is_given(client):
+    result = _paraphrase(client, text="I am happy.").get_json()
+    repeated = _paraphrase(client, text="I am happy.", seed=result["seed"]).get_json()
+    assert repeated["variants"] == result["variants"]
+
+@pytest.mark.parametrize("variants", [0, -1, MAX_VARIANTS + 1, "many", None, [2]])
+def test_route_rejects_variants_out_of_range(client, variants):
+    response = _paraphrase(client, text="I am happy.", variants=variants)
+    assert response.status_code == 400
+    assert "variants" in response.get_json()["error"]
+
+@pytest.mark.parametrize("variants", [1, MAX_VARIANTS])
+def test_route_accepts_the_variants_bounds(client, variants):
+    assert len(_paraphrase(client, text="I am happy.", variants=variants).get_json()["variants"]) == variants
+
+def test_route_batch(client):
+    texts = ["I am happy.", "We are fast.", ""]
+    result = _paraphrase(client, texts=texts, variants=2, seed=9).get_json()
+    assert [item["original"] for item in result["results"]] == texts
+    assert all(len(item["variants"]) == 2 for item in result["results"])
+    assert result["results"][2]["variants"] == ["", ""]
+    assert _paraphrase(client, texts=texts, variants=2, seed=9).get_json() == result
+
+@pytest.mark.parametrize("payload", [{"texts": "I am happy."}, {"texts": ["ok", 3]}, {"text": ["I am happy."]}])
+def test_route_rejects_malformed_input(client, payload):
+    assert _paraphrase(client, **payload).status_code == 400
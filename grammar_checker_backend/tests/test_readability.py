@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from src.analysis.readability import readability, readability_batch, syllable_counts, combined_document
+from src.analysis.tokenizer import WORD_PATTERN, SENTENCE_END_PATTERN, PARAGRAPH_BREAK
+
+TEXT = ("Readability formulas are surprisingly simple. They count words and syllables!\n\n"
+        "Every paragraph gets its own totals. Does it work? Naturally.\n\n"
+        "A single sentence paragraph, with a comma and an abbreviation-free ending.")
+
+COUNTS = ("words", "sentences", "syllables", "complex_words")
+
+def _syllables(word):
+    return int(syllable_counts(word, np.array([0]), np.array([len(word)]))[0])
+
+def _pieces(text, pattern):
+    """(start, end) of the text between matches of pattern"""
+    position = 0
+    for match in pattern.finditer(text):
+        yield position, match.start()
+        position = match.end()
+    yield position, len(text)
+
+def _expected(text, pattern):
+    """Per-group counts worked out one word at a time"""
+    sentence_starts = [
+        next(WORD_PATTERN.finditer(text, lo, hi)).start()
+        for lo, hi in _pieces(text, SENTENCE_END_PATTERN) if WORD_PATTERN.search(text, lo, hi)
+    ]
+    rows = []
+    for lo, hi in _pieces(text, pattern):
+        words = list(WORD_PATTERN.finditer(text, lo, hi))
+        if not words:
+            continue
+        syllables = [_syllables(word.group()) for word in words]
+        rows.append({
+            "start": words[0].start(), "end": words[-1].end(), "words": len(words),
+            "sentences": sum(1 for start in sentence_starts if lo <= start < hi),
+            "syllables": sum(syllables), "complex_words": sum(1 for count in syllables if count >= 3)
+        })
+    return rows
+
+def _counts(rows):
+    return [{key: row[key] for key in ("start", "end", *COUNTS)} for row in rows]
+
+def test_sentence_rows_match_a_word_by_word_count():
+    assert _counts(readability(TEXT)["sentences"]) == _expected(TEXT, SENTENCE_END_PATTERN)
+
+def test_paragraph_rows_match_a_word_by_word_count():
+    paragraphs = readability(TEXT)["paragraphs"]
+    assert len(paragraphs) == 3
+    assert _counts(paragraphs) == _expected(TEXT, PARAGRAPH_BREAK)
+    assert [row["sentences"] for row in paragraphs] == [2, 3, 1]
+
+def test_document_totals_are_the_sum_of_their_groups():
+    result = readability(TEXT)
+    for column in COUNTS:
+        assert result["document"][column] == sum(row[column] for row in result["paragraphs"])
+        if column != "sentences":
+            assert result["document"][column] == sum(row[column] for row in result["sentences"])
+    assert result["document"]["sentences"] == len(result["sentences"]) == 6
+
+def test_scores_follow_the_formulas():
+    (row,) = readability("Readability matters.")["sentences"]
+    assert (row["words"], row["syllables"], row["complex_words"]) == (2, 7, 1)
+    assert row["flesch_kincaid_grade"] == round(0.39 * 2 + 11.8 * 7 / 2 - 15.59, 2)
+    assert row["gunning_fog"] == round(0.4 * (2 + 100 * 1 / 2), 2)
+    assert row["smog"] == round(1.043 * (30 ** 0.5) + 3.1291, 2)
+
+@pytest.mark.parametrize("word, expected", [
+    ("the", 1), ("make", 1), ("table", 2), ("queue", 1), ("rhythm", 1), ("beautiful", 3), ("Hello", 2)
+])
+def test_syllable_estimates(word, expected):
+    assert _syllables(word) == expected
+
+def test_silent_e_is_english_only():
+    assert int(syllable_counts("parle", np.array([0]), np.array([5]), "fr")[0]) == 2
+    assert int(syllable_counts("make", np.array([0]), np.array([4]), "fr")[0]) == 2
+
+def test_batch_splits_back_into_documents():
+    texts = [TEXT, "", "One more. Last one", "Ünïcödé wörds trail"]
+    assert readability_batch(texts) == [readability(text) for text in texts]
+
+def test_batch_offsets_are_relative_to_each_text():
+    texts = ["First text here.", "Second one."]
+    second = readability_batch(texts)[1]
+    (sentence,) = second["sentences"]
+    assert texts[1][sentence["start"]:sentence["end"]] == "Second one"
+    assert second["paragraphs"][0]["start"] == 0
+
+def test_sentences_do_not_run_across_documents():
+    # Neither text ends with a terminator, yet each is its own sentence
+    first, second = readability_batch(["no full stop", "nor here"])
+    assert first["document"]["sentences"] == second["document"]["sentences"] == 1
+    assert (first["document"]["words"], second["document"]["words"]) == (3, 2)
+
+@pytest.mark.parametrize("text", ["", "   ", "...!?", "\n\n\n"])
+def test_texts_without_words_score_zero(text):
+    result = readability(text)
+    assert result["document"] == {column: 0 for column in COUNTS} | \
+        {"flesch_kincaid_grade": 0.0, "gunning_fog": 0.0, "smog": 0.0}
+    assert result["sentences"] == result["paragraphs"] == []
+
+def test_one_word():
+    result = readability("Hello")
+    assert result["sentences"] == result["paragraphs"]
+    (row,) = result["sentences"]
+    assert (row["start"], row["end"], row["words"], row["sentences"], row["syllables"]) == (0, 5, 1, 1, 2)
+    assert result["document"]["flesch_kincaid_grade"] == round(0.39 + 11.8 * 2 - 15.59, 2)
+
+def test_detail_off_returns_only_the_document():
+    assert readability_batch([TEXT, "Hi."], detail=False) == [{"document": readability(text)["document"]}
+                                                            for text in (TEXT, "Hi.")]
+
+def test_combined_document_matches_scoring_the_whole():
+    pieces = [TEXT[:TEXT.index("Every")], TEXT[TEXT.index("Every"):]]
+    parts = [result["document"] for result in readability_batch(pieces, detail=False)]
+    assert combined_document(parts) == readability(TEXT)["document"]
+
+def test_route_single_and_batch(client):
+    single = client.post("/api/grammar/readability", json={"text": "Hello there."}).get_json()
+    assert single["document"]["words"] == 2
+    assert single["language"] == "en"
+
+    batch = client.post("/api/grammar/readability", json={"texts": ["One.", "Two words."], "detail": False})
+    results = batch.get_json()["results"]
+    assert [result["document"]["words"] for result in results] == [1, 2]
+    assert "sentences" not in results[0]
+
+@pytest.mark.parametrize("texts", ["one text", ["fine", 3]])
+def test_route_rejects_texts_that_are_not_strings(client, texts):
+    response = client.post("/api/grammar/readability", json={"texts": texts})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "texts must be a list of strings"
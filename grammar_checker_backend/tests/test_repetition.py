@@ -0,0 +1,94 @@
+import random
+
+from src.analysis.checker import check_text, DEFAULT_ANALYZERS
+from src.analysis.repetition import find_repetitions, MAX_FINDINGS
+from src.analysis.rule_packs import load_pack
+from src.analysis.tokenizer import WORD_PATTERN, SENTENCE_END_PATTERN
+
+def _find(text, common_words=(), **kwargs):
+    return find_repetitions(text, list(WORD_PATTERN.finditer(text)), common_words, **kwargs)
+
+def _occurrences(text, phrase):
+    """Brute force: in-sentence occurrences of a phrase, compared word by word"""
+    target = [word.lower() for word in WORD_PATTERN.findall(phrase)]
+    count = 0
+    for sentence in SENTENCE_END_PATTERN.split(text):
+        words = [word.lower() for word in WORD_PATTERN.findall(sentence)]
+        count += sum(words[i:i + len(target)] == target for i in range(len(words) - len(target) + 1))
+    return count
+
+def test_repeated_phrase_is_reported_once_at_its_longest():
+    text = ("The quick brown fox jumps. The quick brown fox runs. "
+            "The quick brown fox sleeps. The quick brown fox eats.")
+    findings = _find(text)
+    assert findings == [{
+        "kind": "phrase",
+        "text": "The quick brown fox",
+        "words": 4,
+        "count": 4,
+        "spans": [[0, 19], [27, 46], [53, 72], [81, 100]]
+    }]
+
+def test_phrases_do_not_cross_sentences():
+    text = "Stop here. Go now. " * 5
+    phrases = [finding for finding in _find(text) if finding["kind"] == "phrase"]
+    assert phrases
+    assert all("." not in text[start:end] for finding in phrases for start, end in finding["spans"])
+
+def test_overused_words_skip_common_words():
+    text = " ".join(["The robust design is robust and the robust plan stays robust, truly robust."] * 2)
+    findings = _find(text, common_words={"the", "and", "is"})
+    words = [finding for finding in findings if finding["kind"] == "word"]
+    assert [(finding["text"], finding["count"]) for finding in words] == [("robust", 10)]
+    assert all(text[start:end].lower() == "robust" for start, end in words[0]["spans"])
+
+def test_findings_match_a_brute_force_count():
+    rng = random.Random(5)
+    vocabulary = "we ship the new parser to every team on monday and friday".split()
+    for _ in range(50):
+        sentences = []
+        for _ in range(rng.randint(5, 30)):
+            sentences.append(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 9))).capitalize() + ".")
+        text = " ".join(sentences)
+        for finding in _find(text):
+            assert len(finding["spans"]) == min(finding["count"], 20)
+            for start, end in finding["spans"]:
+                assert text[start:end].lower() == finding["text"].lower()
+            if finding["kind"] == "phrase":
+                assert finding["count"] == _occurrences(text, finding["text"])
+        # Reported in reading order
+        starts = [finding["spans"][0][0] for finding in _find(text)]
+        assert starts == sorted(starts)
+
+def test_spans_and_findings_are_capped():
+    text = " ".join(f"Alpha beta gamma delta {index}." for index in range(40))
+    (finding,) = [finding for finding in _find(text, max_spans=5) if finding["kind"] == "phrase"]
+    assert finding["count"] == 40
+    assert len(finding["spans"]) == 5
+
+    words = [f"w{index}" for index in range(200)]
+    text = ". ".join(" ".join([word] * 6) for word in words) + "."
+    assert len(_find(text)) <= MAX_FINDINGS
+
+def test_tick_stops_the_scan():
+    text = "The quick brown fox jumps. " * 50
+    assert _find(text, tick=lambda: True) is None
+    assert _find("") == []
+
+def test_check_text_reports_repetition_only_when_asked():
+    pack = load_pack("en")
+    text = "The quick brown fox jumps. The quick brown fox runs. The quick brown fox sleeps."
+    assert "repetition" not in DEFAULT_ANALYZERS
+    assert check_text(text, pack)["advanced_features"]["repetitions"] == []
+
+    result = check_text(text, pack, analyzers=["repetition"])
+    errors = [error for error in result["errors"] if error["rule"].startswith("repeated_phrase:")]
+    assert [(error["rule"], error["start"], error["end"]) for error in errors] == \
+        [("repeated_phrase:the quick brown fox", 0, 19)]
+    assert result["advanced_features"]["repetitions"][0]["count"] == 3
+
+def test_check_text_skips_repetition_when_out_of_time():
+    text = "The quick brown fox jumps. " * 2000
+    result = check_text(text, load_pack("en"), analyzers=["repetition"], time_budget=0)
+    assert not result["analysis"]["complete"]
+    assert result["advanced_features"]["repetitions"] == []
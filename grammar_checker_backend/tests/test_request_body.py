@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+from src.request_body import _ObjectReader, parse_json_object
+
+def _parse(raw, chunk_size):
+    return _ObjectReader(io.BytesIO(raw), chunk_size).read_object()
+
+DOCUMENTS = [
+    {},
+    {"text": ""},
+    {"text": "Teh grammer of this sentance.", "language": "en", "user_id": 7},
+    {"text": "quote \" backslash \\ slash / controls \b\f\n\r\t end"},
+    {"text": "été 中文 \U0001F600 €"},
+    {"text": "x" * 20000, "time_budget_ms": 250.5},
+    {"numbers": [0, -1, 12345678901234567890, 1.5, -2.25e-3, 6E+10], "flags": [True, False, None]},
+    {"nested": {"a": [{"b": {"c": []}}], "d": {}}, "after": "value"},
+    {"unicode key ü": "v", "": "empty key"},
+]
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_matches_json_loads(document, chunk_size, ensure_ascii):
+    raw = json.dumps(document, ensure_ascii=ensure_ascii).encode("utf-8")
+    assert _parse(raw, chunk_size) == json.loads(raw)
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+@pytest.mark.parametrize("raw", [
+    b'{"text": "\\ud83d\\ude00 smile"}',
+    b'{"text": "lone high \\ud83d then text"}',
+    b'{"text": "lone high at end \\ud83d"}',
+    b'{"text": "lone low \\ude00"}',
+    b'{"text": "\\u00e9\\u4E2D\\/"}',
+    b' \r\n\t{ "a" : 1 , "b" :\n[ 1 , 2 ] } \n',
+    b'{"n": 10}',
+    b'{"n": -0.5e10}',
+    b'{"a": 1, "a": 2}',
+])
+def test_escapes_and_whitespace_match_json_loads(raw, chunk_size):
+    assert _parse(raw, chunk_size) == json.loads(raw)
+
+@pytest.mark.parametrize("raw", [
+    b'',
+    b'{',
+    b'{"text"}',
+    b'{"text": }',
+    b'{"text": "unterminated',
+    b'{"text": "bad \\x escape"}',
+    b'{"text": "raw \x01 control"}',
+    b'{"a": 1,}',
+    b'{"a": 1 "b": 2}',
+    b"{'a': 1}",
+    b'{"a": 1} {"b": 2}',
+    b'{"a": 1}x',
+    b'{"a": tru}',
+    b'{"a": [1, 2}',
+])
+def test_malformed_bodies_raise_value_error(raw):
+    with pytest.raises(ValueError):
+        json.loads(raw)
+    with pytest.raises(ValueError):
+        _parse(raw, 3)
+
+@pytest.mark.parametrize("raw", [b'[]', b'"text"', b'42', b'null'])
+def test_only_objects_are_accepted(raw):
+    json.loads(raw)
+    with pytest.raises(ValueError, match="must be a JSON object"):
+        _parse(raw, 3)
+
+def test_multibyte_characters_split_across_chunks():
+    raw = json.dumps({"text": "é\U0001F600" * 50}, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 2, 3, 5):
+        assert _parse(raw, chunk_size) == json.loads(raw)
+
+def test_invalid_utf8_is_rejected():
+    with pytest.raises(ValueError):
+        parse_json_object(io.BytesIO(b'{"text": "\xff"}'))
+
+def test_endpoint_answers_bad_json_with_400(client):
+    response = client.post("/api/grammar/check", data=b'{"text": ', content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid JSON body")
+
+def test_endpoint_needs_a_json_content_type(client):
+    response = client.post("/api/grammar/check", data=b'{"text": "hi"}', content_type="text/plain")
+    assert response.status_code == 415
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from src.analysis.rewrite import (
+    RewriteError, RewriteOverloaded, RewriteProvider, RewriteRequest, RewriteService, RewriteTimeout
+)
+
+class RecordingProvider(RewriteProvider):
+    """Echoes each request and records every batch; clear release to hold calls"""
+    max_batch_size = 4
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+
+    def rewrite_batch(self, requests, timeout=None):
+        with self.lock:
+            self.batches.append([request.text for request in requests])
+        self.release.wait()
+        return [f"{request.kind}:{request.style}:{request.text}" for request in requests]
+
+    @property
+    def calls(self):
+        return sum(len(batch) for batch in self.batches)
+
+def _service(provider, **kwargs):
+    return RewriteService(provider, **{"workers": 2, "batch_window": 0.02, "timeout": 2.0, **kwargs})
+
+def test_requests_arriving_together_share_a_batch():
+    provider = RecordingProvider()
+    service = _service(provider)
+    results = service.rewrite_many([("rewrite", f"text {index}", "formal") for index in range(6)])
+    assert results == [f"rewrite:formal:text {index}" for index in range(6)]
+    # Six requests in one window, four per provider call
+    assert sorted(len(batch) for batch in provider.batches) == [2, 4]
+
+def test_identical_requests_share_one_call():
+    provider = RecordingProvider()
+    provider.release.clear()
+    service = _service(provider)
+    first = service.submit(RewriteRequest("rewrite", "same", "formal"))
+    second = service.submit(RewriteRequest("rewrite", "same", "formal"))
+    assert first is second
+    provider.release.set()
+    assert first.result(timeout=2) == "rewrite:formal:same"
+    assert provider.calls == 1
+
+def test_results_are_cached():
+    provider = RecordingProvider()
+    service = _service(provider)
+    assert service.rewrite("tone", "hello", "friendly") == "tone:friendly:hello"
+    assert service.rewrite("tone", "hello", "friendly") == "tone:friendly:hello"
+    assert provider.calls == 1
+    # Kind and style are part of the key
+    service.rewrite("tone", "hello", "assertive")
+    service.rewrite("rewrite", "hello", "friendly")
+    assert provider.calls == 3
+
+def test_timeout_raises_and_drops_the_abandoned_requests():
+    provider = RecordingProvider()
+    provider.release.clear()
+    service = _service(provider, workers=1, batch_window=0.001)
+    # Occupy the only worker, then give up on everything queued behind it
+    busy = service.submit(RewriteRequest("rewrite", "busy", "improve"))
+    time.sleep(0.05)
+    for index in range(10):
+        with pytest.raises(RewriteTimeout):
+            service.rewrite("rewrite", f"late {index}", "improve", timeout=0.02)
+    provider.release.set()
+    assert busy.result(timeout=2) == "rewrite:improve:busy"
+    time.sleep(0.1)
+    assert provider.batches == [["busy"]]
+    assert service._inflight == {}
+
+def test_a_request_stays_alive_while_someone_still_waits():
+    provider = RecordingProvider()
+    provider.release.clear()
+    service = _service(provider)
+    request = RewriteRequest("rewrite", "shared", "improve")
+    future = service.submit(request)
+    service.submit(request)
+    service.abandon(request, future)
+    assert not future.done()
+    provider.release.set()
+    assert future.result(timeout=2) == "rewrite:improve:shared"
+
+def test_requests_past_their_deadline_are_not_sent():
+    provider = RecordingProvider()
+    provider.release.clear()
+    service = _service(provider, workers=1, batch_window=0.001)
+    service.submit(RewriteRequest("rewrite", "busy", "improve"))
+    time.sleep(0.05)
+    expired = service.submit(RewriteRequest("rewrite", "expired", "improve"), deadline=time.monotonic())
+    provider.release.set()
+    with pytest.raises(RewriteTimeout):
+        expired.result(timeout=2)
+    assert provider.batches == [["busy"]]
+
+def test_a_full_queue_sheds_new_requests():
+    provider = RecordingProvider()
+    provider.release.clear()
+    service = _service(provider, workers=1, batch_window=0.001, max_pending=2)
+    service.submit(RewriteRequest("rewrite", "busy", "improve"))
+    time.sleep(0.05)
+    queued = [service.submit(RewriteRequest("rewrite", f"queued {index}", "improve")) for index in range(2)]
+    with pytest.raises(RewriteOverloaded):
+        service.rewrite("rewrite", "one too many", "improve", timeout=1)
+    provider.release.set()
+    assert [future.result(timeout=2) for future in queued] == \
+        [f"rewrite:improve:queued {index}" for index in range(2)]
+
+def test_provider_errors_reach_every_caller():
+    class Failing(RecordingProvider):
+        def rewrite_batch(self, requests, timeout=None):
+            return ["only one"]
+
+    service = _service(Failing())
+    with pytest.raises(RewriteError, match="returned 1 results for 2"):
+        service.rewrite_many([("rewrite", "a", "improve"), ("rewrite", "b", "improve")])
+    assert service._inflight == {}
+
+def test_ai_rewrite_route_answers_with_the_service_result(client):
+    response = client.post("/api/grammar/ai_rewrite", json={"text": "Make this better.", "style": "concise"})
+    assert response.status_code == 200
+    assert response.get_json()["title"] == "Concise Version"
@@ -0,0 +1,174 @@
+import itertools
+import os
+import stat
+
+import pytest
+
+from src.analysis import shared_cache
+from src.analysis.shared_cache import (
+    SharedCache, SQLiteBackend, SharedMemoryBackend, MemoryBackend, cache_key, create_backend, private_directory
+)
+
+SLOT = 4096
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make every time.time() call in the cache a second later than the last"""
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(shared_cache.time, "time", lambda: float(next(ticks)))
+
+def _key(index):
+    return cache_key("test", index)
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+@pytest.fixture(params=["sqlite", "shm", "memory"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    if request.param == "shm":
+        return SharedMemoryBackend(str(tmp_path / "cache.shm"), max_bytes=64 * SLOT, slot_size=SLOT)
+    return MemoryBackend(max_bytes=1024 * 1024)
+
+def test_round_trip(backend):
+    cache = SharedCache(backend)
+    small = b"short value"
+    large = b'{"text": "' + b"repetitive body " * 200 + b'"}'
+    cache.put(_key(1), small)
+    cache.put(_key(2), large)
+    assert cache.get(_key(1)) == small
+    assert cache.get(_key(2)) == large
+    assert cache.get(_key(3)) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Large values are stored compressed, small ones as they are
+    assert bytes(backend.get(_key(2)))[:1] == b"\x01"
+    assert bytes(backend.get(_key(1))) == b"\x00" + small
+
+    cache.put(_key(1), b"replaced")
+    assert cache.get(_key(1)) == b"replaced"
+    assert backend.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.get(_key(1)) is None
+    assert backend.stats()["entries"] == 0
+
+def test_keys_cover_every_part():
+    assert cache_key("check", "ab", "c") != cache_key("check", "a", "bc")
+    assert cache_key("check", "text") != cache_key("auto_fix", "text")
+    assert cache_key("check", "text") == cache_key("check", b"text")
+    assert len(cache_key("check")) == 16
+
+def test_sqlite_evicts_least_recently_used(tmp_path, clock):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=10 * 100)
+    for index in range(10):
+        backend.put(_key(index), bytes(100))
+    assert backend.stats()["bytes"] == 1000
+    # Reading entry 0 long after it was written counts as a use
+    backend.TOUCH_SECONDS = 0
+    assert backend.get(_key(0)) is not None
+
+    backend.put(_key(10), bytes(100))
+    stats = backend.stats()
+    # Trimmed to LOW_WATER of max_bytes, oldest first
+    assert stats["bytes"] <= backend.max_bytes * backend.LOW_WATER
+    assert backend.get(_key(0)) is not None
+    assert backend.get(_key(1)) is None
+    assert backend.get(_key(2)) is None
+    assert backend.get(_key(10)) is not None
+    assert stats["bytes"] == stats["entries"] * 100
+
+def test_sqlite_skips_values_over_the_limit(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=100)
+    backend.put(_key(1), bytes(101))
+    assert backend.get(_key(1)) is None
+    assert backend.stats()["bytes"] == 0
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteBackend(path).put(_key(1), b"value")
+    assert SQLiteBackend(path).get(_key(1)) == b"value"
+
+def _same_set_keys(backend, count):
+    """Keys that all hash to the first set of slots"""
+    keys = []
+    for index in itertools.count():
+        key = _key(index)
+        if backend._slots(key)[0] == backend.HEADER_SIZE:
+            keys.append(key)
+            if len(keys) == count:
+                return keys
+
+def test_shm_overwrites_the_oldest_slot_in_a_set(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "cache.shm"), max_bytes=8 * SLOT, slot_size=SLOT)
+    assert backend.slot_count == 8
+    keys = _same_set_keys(backend, backend.WAYS + 2)
+    for index, key in enumerate(keys[:backend.WAYS]):
+        backend.put(key, b"value %d" % index)
+    # Rewriting a key keeps its slot and makes it the newest
+    backend.put(keys[0], b"value 0 again")
+
+    backend.put(keys[backend.WAYS], b"new")
+    assert backend.get(keys[1]) is None
+    assert bytes(backend.get(keys[0])) == b"value 0 again"
+    assert bytes(backend.get(keys[backend.WAYS])) == b"new"
+
+    backend.put(keys[backend.WAYS + 1], b"newer")
+    assert backend.get(keys[2]) is None
+    assert backend.stats()["entries"] == backend.WAYS
+
+def test_shm_skips_values_larger_than_a_slot(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "cache.shm"), max_bytes=8 * SLOT, slot_size=SLOT)
+    backend.put(_key(1), bytes(SLOT))
+    assert backend.get(_key(1)) is None
+
+def test_shm_adopts_an_existing_table(tmp_path):
+    path = str(tmp_path / "cache.shm")
+    first = SharedMemoryBackend(path, max_bytes=8 * SLOT, slot_size=SLOT)
+    first.put(_key(1), b"value")
+    # A worker configured differently uses the geometry already on disk
+    second = SharedMemoryBackend(path, max_bytes=64 * SLOT, slot_size=2 * SLOT)
+    assert (second.slot_count, second.slot_size) == (8, SLOT)
+    assert bytes(second.get(_key(1))) == b"value"
+
+def test_backend_errors_are_misses(tmp_path):
+    class Broken(MemoryBackend):
+        def get(self, key):
+            raise OSError("disk gone")
+
+        def put(self, key, value):
+            raise OSError("disk gone")
+
+    cache = SharedCache(Broken())
+    cache.put(_key(1), b"value")
+    assert cache.get(_key(1)) is None
+    assert cache.errors == 2
+
+@pytest.mark.parametrize("name, filename", [("sqlite", "cache.sqlite3"), ("shm", "cache.shm")])
+def test_files_are_private(tmp_path, name, filename):
+    directory = tmp_path / "shared"
+    os.makedirs(directory, mode=0o755)
+    os.chmod(directory, 0o755)
+    path = os.path.join(private_directory(str(directory)), filename)
+    create_backend(name, path, max_bytes=8 * SLOT).put(_key(1), b"value")
+    assert _mode(directory) == 0o700
+    assert _mode(path) == 0o600
+
+@pytest.mark.parametrize("name", ["sqlite", "shm"])
+def test_symlinks_are_refused(tmp_path, name):
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"")
+    link = tmp_path / "cache"
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        create_backend(name, str(link), max_bytes=8 * SLOT)
+    assert target.read_bytes() == b""
+
+def test_symlinked_directories_are_refused(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir()
+    link = tmp_path / "shared"
+    link.symlink_to(target, target_is_directory=True)
+    with pytest.raises(PermissionError):
+        private_directory(str(link))
@@ -0,0 +1,65 @@
+import sqlalchemy
+
+from src import startup
+from src.main import create_app, init_db
+from src.models.user import db
+from src.startup import StartupTimer
+
+def _tables(app):
+    with app.app_context():
+        return sqlalchemy.inspect(db.engine).get_table_names()
+
+def test_create_app_leaves_the_schema_alone(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+                      "SHARED_CACHE_DIR": str(tmp_path / "shared-cache")})
+    assert _tables(app) == []
+    init_db(app)
+    assert "user" in _tables(app)
+
+def test_init_db_command_creates_the_tables(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+                      "SHARED_CACHE_DIR": str(tmp_path / "shared-cache")})
+    result = app.test_cli_runner().invoke(args=["init-db"])
+    assert result.exit_code == 0
+    assert "Initialized the database." in result.output
+    assert "user" in _tables(app)
+
+def test_timer_records_the_first_real_request(app):
+    timer = StartupTimer()
+    timer.mark_imported()
+    timer.mark_app_created()
+    timer.install(app)
+    client = app.test_client()
+    client.get("/api/startup")
+    assert timer.first_request is None
+    client.post("/api/grammar/check", json={"text": "Teh cat."})
+    client.post("/api/grammar/auto_fix", json={"text": "Teh cat."})
+    report = timer.report()
+    assert report["first_request"]["path"] == "/api/grammar/check"
+    assert report["first_request"]["latency_ms"] <= report["first_request"]["since_import_ms"]
+    assert report["import_ms"] >= 0 and report["app_create_ms"] >= 0
+
+def test_unfinished_timer_reports_none():
+    assert StartupTimer().report() == {"import_ms": None, "app_create_ms": None, "first_request": None}
+
+def test_startup_endpoint(client):
+    report = client.get("/api/startup").get_json()
+    assert set(report) == {"import_ms", "app_create_ms", "first_request"}
+    assert report["import_ms"] > 0
+
+def test_cold_start_measurement_hits_every_endpoint():
+    report = startup._measure_cold_start()
+    assert [item["path"] for item in report["first_requests"]] == [
+        "/api/grammar/check", "/api/grammar/auto_fix", "/api/grammar/paraphrase", "/api/grammar/pdf_report"
+    ]
+    assert all(item["status"] == 200 for item in report["first_requests"])
+
+def test_format_report():
+    text = startup.format_report({
+        "import_ms": 812.34, "app_create_ms": 4.2,
+        "first_requests": [{"path": "/api/grammar/check", "latency_ms": 35.0, "status": 200}],
+        "slowest_imports": [{"module": "flask", "cumulative_ms": 120.5}]
+    })
+    assert "import src.main          812.3 ms" in text
+    assert "  /api/grammar/check                35.0 ms  (200)" in text
+    assert text.endswith("  flask                            120.5 ms")